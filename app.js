@@ -1,22 +1,8 @@
 class PIIGuard {
     constructor() {
-        // PII Detection patterns from provided data - improved phone regex
-        this.piiPatterns = {
-            email: /\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b/g,
-            phone: /\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})\b/g,
-            ssn: /\b(?!000|666|9\d{2})\d{3}[-.]?(?!00)\d{2}[-.]?(?!0000)\d{4}\b/g,
-            creditCard: /\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12})\b/g,
-            ipAddress: /\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b/g,
-            address: /\b\d+\s+[A-Za-z0-9\s,]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)\b/g
-        };
-
-        // Common names from provided data
-        this.commonNames = [
-            "John Smith", "Sarah Johnson", "Michael Davis", "Emily Chen", "Robert Williams",
-            "Lisa Thompson", "David Wilson", "Maria Garcia", "James Brown", "Jennifer Lee",
-            "Amanda Rodriguez", "Christopher Taylor", "Michelle Anderson", "Daniel Thomas",
-            "Jessica Martinez", "Matthew Jackson", "Ashley White", "Joshua Harris", "Sarah"
-        ];
+        // Detection patterns, names and risk weights come from the PIIGuardRules
+        // bundle served at /api/client-rules.js, generated from the server's
+        // live rules so the two can never drift.
 
         // Test prompts from provided data
         this.testPrompts = [
@@ -25,24 +11,6 @@ class PIIGuard {
             "Explain machine learning concepts to a beginner without using any technical jargon."
         ];
 
-        // Risk weights from provided data
-        this.riskWeights = {
-            EMAIL: 2,
-            PHONE: 2,
-            SSN: 5,
-            CREDIT_CARD: 5,
-            PERSON: 1,
-            ADDRESS: 3,
-            IP_ADDRESS: 3
-        };
-
-        // Risk thresholds from provided data
-        this.riskThresholds = {
-            LOW: { min: 0, max: 3 },
-            MEDIUM: { min: 4, max: 7 },
-            HIGH: { min: 8, max: 100 }
-        };
-
         // Privacy messages from provided data
         this.privacyMessages = {
             LOW: "✅ Low privacy risk. This text appears safe to send to AI services.",
@@ -185,190 +153,78 @@ class PIIGuard {
         }
 
         this.showLoading('analyzeBtn');
-        
-        // Simulate processing delay for better UX
-        setTimeout(() => {
-            try {
-                const analysis = this.detectPII(inputText);
+
+        this.detectPII(inputText)
+            .then(analysis => {
                 console.log('Analysis result:', analysis);
                 this.currentAnalysis = analysis;
                 this.displayResults(analysis);
                 this.hideLoading('analyzeBtn');
-                
+
                 // Enable redact button if PII detected
                 if (analysis.detectedItems.length > 0) {
                     this.enableRedactButton();
                 } else {
                     this.disableRedactButton();
                 }
-            } catch (error) {
+            })
+            .catch(error => {
                 console.error('Analysis error:', error);
                 this.hideLoading('analyzeBtn');
                 alert('An error occurred during analysis. Please try again.');
-            }
-        }, 800);
+            });
     }
 
-    detectPII(text) {
-        const detectedItems = [];
-        let riskScore = 0;
-
+    async detectPII(text) {
         console.log('Detecting PII in text:', text.substring(0, 50) + '...');
 
-        // Reset regex lastIndex for global patterns
-        Object.values(this.piiPatterns).forEach(pattern => {
-            if (pattern.global) pattern.lastIndex = 0;
-        });
-
-        // Detect emails
-        this.piiPatterns.email.lastIndex = 0;
-        let match;
-        while ((match = this.piiPatterns.email.exec(text)) !== null) {
-            detectedItems.push({
-                type: 'EMAIL',
-                text: match[0],
-                position: match.index,
-                confidence: 0.95
-            });
-            riskScore += this.riskWeights.EMAIL;
-            console.log('Found email:', match[0]);
-        }
-
-        // Detect phone numbers with improved regex
-        this.piiPatterns.phone.lastIndex = 0;
-        while ((match = this.piiPatterns.phone.exec(text)) !== null) {
-            detectedItems.push({
-                type: 'PHONE',
-                text: match[0],
-                position: match.index,
-                confidence: 0.92
-            });
-            riskScore += this.riskWeights.PHONE;
-            console.log('Found phone:', match[0]);
-        }
+        let detections;
+        let riskAnalysis;
 
-        // Additional phone pattern checks for common formats
-        const additionalPhonePatterns = [
-            /\(\d{3}\)\s*\d{3}-\d{4}/g,  // (555) 123-4567
-            /\d{3}-\d{3}-\d{4}/g,        // 555-123-4567
-            /\d{3}\.\d{3}\.\d{4}/g,      // 555.123.4567
-            /\d{10}/g                     // 5551234567
-        ];
-
-        additionalPhonePatterns.forEach(pattern => {
-            pattern.lastIndex = 0;
-            let phoneMatch;
-            while ((phoneMatch = pattern.exec(text)) !== null) {
-                // Check if this phone number is already detected
-                const alreadyDetected = detectedItems.some(item => 
-                    item.type === 'PHONE' && 
-                    Math.abs(item.position - phoneMatch.index) < 5
-                );
-                
-                if (!alreadyDetected) {
-                    detectedItems.push({
-                        type: 'PHONE',
-                        text: phoneMatch[0],
-                        position: phoneMatch.index,
-                        confidence: 0.90
-                    });
-                    riskScore += this.riskWeights.PHONE;
-                    console.log('Found additional phone:', phoneMatch[0]);
-                }
-            }
-        });
-
-        // Detect SSN
-        this.piiPatterns.ssn.lastIndex = 0;
-        while ((match = this.piiPatterns.ssn.exec(text)) !== null) {
-            detectedItems.push({
-                type: 'SSN',
-                text: match[0],
-                position: match.index,
-                confidence: 0.98
-            });
-            riskScore += this.riskWeights.SSN;
-            console.log('Found SSN:', match[0]);
-        }
-
-        // Detect credit cards
-        this.piiPatterns.creditCard.lastIndex = 0;
-        while ((match = this.piiPatterns.creditCard.exec(text)) !== null) {
-            detectedItems.push({
-                type: 'CREDIT_CARD',
-                text: match[0],
-                position: match.index,
-                confidence: 0.96
-            });
-            riskScore += this.riskWeights.CREDIT_CARD;
-            console.log('Found credit card:', match[0]);
-        }
-
-        // Detect IP addresses
-        this.piiPatterns.ipAddress.lastIndex = 0;
-        while ((match = this.piiPatterns.ipAddress.exec(text)) !== null) {
-            detectedItems.push({
-                type: 'IP_ADDRESS',
-                text: match[0],
-                position: match.index,
-                confidence: 0.90
-            });
-            riskScore += this.riskWeights.IP_ADDRESS;
-            console.log('Found IP address:', match[0]);
-        }
-
-        // Detect addresses
-        this.piiPatterns.address.lastIndex = 0;
-        while ((match = this.piiPatterns.address.exec(text)) !== null) {
-            detectedItems.push({
-                type: 'ADDRESS',
-                text: match[0],
-                position: match.index,
-                confidence: 0.85
-            });
-            riskScore += this.riskWeights.ADDRESS;
-            console.log('Found address:', match[0]);
-        }
-
-        // Detect common names
-        this.commonNames.forEach(name => {
-            const regex = new RegExp(`\\b${name.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')}\\b`, 'gi');
-            let nameMatch;
-            while ((nameMatch = regex.exec(text)) !== null) {
-                detectedItems.push({
-                    type: 'PERSON',
-                    text: nameMatch[0],
-                    position: nameMatch.index,
-                    confidence: 0.88
+        // Texts the ML stage would not look at are classified exactly in the
+        // browser; only the rest are sent to the server.
+        if (PIIGuardRules.canDetectLocally(text)) {
+            console.log('Detecting locally with rules version', PIIGuardRules.version);
+            detections = PIIGuardRules.detect(text);
+            riskAnalysis = PIIGuardRules.analyzePrivacyRisk(detections);
+        } else {
+            try {
+                const response = await fetch('/api/analyze', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ text })
                 });
-                riskScore += this.riskWeights.PERSON;
-                console.log('Found name:', nameMatch[0]);
+                if (!response.ok) {
+                    throw new Error(`Server responded with ${response.status}`);
+                }
+                const result = await response.json();
+                detections = result.detections;
+                riskAnalysis = result.risk_analysis;
+            } catch (error) {
+                // If the analysis request fails, fall back to patterns and names only.
+                console.warn('Server analysis unavailable, using local rules:', error);
+                detections = PIIGuardRules.detect(text);
+                riskAnalysis = PIIGuardRules.analyzePrivacyRisk(detections);
             }
-        });
+        }
 
-        // Calculate risk level
-        const riskLevel = this.calculateRiskLevel(riskScore);
-        console.log('Risk score:', riskScore, 'Risk level:', riskLevel);
+        const detectedItems = detections.map(detection => ({
+            type: detection.entity_type,
+            text: detection.entity_text,
+            position: detection.start,
+            confidence: detection.confidence
+        }));
+        console.log('Risk score:', riskAnalysis.risk_score, 'Risk level:', riskAnalysis.risk_level);
 
         return {
             originalText: text,
-            detectedItems: detectedItems.sort((a, b) => a.position - b.position),
-            riskScore,
-            riskLevel,
-            recommendations: this.generateRecommendations(detectedItems, riskLevel)
+            detectedItems,
+            riskScore: riskAnalysis.risk_score,
+            riskLevel: riskAnalysis.risk_level,
+            recommendations: this.generateRecommendations(detectedItems, riskAnalysis.risk_level)
         };
     }
 
-    calculateRiskLevel(score) {
-        if (score >= this.riskThresholds.HIGH.min) {
-            return 'HIGH';
-        } else if (score >= this.riskThresholds.MEDIUM.min) {
-            return 'MEDIUM';
-        } else {
-            return 'LOW';
-        }
-    }
-
     generateRecommendations(detectedItems, riskLevel) {
         const recommendations = [];
         const types = [...new Set(detectedItems.map(item => item.type))];
@@ -3,17 +3,101 @@ PII Guard Web Application
 Flask-based web interface for PII detection and redaction
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify, stream_with_context
 from pii_detector import PIIDetector
+from detections import Detections
+from batch_scheduler import MicroBatchScheduler
+from redaction import get_redaction_strategy
+from metrics import CASCADE, ML_READY, REGISTRY, REQUESTS, REQUEST_DURATION, RESULT_CACHE
+from request_profiler import REQUEST_ID_PATTERN, RequestProfiler
+from incremental import SessionStore, VersionConflict
+from client_bundle import client_rules, render_client_bundle
+from rules import RuleWatcher
+import codecs
+import hmac
 import json
+import os
+import time
+import uuid
 
 app = Flask(__name__)
-detector = PIIDetector()
+detector = PIIDetector(
+    load_async=os.environ.get('PII_GUARD_LOAD_ASYNC', '1') == '1',
+    backend=os.environ.get('PII_GUARD_BACKEND', 'torch'),
+    rules_path=os.environ.get('PII_GUARD_RULES') or None,
+    # Result cache for repeated prompts; off unless given a size.
+    cache_max_bytes=int(float(os.environ.get('PII_GUARD_CACHE_MB', 0)) * 1024 * 1024),
+    cache_ttl=float(os.environ.get('PII_GUARD_CACHE_TTL', 300)),
+    # Segments scoring below this skip the NER model; unset runs it on everything.
+    cascade_threshold=float(os.environ['PII_GUARD_CASCADE_THRESHOLD'])
+    if os.environ.get('PII_GUARD_CASCADE_THRESHOLD') else None
+)
+# Concurrent /api/detect and /api/analyze calls share model forward passes.
+scheduler = MicroBatchScheduler(
+    detector,
+    max_batch_size=int(os.environ.get('PII_GUARD_MAX_BATCH', 16)),
+    max_wait_ms=float(os.environ.get('PII_GUARD_MAX_WAIT_MS', 5))
+)
+# prefork.py points every worker at one directory, so /metrics on any of them
+# reports the whole server.
+REGISTRY.multiprocess_dir = os.environ.get('PII_GUARD_METRICS_DIR') or None
+# Per-request profiling is off unless an admin token is configured.
+ADMIN_TOKEN = os.environ.get('PII_GUARD_ADMIN_TOKEN', '')
+profiler = RequestProfiler(detector)
+
+def start_rules_watcher():
+    return RuleWatcher(detector, interval=float(os.environ.get('PII_GUARD_RULES_POLL', 2))).start()
+
+# Edits to the rules file go live without a restart. prefork.py turns this
+# off in the parent and starts one watcher per worker, as threads do not
+# survive fork.
+rules_watcher = None
+if detector.rules_path and os.environ.get('PII_GUARD_WATCH_RULES', '1') == '1':
+    rules_watcher = start_rules_watcher()
+# Live-typing clients keep a session and send edit deltas instead of the whole
+# prompt. Sessions live in this process's memory, so prefork.py turns them off:
+# its workers share one socket and most edits would reach a worker that never
+# saw the session.
+sessions = SessionStore(
+    detector,
+    max_sessions=int(os.environ.get('PII_GUARD_MAX_SESSIONS', 1000)),
+    ttl_seconds=float(os.environ.get('PII_GUARD_SESSION_TTL', 600))
+) if os.environ.get('PII_GUARD_SESSIONS', '1') == '1' else None
+SESSIONS_DISABLED = "Incremental sessions are disabled on this server (e.g. under prefork.py); use /api/detect"
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    record_request(request.url_rule.rule if request.url_rule else 'unmatched',
+                   response.status_code, g.request_started)
+    return response
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/api/ready')
+def readiness():
+    """Readiness probe: regex detection is always live, the ML stage once loaded."""
+    return jsonify(readiness_status())
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint: stage latencies, request and detection counters."""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/client-rules.js')
+def client_rules_script():
+    """Browser detector bundle generated from this server's pattern registry."""
+    version, source = client_bundle()
+    if version in request.if_none_match:
+        return Response(status=304, headers={'ETag': f'"{version}"', 'Cache-Control': 'no-cache'})
+    return Response(source, mimetype='application/javascript',
+                    headers={'ETag': f'"{version}"', 'Cache-Control': 'no-cache'})
+
 @app.route('/api/detect', methods=['POST'])
 def detect_pii_api():
     """API endpoint for PII detection with redaction."""
@@ -24,21 +108,122 @@ def detect_pii_api():
         if not text:
             return jsonify({'error': 'No text provided'}), 400
 
-        redacted_text, detections = detector.redact_pii(text)
-        risk_analysis = detector.analyze_privacy_risk(detections)
+        strategy = get_redaction_strategy(data.get('redaction', 'fixed'))
+
+        if profiling_requested(request.args, request.headers):
+            if not is_admin(request.headers):
+                return jsonify({'error': 'Profiling requires a valid admin token'}), 403
+            profile_id = profile_request_id(request.headers)
+            response = json_response(run_detect_profiled(text, strategy, profile_id))
+            response.headers['X-Profile-Id'] = profile_id
+            return response
+
+        return json_response(run_detect(text, strategy))
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/detect/batch', methods=['POST'])
+def detect_pii_batch_api():
+    """API endpoint for batched PII detection with redaction over a JSON array of texts."""
+    try:
+        texts = request.get_json()
+
+        if not isinstance(texts, list) or not texts:
+            return jsonify({'error': 'Expected a non-empty JSON array of texts'}), 400
+        if not all(isinstance(text, str) for text in texts):
+            return jsonify({'error': 'Every item in the array must be a string'}), 400
+
+        strategy = get_redaction_strategy(request.args.get('redaction', 'fixed'))
+        return json_response(run_detect_batch(texts, strategy))
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/detect/stream', methods=['POST'])
+def detect_pii_stream_api():
+    """Streaming redaction: raw UTF-8 text in, NDJSON redacted chunks and detections out."""
+    try:
+        strategy = get_redaction_strategy(request.args.get('redaction', 'fixed'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return Response(
+        stream_with_context(run_detect_stream(read_body_chunks(request.stream), strategy)),
+        mimetype='application/x-ndjson'
+    )
+
+@app.route('/api/sessions', methods=['POST'])
+def create_session_api():
+    """Start an incremental analysis session for live typing."""
+    if sessions is None:
+        return jsonify({'error': SESSIONS_DISABLED}), 501
+
+    try:
+        data = request.get_json()
+        text = data.get('text', '')
+
+        if not isinstance(text, str):
+            return jsonify({'error': 'text must be a string'}), 400
+
+        return jsonify(run_session_create(text)), 201
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/sessions/<session_id>/edits', methods=['POST'])
+def session_edits_api(session_id):
+    """Apply edit deltas to a session and return the detection diff."""
+    if sessions is None:
+        return jsonify({'error': SESSIONS_DISABLED}), 501
+
+    try:
+        data = request.get_json()
+        edits = data.get('edits')
+
+        if not isinstance(edits, list) or not all(isinstance(edit, dict) for edit in edits):
+            return jsonify({'error': 'edits must be a list of {offset, delete, insert} objects'}), 400
+
+        return jsonify(run_session_edits(session_id, edits, data.get('version')))
+
+    except KeyError:
+        return jsonify({'error': 'Unknown or expired session'}), 404
 
-        return jsonify({
-            'original_text': text,
-            'redacted_text': redacted_text,
-            'detections': detections,
-            'risk_analysis': risk_analysis,
-            'safe_to_send': risk_analysis['risk_level'] in ['LOW', 'MEDIUM'],
-            'recommendations': get_privacy_recommendations(risk_analysis)
-        })
+    except VersionConflict as e:
+        return jsonify({'error': str(e)}), 409
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+def delete_session_api(session_id):
+    """End a session and discard its text."""
+    if sessions is None:
+        return jsonify({'error': SESSIONS_DISABLED}), 501
+    if not sessions.delete(session_id):
+        return jsonify({'error': 'Unknown or expired session'}), 404
+    return '', 204
+
+@app.route('/api/admin/profiles/<profile_id>')
+def get_profile(profile_id):
+    """Admin-only: profile summary of an earlier ?profile=1 request served by this process."""
+    if not is_admin(request.headers):
+        return jsonify({'error': 'Admin token required'}), 403
+
+    summary = profiler.get(profile_id)
+    if summary is None:
+        return jsonify({'error': 'Unknown or expired profile id'}), 404
+    return jsonify(summary)
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_text():
     """API endpoint for PII analysis without redaction."""
@@ -46,18 +231,186 @@ def analyze_text():
         data = request.get_json()
         text = data.get('text', '')
 
-        detections = detector.detect_all_pii(text)
-        risk_analysis = detector.analyze_privacy_risk(detections)
-
-        return jsonify({
-            'detections': detections,
-            'risk_analysis': risk_analysis,
-            'recommendations': get_privacy_recommendations(risk_analysis)
-        })
+        return json_response(run_analyze(text))
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def json_response(body, status=200):
+    return Response(body, status=status, mimetype='application/json')
+
+def to_json_object(fields):
+    """Write a JSON object, serializing Detections straight from their columns."""
+    return '{' + ','.join(
+        f'{json.dumps(key)}:{value.to_json() if isinstance(value, Detections) else json.dumps(value)}'
+        for key, value in fields.items()
+    ) + '}'
+
+# Request logic shared by this Flask app and the ASGI app in asgi_app.py,
+# so both serve identical response bodies. Each returns a JSON string.
+# Each request pins the rule snapshot once, so a rules reload mid-request
+# cannot score risk with other weights than the rules that detected.
+def run_detect(text, strategy=None):
+    rules = detector.rules
+    return finish_detect(text, scheduler.detect(text, rules=rules), strategy, rules)
+
+def run_detect_profiled(text, strategy, profile_id):
+    # Bypasses the micro-batcher and result cache so the profile covers a
+    # full detection run on this thread.
+    rules = detector.rules
+    detections, summary = profiler.profile(
+        profile_id, text, lambda: detector.detect_columnar([text], use_cache=False, rules=rules)[0]
+    )
+    redacted_text = detector.apply_redactions(text, detections, strategy or "[REDACTED]")
+    return build_detect_response(text, redacted_text, detections, rules, profile=summary)
+
+def finish_detect(text, detections, strategy=None, rules=None):
+    redacted_text = detector.apply_redactions(text, detections, strategy or "[REDACTED]")
+    return build_detect_response(text, redacted_text, detections, rules)
+
+def run_detect_batch(texts, strategy=None):
+    rules = detector.rules
+    results = detector.detect_columnar(texts, rules=rules)
+    return '[' + ','.join(
+        finish_detect(text, detections, strategy, rules)
+        for text, detections in zip(texts, results)
+    ) + ']'
+
+STREAM_CHUNK_BYTES = 64 * 1024
+
+def read_body_chunks(stream, chunk_bytes=STREAM_CHUNK_BYTES):
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            break
+        yield decoder.decode(data)
+    yield decoder.decode(b'', final=True)
+
+def run_detect_stream(chunks, strategy=None):
+    """Yield one NDJSON line per redacted chunk, then a summary line."""
+    rules = detector.rules
+    type_counts = {}
+    for redacted_text, detections in detector.redact_stream(chunks, strategy or "[REDACTED]", rules=rules):
+        for detection in detections:
+            type_counts[detection['entity_type']] = type_counts.get(detection['entity_type'], 0) + 1
+        yield json.dumps({'redacted_text': redacted_text, 'detections': detections}) + '\n'
+
+    risk_analysis = detector.analyze_privacy_risk_counts(type_counts, rules)
+    yield json.dumps({
+        'done': True,
+        'risk_analysis': risk_analysis,
+        'safe_to_send': risk_analysis['risk_level'] in ['LOW', 'MEDIUM'],
+        'recommendations': get_privacy_recommendations(risk_analysis)
+    }) + '\n'
+
+def run_analyze(text):
+    rules = detector.rules
+    detections = scheduler.detect(text, rules=rules)
+    risk_analysis = detector.analyze_privacy_risk(detections, rules)
+
+    return to_json_object({
+        'detections': detections,
+        'risk_analysis': risk_analysis,
+        'recommendations': get_privacy_recommendations(risk_analysis)
+    })
+
+def is_admin(headers):
+    supplied = headers.get('X-Admin-Token', '')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(supplied.encode(), ADMIN_TOKEN.encode())
+
+def profiling_requested(args, headers):
+    return args.get('profile') == '1' or headers.get('X-Profile') == '1'
+
+def profile_request_id(headers):
+    """Use the caller's X-Request-Id when it is a plain identifier, else a fresh one."""
+    request_id = headers.get('X-Request-Id', '')
+    return request_id if REQUEST_ID_PATTERN.fullmatch(request_id) else uuid.uuid4().hex
+
+def record_request(endpoint, status, started):
+    REQUESTS.inc(endpoint=endpoint, status=status)
+    REQUEST_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
+
+def refresh_gauges():
+    ML_READY.set(1 if detector.is_ml_ready() else 0)
+    if detector.result_cache is not None:
+        for stat, value in detector.result_cache.stats().items():
+            RESULT_CACHE.set(value, stat=stat)
+    if detector.cascade_gate is not None:
+        for stat, value in detector.cascade_gate.stats().items():
+            # A ratio does not sum across workers; it is skipped / seen chars.
+            if stat != 'skipped_ratio':
+                CASCADE.set(value, stat=stat)
+
+def render_metrics():
+    refresh_gauges()
+    return REGISTRY.render()
+
+def run_session_create(text):
+    session_id, session = sessions.create(text)
+    with session.lock:
+        return {
+            'session_id': session_id,
+            'version': session.version,
+            'detections': session.detections(),
+            'risk_analysis': detector.analyze_privacy_risk(
+                [detection for _, detection in session.entries], session.rules
+            )
+        }
+
+def run_session_edits(session_id, edits, version=None):
+    session = sessions.get(session_id)
+    if session is None:
+        raise KeyError(session_id)
+
+    with session.lock:
+        diff = session.apply_edits(edits, version)
+        diff['risk_analysis'] = detector.analyze_privacy_risk(
+            [detection for _, detection in session.entries], session.rules
+        )
+        return diff
+
+client_bundles = {}
+
+def client_bundle():
+    """(version, source) of the browser bundle for the detector's current rules."""
+    snapshot = detector.rules
+    if snapshot.version not in client_bundles:
+        # A regex-only server never runs the ML stage, so the browser needs no gate.
+        rules = client_rules(detector, ml_gate=detector.ml_status != 'disabled', snapshot=snapshot)
+        # Only the live rules are ever served; drop bundles of replaced snapshots.
+        client_bundles.clear()
+        client_bundles[snapshot.version] = (rules['version'], render_client_bundle(rules))
+    return client_bundles[snapshot.version]
+
+def readiness_status():
+    return {
+        'ready': True,
+        'ml_ready': detector.is_ml_ready(),
+        'ml_status': detector.ml_status,
+        'backend': detector.backend,
+        'model_path': detector.model_path,
+        'rules_version': detector.rules.version
+    }
+
+def build_detect_response(text, redacted_text, detections, rules=None, profile=None):
+    """Assemble the /api/detect response body for one text, scored with the rules that detected it."""
+    risk_analysis = detector.analyze_privacy_risk(detections, rules)
+
+    fields = {
+        'original_text': text,
+        'redacted_text': redacted_text,
+        'detections': detections,
+        'risk_analysis': risk_analysis,
+        'safe_to_send': risk_analysis['risk_level'] in ['LOW', 'MEDIUM'],
+        'recommendations': get_privacy_recommendations(risk_analysis)
+    }
+    # Profiled responses carry their summary: under prefork.py a later
+    # /api/admin/profiles/<id> lookup may reach a worker that never saw it.
+    if profile is not None:
+        fields['profile'] = profile
+    return to_json_object(fields)
+
 def get_privacy_recommendations(risk_analysis):
     """Generate privacy recommendations based on risk analysis."""
     recommendations = []
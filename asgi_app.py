@@ -0,0 +1,248 @@
+"""
+PII Guard Web Application
+ASGI serving mode: the Flask app's API on an async event loop
+
+Request parsing, health checks and idle keep-alive connections are handled
+on the event loop, while PIIDetector calls run on a bounded thread pool so a
+slow model call never blocks other connections. Response bodies are the
+same as app.py's.
+
+    python asgi_app.py            # or: uvicorn asgi_app:app --port 5000
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from quart import Quart, Response, g, render_template, request, jsonify, stream_with_context
+
+import app as flask_app
+from incremental import VersionConflict
+from redaction import get_redaction_strategy
+
+app = Quart(__name__)
+executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('PII_GUARD_EXECUTOR_WORKERS', os.cpu_count() or 4)),
+    thread_name_prefix='pii-inference'
+)
+
+async def run_in_executor(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+def json_response(body, status=200):
+    return Response(body, status=status, mimetype='application/json')
+
+class BlockingBody:
+    """
+    File-like view of a streamed request body for code running on the
+    executor: each read waits for the event loop to receive the next chunk,
+    so the body is pulled only as fast as the detector consumes it.
+    """
+
+    def __init__(self, body, loop):
+        self.chunks = body.__aiter__()
+        self.loop = loop
+
+    def read(self, size=-1):
+        while True:
+            try:
+                data = asyncio.run_coroutine_threadsafe(self.chunks.__anext__(), self.loop).result()
+            except StopAsyncIteration:
+                return b''
+            if data:
+                return data
+
+@app.before_request
+async def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+async def record_request_metrics(response):
+    flask_app.record_request(request.url_rule.rule if request.url_rule else 'unmatched',
+                             response.status_code, g.request_started)
+    return response
+
+@app.route('/')
+async def index():
+    return await render_template('index.html')
+
+@app.route('/api/ready')
+async def readiness():
+    """Readiness probe: regex detection is always live, the ML stage once loaded."""
+    return jsonify(flask_app.readiness_status())
+
+@app.route('/metrics')
+async def metrics():
+    """Prometheus scrape endpoint: stage latencies, request and detection counters."""
+    return Response(flask_app.render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/client-rules.js')
+async def client_rules_script():
+    """Browser detector bundle generated from this server's pattern registry."""
+    version, source = await run_in_executor(flask_app.client_bundle)
+    if version in request.if_none_match:
+        return Response('', status=304, headers={'ETag': f'"{version}"', 'Cache-Control': 'no-cache'})
+    return Response(source, mimetype='application/javascript',
+                    headers={'ETag': f'"{version}"', 'Cache-Control': 'no-cache'})
+
+@app.route('/api/detect', methods=['POST'])
+async def detect_pii_api():
+    """API endpoint for PII detection with redaction."""
+    try:
+        data = await request.get_json()
+        text = data.get('text', '')
+
+        if not text:
+            return jsonify({'error': 'No text provided'}), 400
+
+        strategy = get_redaction_strategy(data.get('redaction', 'fixed'))
+
+        if flask_app.profiling_requested(request.args, request.headers):
+            if not flask_app.is_admin(request.headers):
+                return jsonify({'error': 'Profiling requires a valid admin token'}), 403
+            profile_id = flask_app.profile_request_id(request.headers)
+            response = json_response(await run_in_executor(flask_app.run_detect_profiled, text, strategy, profile_id))
+            response.headers['X-Profile-Id'] = profile_id
+            return response
+
+        return json_response(await run_in_executor(flask_app.run_detect, text, strategy))
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/detect/batch', methods=['POST'])
+async def detect_pii_batch_api():
+    """API endpoint for batched PII detection with redaction over a JSON array of texts."""
+    try:
+        texts = await request.get_json()
+
+        if not isinstance(texts, list) or not texts:
+            return jsonify({'error': 'Expected a non-empty JSON array of texts'}), 400
+        if not all(isinstance(text, str) for text in texts):
+            return jsonify({'error': 'Every item in the array must be a string'}), 400
+
+        strategy = get_redaction_strategy(request.args.get('redaction', 'fixed'))
+        return json_response(await run_in_executor(flask_app.run_detect_batch, texts, strategy))
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/detect/stream', methods=['POST'])
+async def detect_pii_stream_api():
+    """Streaming redaction: raw UTF-8 text in, NDJSON redacted chunks and detections out."""
+    try:
+        strategy = get_redaction_strategy(request.args.get('redaction', 'fixed'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    body = BlockingBody(request.body, asyncio.get_running_loop())
+    lines = flask_app.run_detect_stream(flask_app.read_body_chunks(body), strategy)
+
+    @stream_with_context
+    async def stream_lines():
+        # Each step of the generator reads and scans on the executor.
+        while True:
+            line = await run_in_executor(next, lines, None)
+            if line is None:
+                break
+            yield line
+
+    return Response(stream_lines(), mimetype='application/x-ndjson')
+
+@app.route('/api/sessions', methods=['POST'])
+async def create_session_api():
+    """Start an incremental analysis session for live typing."""
+    if flask_app.sessions is None:
+        return jsonify({'error': flask_app.SESSIONS_DISABLED}), 501
+
+    try:
+        data = await request.get_json()
+        text = data.get('text', '')
+
+        if not isinstance(text, str):
+            return jsonify({'error': 'text must be a string'}), 400
+
+        return jsonify(await run_in_executor(flask_app.run_session_create, text)), 201
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/sessions/<session_id>/edits', methods=['POST'])
+async def session_edits_api(session_id):
+    """Apply edit deltas to a session and return the detection diff."""
+    if flask_app.sessions is None:
+        return jsonify({'error': flask_app.SESSIONS_DISABLED}), 501
+
+    try:
+        data = await request.get_json()
+        edits = data.get('edits')
+
+        if not isinstance(edits, list) or not all(isinstance(edit, dict) for edit in edits):
+            return jsonify({'error': 'edits must be a list of {offset, delete, insert} objects'}), 400
+
+        return jsonify(await run_in_executor(flask_app.run_session_edits, session_id, edits, data.get('version')))
+
+    except KeyError:
+        return jsonify({'error': 'Unknown or expired session'}), 404
+
+    except VersionConflict as e:
+        return jsonify({'error': str(e)}), 409
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+async def delete_session_api(session_id):
+    """End a session and discard its text."""
+    if flask_app.sessions is None:
+        return jsonify({'error': flask_app.SESSIONS_DISABLED}), 501
+    if not flask_app.sessions.delete(session_id):
+        return jsonify({'error': 'Unknown or expired session'}), 404
+    return '', 204
+
+@app.route('/api/admin/profiles/<profile_id>')
+async def get_profile(profile_id):
+    """Admin-only: profile summary of an earlier ?profile=1 request served by this process."""
+    if not flask_app.is_admin(request.headers):
+        return jsonify({'error': 'Admin token required'}), 403
+
+    summary = flask_app.profiler.get(profile_id)
+    if summary is None:
+        return jsonify({'error': 'Unknown or expired profile id'}), 404
+    return jsonify(summary)
+
+@app.route('/api/analyze', methods=['POST'])
+async def analyze_text():
+    """API endpoint for PII analysis without redaction."""
+    try:
+        data = await request.get_json()
+        text = data.get('text', '')
+
+        return json_response(await run_in_executor(flask_app.run_analyze, text))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.after_serving
+async def shutdown_executor():
+    executor.shutdown(wait=False, cancel_futures=True)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(
+        app,
+        host=os.environ.get('PII_GUARD_HOST', '127.0.0.1'),
+        port=int(os.environ.get('PII_GUARD_PORT', 5000)),
+        timeout_keep_alive=int(os.environ.get('PII_GUARD_KEEP_ALIVE', 75))
+    )
@@ -0,0 +1,113 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Dynamic micro-batching between concurrent API requests and PIIDetector
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+from detections import Detections
+from rules import RuleSnapshot
+
+
+class MicroBatchScheduler:
+    """
+    Collects texts submitted from many request threads and runs them through
+    PIIDetector.detect_columnar together. A batch takes every text already
+    queued; when that is more than one and the ML model is ready, it then
+    stays open until it reaches max_batch_size or max_wait_ms has passed.
+    A lone request, or any request while only regex runs, does not wait. Texts
+    submitted with different rule snapshots share the batch window but are
+    detected in one detect_columnar call per snapshot.
+    """
+
+    def __init__(self, detector, max_batch_size: int = 16, max_wait_ms: float = 5.0):
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches_run = 0
+        self.texts_processed = 0
+        self._start_lock = threading.Lock()
+        self._worker_pid = None
+
+    def submit(self, text: str, rules: Optional[RuleSnapshot] = None) -> Future:
+        """Queue text for detection with rules (default: the detector's rules when the batch runs)."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, rules, future))
+        return future
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so a pre-forked worker process starts
+        # its own batching thread (and queue) on first use.
+        if self._worker_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            threading.Thread(target=self._run, args=(self._queue,), name="pii-micro-batcher", daemon=True).start()
+            self._worker_pid = os.getpid()
+
+    def detect(self, text: str, timeout: Optional[float] = None, rules: Optional[RuleSnapshot] = None) -> Detections:
+        return self.submit(text, rules).result(timeout)
+
+    def _collect_batch(self, pending: queue.Queue) -> list:
+        batch = [pending.get()]
+
+        # Texts already queued join at no cost. Waiting for more only pays
+        # off when the batch goes through the model and someone else is
+        # already waiting; a lone request, or a regex-only batch, runs now.
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(pending.get_nowait())
+            except queue.Empty:
+                break
+        if len(batch) == 1 or not self.detector.is_ml_ready():
+            return batch
+
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self, pending: queue.Queue):
+        while True:
+            batch = self._collect_batch(pending)
+            batch = [(text, rules, future) for text, rules, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            # Almost always one group: snapshots only differ across a rules reload.
+            current = self.detector.rules
+            groups = {}
+            for text, rules, future in batch:
+                rules = current if rules is None else rules
+                groups.setdefault(id(rules), (rules, []))[1].append((text, future))
+
+            for rules, group in groups.values():
+                try:
+                    results = self.detector.detect_columnar([text for text, _ in group], self.max_batch_size,
+                                                            rules=rules)
+                except Exception as e:
+                    for _, future in group:
+                        future.set_exception(e)
+                    continue
+
+                self.batches_run += 1
+                self.texts_processed += len(group)
+                for (_, future), detections in zip(group, results):
+                    future.set_result(detections)
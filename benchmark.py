@@ -0,0 +1,403 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Stage-level benchmark for PIIDetector on synthetic PII corpora
+
+Each document is timed stage by stage (regex, gazetteer, ml, dedup, redact,
+risk) and again end to end through detect_all_pii. Results carry p50/p95/p99
+latency, throughput and peak RSS per document size and are saved as JSON, so
+two runs can be compared:
+
+    python benchmark.py --sizes 100,10000,1000000 --output before.json
+    python benchmark.py --sizes 100,10000,1000000 --output after.json --compare before.json
+
+Modes: "regex" skips the model entirely, "stub" replaces the NER pipeline
+with an offline stand-in that exercises windowing and merging, and "model"
+loads the real backend. The first two run fully offline.
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from pii_detector import PIIDetector
+from detections import Detections
+from redaction import get_redaction_strategy
+
+STAGES = ('regex', 'gazetteer', 'ml', 'dedup', 'redact', 'risk')
+MODES = ('regex', 'stub', 'model')
+ENTITY_TYPES = ('EMAIL', 'PHONE', 'SSN', 'CREDIT_CARD', 'IP_ADDRESS', 'ADDRESS', 'PERSON')
+
+FILLER_WORDS = (
+    "the", "a", "please", "review", "this", "report", "before", "our", "meeting", "and", "send",
+    "it", "to", "team", "with", "notes", "about", "quarterly", "results", "for", "project",
+    "deadline", "is", "next", "week", "can", "you", "summarize", "draft", "an", "email",
+    "customer", "account", "update", "thanks", "regards", "invoice", "attached", "call", "me"
+)
+FIRST_NAMES = ("John", "Sarah", "Michael", "Emily", "Robert", "Priya", "Wei", "Olga", "Carlos", "Fatima")
+LAST_NAMES = ("Smith", "Johnson", "Davis", "Chen", "Williams", "Patel", "Nguyen", "Ivanova", "Silva", "Khan")
+STREETS = ("Main", "Maple", "Oak", "Cedar", "Elm", "Park", "Lake", "Hill")
+STREET_SUFFIXES = ("Street", "Avenue", "Road", "Boulevard", "Lane", "Drive")
+DOMAINS = ("example.com", "mail.example.org", "corp.example.net")
+
+
+def _luhn_check_digit(digits: str) -> str:
+    total = 0
+    for index, digit in enumerate(reversed(digits)):
+        value = int(digit)
+        if index % 2 == 0:
+            value *= 2
+            value -= 9 if value > 9 else 0
+        total += value
+    return str((10 - total % 10) % 10)
+
+
+def _email(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES).lower()}.{rng.choice(LAST_NAMES).lower()}{rng.randint(1, 99)}@{rng.choice(DOMAINS)}"
+
+
+def _phone(rng: random.Random) -> str:
+    return f"({rng.randint(201, 989)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}"
+
+
+def _ssn(rng: random.Random) -> str:
+    area = rng.choice([rng.randint(1, 665), rng.randint(667, 899)])
+    return f"{area:03d}-{rng.randint(1, 99):02d}-{rng.randint(1, 9999):04d}"
+
+
+def _credit_card(rng: random.Random) -> str:
+    body = "4" + "".join(str(rng.randint(0, 9)) for _ in range(14))
+    number = body + _luhn_check_digit(body)
+    return " ".join(number[i:i + 4] for i in range(0, 16, 4))
+
+
+def _ip_address(rng: random.Random) -> str:
+    return ".".join(str(rng.randint(1, 254)) for _ in range(4))
+
+
+def _address(rng: random.Random) -> str:
+    return f"{rng.randint(1, 9999)} {rng.choice(STREETS)} {rng.choice(STREET_SUFFIXES)}"
+
+
+def _person(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+ENTITY_GENERATORS: Dict[str, Callable[[random.Random], str]] = {
+    'EMAIL': _email,
+    'PHONE': _phone,
+    'SSN': _ssn,
+    'CREDIT_CARD': _credit_card,
+    'IP_ADDRESS': _ip_address,
+    'ADDRESS': _address,
+    'PERSON': _person
+}
+
+
+def parse_entity_mix(spec: str) -> Dict[str, float]:
+    """Parse "EMAIL=2,PERSON=1" into relative weights; "all" weights every type equally."""
+    if spec == "all":
+        return {entity_type: 1.0 for entity_type in ENTITY_TYPES}
+
+    mix = {}
+    for item in spec.split(","):
+        entity_type, _, weight = item.partition("=")
+        entity_type = entity_type.strip().upper()
+        if entity_type not in ENTITY_GENERATORS:
+            raise ValueError(f"Unknown entity type '{entity_type}'. Choose from: {', '.join(ENTITY_TYPES)}")
+        mix[entity_type] = float(weight) if weight else 1.0
+    return mix
+
+
+def generate_document(length: int, density: float, entity_mix: Dict[str, float], rng: random.Random) -> str:
+    """
+    One synthetic document of about length characters with density PII
+    entities per 1000 characters, drawn from entity_mix. Numeric entities
+    pass the checksum validators, so they count as real detections.
+    """
+    filler = rng.choices(FILLER_WORDS, k=max(1, length // 5))
+    entity_count = min(len(filler), round(length * density / 1000))
+    entity_types = list(entity_mix)
+    weights = [entity_mix[entity_type] for entity_type in entity_types]
+
+    for position in rng.sample(range(len(filler)), entity_count):
+        filler[position] = ENTITY_GENERATORS[rng.choices(entity_types, weights)[0]](rng)
+
+    text = " ".join(filler)
+    if len(text) > length:
+        cut = text.rfind(" ", 0, length)
+        text = text[:cut if cut > 0 else length]
+    return text
+
+
+def generate_corpus(count: int, length: int, density: float = 5.0, entity_mix: Optional[Dict[str, float]] = None,
+                    seed: int = 0) -> List[str]:
+    rng = random.Random(f"{seed}:{length}")
+    return [generate_document(length, density, entity_mix or parse_entity_mix("all"), rng) for _ in range(count)]
+
+
+class StubTokenizer:
+    """Whitespace tokenizer with the offset_mapping output PIIDetector._window_spans reads."""
+
+    def __call__(self, text: str, **kwargs) -> Dict:
+        return {'offset_mapping': [match.span() for match in re.finditer(r'\S+', text)]}
+
+
+class StubNERPipeline:
+    """
+    Offline stand-in for the transformers NER pipeline. Capitalised word
+    pairs are tagged PER, and an optional per-token delay approximates model
+    cost, so windowing, batching and seam merging run as in production.
+    """
+
+    CAPITALISED_PAIR = re.compile(r'\b[A-Z][a-z]+ [A-Z][a-z]+\b')
+
+    def __init__(self, ms_per_token: float = 0.0):
+        self.ms_per_token = ms_per_token
+        self.tokenizer = StubTokenizer()
+
+    def __call__(self, windows: List[str], batch_size: int = 8) -> List[List[Dict]]:
+        if self.ms_per_token:
+            time.sleep(sum(len(window.split()) for window in windows) * self.ms_per_token / 1000)
+
+        return [
+            [
+                {'entity_group': 'PER', 'word': match.group(), 'start': match.start(), 'end': match.end(), 'score': 0.85}
+                for match in self.CAPITALISED_PAIR.finditer(window)
+            ]
+            for window in windows
+        ]
+
+
+class OfflineDetector(PIIDetector):
+    """PIIDetector that never imports transformers: regex-only, or backed by a stub pipeline."""
+
+    def __init__(self, stub_pipeline: Optional[StubNERPipeline] = None, **kwargs):
+        self.stub_pipeline = stub_pipeline
+        super().__init__(**kwargs)
+
+    def load_model(self):
+        if self.stub_pipeline is not None:
+            self.pii_pipeline = self.stub_pipeline
+            self.ml_status = "ready"
+        else:
+            self.ml_status = "disabled"
+        self.model_loaded.set()
+
+
+def build_detector(mode: str, backend: str = "torch", stub_ms_per_token: float = 0.0) -> PIIDetector:
+    if mode == "regex":
+        return OfflineDetector()
+    if mode == "stub":
+        return OfflineDetector(stub_pipeline=StubNERPipeline(stub_ms_per_token))
+    if mode == "model":
+        return PIIDetector(backend=backend)
+    raise ValueError(f"Unknown benchmark mode '{mode}'. Choose from: {', '.join(MODES)}")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], total_chars: int) -> Dict:
+    ordered = sorted(latencies)
+    total_seconds = sum(ordered)
+    return {
+        'p50_ms': round(percentile(ordered, 50) * 1000, 4),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 4),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 4),
+        'mean_ms': round(total_seconds / len(ordered) * 1000, 4) if ordered else 0.0,
+        'throughput_mb_s': round(total_chars / total_seconds / 1e6, 3) if total_seconds else None
+    }
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux.
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def time_stages(detector: PIIDetector, text: str, strategy) -> Dict[str, float]:
+    """Run one document through each stage in the order detect_columnar uses."""
+    timings = {}
+    clock = time.perf_counter
+
+    started = clock()
+    pattern_pii = detector.detect_pii_patterns_batch([text])[0]
+    timings['regex'] = clock() - started
+
+    started = clock()
+    name_pii = detector.detect_pii_names(text)
+    timings['gazetteer'] = clock() - started
+
+    started = clock()
+    ml_pii = detector._run_ml_stage([text])[0]
+    timings['ml'] = clock() - started
+
+    # Includes packing the survivors into columnar Detections.
+    started = clock()
+    detections = Detections(detector._deduplicate_detections(pattern_pii + name_pii + ml_pii))
+    timings['dedup'] = clock() - started
+
+    started = clock()
+    detector.apply_redactions(text, detections, strategy)
+    timings['redact'] = clock() - started
+
+    started = clock()
+    detector.analyze_privacy_risk(detections)
+    timings['risk'] = clock() - started
+
+    return timings
+
+
+def benchmark_size(detector: PIIDetector, corpus: List[str], strategy_name: str, repeat: int) -> Dict:
+    stage_latencies = {stage: [] for stage in STAGES}
+    end_to_end = []
+    detection_counts = []
+
+    # Warm-up: first-call costs (regex caches, lazy imports) are not measured.
+    time_stages(detector, corpus[0], get_redaction_strategy(strategy_name))
+
+    for _ in range(repeat):
+        for text in corpus:
+            for stage, seconds in time_stages(detector, text, get_redaction_strategy(strategy_name)).items():
+                stage_latencies[stage].append(seconds)
+
+            started = time.perf_counter()
+            detections = detector.detect_all_pii(text)
+            end_to_end.append(time.perf_counter() - started)
+            detection_counts.append(len(detections))
+
+    total_chars = sum(len(text) for text in corpus) * repeat
+    return {
+        'documents': len(corpus),
+        'repeat': repeat,
+        'mean_chars': round(sum(len(text) for text in corpus) / len(corpus)),
+        'mean_detections': round(sum(detection_counts) / len(detection_counts), 2),
+        'stages': {stage: summarize(stage_latencies[stage], total_chars) for stage in STAGES},
+        'detect_all_pii': summarize(end_to_end, total_chars),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict:
+    detector = build_detector(args.mode, args.backend, args.stub_ms_per_token)
+    entity_mix = parse_entity_mix(args.entity_mix)
+    results = {}
+
+    # Ascending sizes, so each peak RSS reading is dominated by its own size.
+    for size in sorted(args.sizes):
+        count = args.documents if size <= args.large_threshold else args.large_documents
+        corpus = generate_corpus(count, size, args.density, entity_mix, args.seed)
+        results[str(size)] = benchmark_size(detector, corpus, args.redaction, args.repeat)
+        print_size_summary(size, results[str(size)])
+
+    return {
+        'meta': {
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'mode': args.mode,
+            'backend': args.backend if args.mode == "model" else None,
+            'ml_status': detector.ml_status,
+            'density_per_kb': args.density,
+            'entity_mix': entity_mix,
+            'redaction': args.redaction,
+            'seed': args.seed
+        },
+        'results': results
+    }
+
+
+def print_size_summary(size: int, result: Dict):
+    print(f"\n{size} chars x {result['documents']} docs (mean {result['mean_detections']} detections/doc, "
+          f"peak RSS {result['peak_rss_mb']} MB)")
+    print(f"  {'stage':<15}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}{'MB/s':>12}")
+    rows = dict(result['stages'], detect_all_pii=result['detect_all_pii'])
+    for stage, stats in rows.items():
+        throughput = stats['throughput_mb_s'] if stats['throughput_mb_s'] is not None else float('inf')
+        print(f"  {stage:<15}{stats['p50_ms']:>12.3f}{stats['p95_ms']:>12.3f}{stats['p99_ms']:>12.3f}{throughput:>12.2f}")
+
+
+def print_comparison(baseline: Dict, current: Dict):
+    """p50 change per size and stage; negative is faster."""
+    print(f"\nComparison against {baseline['meta'].get('git_revision') or 'baseline'} (p50, negative is faster)")
+    if baseline['meta'].get('mode') != current['meta']['mode']:
+        print(f"⚠️  Baseline ran in {baseline['meta'].get('mode')} mode, this run in {current['meta']['mode']} mode")
+    for size, result in current['results'].items():
+        previous = baseline['results'].get(size)
+        if previous is None:
+            continue
+        rows = dict(result['stages'], detect_all_pii=result['detect_all_pii'])
+        previous_rows = dict(previous['stages'], detect_all_pii=previous['detect_all_pii'])
+        changes = []
+        for stage, stats in rows.items():
+            before = previous_rows.get(stage, {}).get('p50_ms')
+            if before:
+                changes.append(f"{stage} {(stats['p50_ms'] - before) / before * 100:+.1f}%")
+        print(f"  {size:>10}: " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage-level PIIDetector benchmark on synthetic corpora")
+    parser.add_argument("--mode", choices=MODES, default="regex")
+    parser.add_argument("--backend", default="torch", help="inference backend for --mode model")
+    parser.add_argument("--stub-ms-per-token", type=float, default=0.0,
+                        help="simulated model cost per token for --mode stub")
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")],
+                        default=[100, 1000, 10000, 100000], help="document lengths in characters (up to 10000000)")
+    parser.add_argument("--documents", type=int, default=200, help="documents per size")
+    parser.add_argument("--large-documents", type=int, default=5, help="documents per size above --large-threshold")
+    parser.add_argument("--large-threshold", type=int, default=100000)
+    parser.add_argument("--density", type=float, default=5.0, help="PII entities per 1000 characters")
+    parser.add_argument("--entity-mix", default="all", help='relative weights, e.g. "EMAIL=2,SSN=1,PERSON=3"')
+    parser.add_argument("--redaction", default="type", help="redaction strategy timed in the redact stage")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
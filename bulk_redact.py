@@ -0,0 +1,318 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Bulk redaction of JSONL and CSV corpora across a process pool
+
+    python -m pii_detector bulk prompts.jsonl redacted.jsonl --workers 16
+    python -m pii_detector bulk prompts.csv redacted.csv --text-field prompt --redaction type
+
+The input is streamed and cut into chunks of records. Each worker process
+loads its own detector once and redacts a whole chunk with one batched
+call, serializing the output itself. The parent writes finished chunks in
+input order, holding at most --max-inflight chunks, so memory stays bounded
+however large the corpus is. Input and output byte offsets are checkpointed
+next to the output; rerunning the same command after a crash resumes from
+the last checkpoint.
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from inference_backends import BACKENDS
+from redaction import REDACTION_STRATEGIES, get_redaction_strategy
+
+FORMATS = ('jsonl', 'csv')
+
+# Written with --detections-field; never the matched text, which would put
+# the PII back into the redacted corpus.
+DETECTION_FIELDS = ('entity_type', 'start', 'end', 'confidence')
+
+_worker_detector = None
+
+
+def _init_worker(detector_kwargs: Dict, torch_threads: int):
+    global _worker_detector
+
+    try:
+        import torch
+
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    from pii_detector import PIIDetector
+
+    _worker_detector = PIIDetector(**detector_kwargs)
+
+
+def _redact_chunk(fmt: str, records: List, options: Dict) -> Tuple[bytes, int, int]:
+    """
+    Redact one chunk in a worker. Returns the serialized output, the number
+    of records written and the number skipped as unparseable.
+    """
+    if fmt == 'jsonl':
+        parsed = []
+        skipped = 0
+        for line in records:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+            if isinstance(record, dict):
+                parsed.append(record)
+            else:
+                skipped += 1
+        texts = [record.get(options['text_field']) for record in parsed]
+    else:
+        parsed = records
+        skipped = 0
+        column = options['text_column']
+        texts = [row[column] if column < len(row) else None for row in parsed]
+
+    # Records without a string in the text field pass through unchanged.
+    indexes = [index for index, text in enumerate(texts) if isinstance(text, str) and text]
+    results = _worker_detector.redact_batch(
+        [texts[index] for index in indexes],
+        get_redaction_strategy(options['redaction']),
+        options['ml_batch_size']
+    )
+    redacted = {
+        index: (text, [{field: detection[field] for field in DETECTION_FIELDS} for detection in detections])
+        for index, (text, detections) in zip(indexes, results)
+    }
+
+    out = io.StringIO()
+    if fmt == 'jsonl':
+        for index, record in enumerate(parsed):
+            if index in redacted:
+                record[options['text_field']], detections = redacted[index]
+                if options['detections_field']:
+                    record[options['detections_field']] = detections
+            out.write(json.dumps(record, ensure_ascii=False))
+            out.write("\n")
+    else:
+        writer = csv.writer(out)
+        for index, row in enumerate(parsed):
+            row = list(row)
+            detections = []
+            if index in redacted:
+                row[options['text_column']], detections = redacted[index]
+            if options['detections_field']:
+                row.append(json.dumps(detections, ensure_ascii=False))
+            writer.writerow(row)
+
+    return out.getvalue().encode("utf-8"), len(parsed), skipped
+
+
+class _OffsetLines:
+    """Decoded lines of a binary file; offset is the byte position after the last line handed out."""
+
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self.offset = f.tell()
+
+    def __iter__(self) -> Iterator[str]:
+        for line in iter(self.f.readline, b''):
+            self.offset += len(line)
+            yield line.decode("utf-8", "replace")
+
+
+def _read_records(fmt: str, lines: _OffsetLines) -> Iterator[Tuple[object, int]]:
+    """Yield (record, input offset after it). CSV records may span several lines."""
+    if fmt == 'jsonl':
+        for line in lines:
+            if line.strip():
+                yield line, lines.offset
+    else:
+        for row in csv.reader(lines):
+            yield row, lines.offset
+
+
+def _chunks(records: Iterator[Tuple[object, int]], size: int) -> Iterator[Tuple[List, int]]:
+    chunk = []
+    offset = 0
+    for record, offset in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk, offset
+            chunk = []
+    if chunk:
+        yield chunk, offset
+
+
+def _job_fingerprint(args: argparse.Namespace) -> str:
+    stat = os.stat(args.input)
+    settings = [
+        os.path.abspath(args.input), stat.st_size, int(stat.st_mtime), args.format, args.text_field,
+        args.detections_field, args.redaction, args.model_path, args.backend
+    ]
+    return hashlib.sha256(json.dumps(settings).encode("utf-8")).hexdigest()[:16]
+
+
+def _load_checkpoint(path: str, fingerprint: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('fingerprint') != fingerprint:
+        raise ValueError(f"Checkpoint {path} belongs to a different input or settings; "
+                         "delete it or pass --no-resume to start over")
+    return checkpoint
+
+
+def _save_checkpoint(path: str, checkpoint: Dict, out: BinaryIO):
+    # The output must be on disk before the checkpoint claims it is.
+    out.flush()
+    os.fsync(out.fileno())
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(temp_path, path)
+
+
+def _detect_format(path: str) -> str:
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def run_bulk(args: argparse.Namespace) -> Dict:
+    fmt = args.format or _detect_format(args.input)
+    args.format = fmt
+    checkpoint_path = args.checkpoint or args.output + ".checkpoint"
+    fingerprint = _job_fingerprint(args)
+    checkpoint = None if args.no_resume else _load_checkpoint(checkpoint_path, fingerprint)
+
+    options = {
+        'text_field': args.text_field,
+        'detections_field': args.detections_field,
+        'redaction': args.redaction,
+        'ml_batch_size': args.ml_batch_size,
+        'text_column': None
+    }
+    detector_kwargs = {'model_path': args.model_path, 'backend': args.backend, 'batch_size': args.ml_batch_size}
+    torch_threads = args.torch_threads or max(1, (os.cpu_count() or 1) // args.workers)
+
+    with open(args.input, "rb") as source:
+        lines = _OffsetLines(source)
+        header = None
+        if fmt == 'csv':
+            header = next(csv.reader(lines), None)
+            if header is None or args.text_field not in header:
+                raise ValueError(f"CSV input has no '{args.text_field}' column")
+            options['text_column'] = header.index(args.text_field)
+
+        if checkpoint is not None:
+            source.seek(checkpoint['input_offset'])
+            lines.offset = checkpoint['input_offset']
+            out = open(args.output, "r+b")
+            out.truncate(checkpoint['output_offset'])
+            out.seek(checkpoint['output_offset'])
+            print(f"✅ Resuming from checkpoint: {checkpoint['records']} records already written", file=sys.stderr)
+        else:
+            checkpoint = {'fingerprint': fingerprint, 'input_offset': lines.offset, 'output_offset': 0,
+                          'records': 0, 'skipped': 0}
+            out = open(args.output, "wb")
+            if header is not None:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerow(header + ([args.detections_field] if args.detections_field else []))
+                out.write(buffer.getvalue().encode("utf-8"))
+                checkpoint['output_offset'] = out.tell()
+
+        started = time.monotonic()
+        last_report = started
+        resumed_records = checkpoint['records']
+        chunks_since_checkpoint = 0
+
+        with out, ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                                      initargs=(detector_kwargs, torch_threads)) as pool:
+            # Reorder buffer: futures in submission order. Only the oldest is
+            # waited on, so later chunks keep computing while it finishes.
+            inflight = []
+
+            def write_oldest():
+                nonlocal chunks_since_checkpoint, last_report
+                future, input_offset = inflight.pop(0)
+                data, written, skipped = future.result()
+                out.write(data)
+                checkpoint['input_offset'] = input_offset
+                checkpoint['output_offset'] = out.tell()
+                checkpoint['records'] += written
+                checkpoint['skipped'] += skipped
+
+                chunks_since_checkpoint += 1
+                if chunks_since_checkpoint >= args.checkpoint_every:
+                    _save_checkpoint(checkpoint_path, checkpoint, out)
+                    chunks_since_checkpoint = 0
+
+                now = time.monotonic()
+                if now - last_report >= args.progress_seconds:
+                    rate = (checkpoint['records'] - resumed_records) / (now - started)
+                    print(f"  {checkpoint['records']} records, {rate:.0f} records/s", file=sys.stderr)
+                    last_report = now
+
+            for chunk, input_offset in _chunks(_read_records(fmt, lines), args.chunk_records):
+                inflight.append((pool.submit(_redact_chunk, fmt, chunk, options), input_offset))
+                if len(inflight) >= args.max_inflight:
+                    write_oldest()
+
+            while inflight:
+                write_oldest()
+
+            _save_checkpoint(checkpoint_path, checkpoint, out)
+
+    os.remove(checkpoint_path)
+    elapsed = time.monotonic() - started
+    return {
+        'records': checkpoint['records'],
+        'skipped': checkpoint['skipped'],
+        'seconds': round(elapsed, 2)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pii_detector bulk",
+                                     description="Redact PII in a JSONL or CSV corpus using all cores")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the input file extension")
+    parser.add_argument("--text-field", default="text", help="JSON key or CSV column holding the text")
+    parser.add_argument("--detections-field", help="also write detections to this key/column")
+    parser.add_argument("--redaction", choices=tuple(REDACTION_STRATEGIES), default="fixed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--torch-threads", type=int, default=None,
+                        help="intra-op threads per worker (default: cores / workers)")
+    parser.add_argument("--chunk-records", type=int, default=256, help="records per task sent to a worker")
+    parser.add_argument("--ml-batch-size", type=int, default=16, help="texts per model forward pass")
+    parser.add_argument("--max-inflight", type=int, default=None,
+                        help="chunks queued or held for ordering (default: 4 x workers)")
+    parser.add_argument("--model-path", default="distilbert-base-uncased")
+    parser.add_argument("--backend", choices=tuple(BACKENDS), default="torch")
+    parser.add_argument("--checkpoint", help="checkpoint path (default: OUTPUT.checkpoint)")
+    parser.add_argument("--checkpoint-every", type=int, default=16, help="chunks between checkpoints")
+    parser.add_argument("--no-resume", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--progress-seconds", type=float, default=10.0)
+    args = parser.parse_args(argv)
+    args.max_inflight = args.max_inflight or 4 * args.workers
+
+    try:
+        summary = run_bulk(args)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  {e}", file=sys.stderr)
+        return 1
+    except BrokenProcessPool as e:
+        print(f"⚠️  A worker died ({e}); rerun the same command to resume from the last checkpoint", file=sys.stderr)
+        return 1
+
+    print(f"✅ Redacted {summary['records']} records in {summary['seconds']}s "
+          f"({summary['skipped']} unparseable records skipped) -> {args.output}", file=sys.stderr)
+    return 0
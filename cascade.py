@@ -0,0 +1,101 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Cheap per-segment gate deciding which parts of a text go to the ML stage
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from gazetteer import NameGazetteer
+
+# Split after sentence punctuation and on newlines, but not after titles or
+# initials ("Dr. Smith", "J. Smith") so names stay inside one segment.
+SEGMENT_BOUNDARY = re.compile(r'(?<![A-Z][a-z]\.)(?<![A-Z][a-z][a-z]\.)(?<!\b[A-Z]\.)(?<=[.!?])\s+|\n+')
+WORD_PATTERN = re.compile(r"[^\W\d_][\w'\-]*")
+DIGITS_TABLE = str.maketrans('', '', '0123456789')
+
+
+def segment_spans(text: str) -> List[Tuple[int, int]]:
+    spans = []
+    start = 0
+
+    for boundary in SEGMENT_BOUNDARY.finditer(text):
+        if boundary.start() > start:
+            spans.append((start, boundary.start()))
+        start = boundary.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+
+    return spans
+
+
+class CascadeGate:
+    """
+    Scores each segment on signals that NER entities tend to come with:
+    capitalised words past the first, '@' signs, digit density and gazetteer
+    hits. Segments scoring below the threshold skip the transformer; the
+    counters record how much ML work that saved.
+    """
+
+    def __init__(self, threshold: float = 1.0, digit_density: float = 0.1,
+                 gazetteer: Optional[NameGazetteer] = None):
+        self.threshold = threshold
+        self.digit_density = digit_density
+        self.gazetteer = gazetteer
+        self._lock = threading.Lock()
+        self._counters = {"segments": 0, "segments_to_ml": 0, "chars": 0, "chars_to_ml": 0}
+
+    def score(self, segment: str, gazetteer: Optional[NameGazetteer] = None) -> float:
+        words = WORD_PATTERN.findall(segment)
+        # Sentences start capitalised anyway, so the first word is no signal.
+        score = sum(1 for word in words[1:] if word[0].isupper())
+
+        if '@' in segment:
+            score += 1
+        digits = len(segment) - len(segment.translate(DIGITS_TABLE))
+        if segment and digits / len(segment) >= self.digit_density:
+            score += 1
+        gazetteer = self.gazetteer if gazetteer is None else gazetteer
+        if gazetteer is not None and gazetteer.find_all(segment):
+            score += 1
+
+        return score
+
+    def select_spans(self, text: str, gazetteer: Optional[NameGazetteer] = None) -> List[Tuple[int, int]]:
+        """
+        Return the character spans of the text worth sending to the ML stage.
+        Neighbouring segments that pass are joined so the model keeps context.
+        gazetteer overrides the gate's own, e.g. with the detector's current rules.
+        """
+        spans = []
+        segments = segment_spans(text)
+        selected_segments = 0
+
+        for start, end in segments:
+            if self.score(text[start:end], gazetteer) < self.threshold:
+                continue
+            selected_segments += 1
+            if spans and text[spans[-1][1]:start].isspace():
+                spans[-1] = (spans[-1][0], end)
+            else:
+                spans.append((start, end))
+
+        with self._lock:
+            self._counters["segments"] += len(segments)
+            self._counters["segments_to_ml"] += selected_segments
+            self._counters["chars"] += len(text)
+            self._counters["chars_to_ml"] += sum(end - start for start, end in spans)
+
+        return spans
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+
+        counters["segments_skipped"] = counters["segments"] - counters["segments_to_ml"]
+        counters["chars_skipped"] = counters["chars"] - counters["chars_to_ml"]
+        counters["skipped_ratio"] = counters["chars_skipped"] / counters["chars"] if counters["chars"] else 0.0
+        return counters
@@ -0,0 +1,490 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Client-side detector bundle generated from the Python pattern registry
+
+The browser frontends used to carry hand-copied regexes and name lists that
+drifted from pii_detector.py. Here the detector's rules (combined pattern,
+digit-run shapes, gazetteer names, overlap policy, risk weights and the
+cascade gate's thresholds) are exported as JSON inside a small JavaScript
+engine that mirrors the server's regex, gazetteer and overlap stages. The
+browser classifies a text locally when the ML stage would not run on it
+and calls the API otherwise.
+
+The web pages load the bundle from the server at /api/client-rules.js, so
+it always matches the live rules. The CLI builds a standalone copy, e.g.
+for a browser extension that ships without a server:
+
+    python -m pii_detector bundle --output pii-guard-rules.js
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from typing import Dict, List, Optional
+
+from cascade import SEGMENT_BOUNDARY, WORD_PATTERN
+from digit_scanner import CARD_ISSUERS, MAX_RUN_PARTS, SHAPES
+from gazetteer import TOKEN_PATTERN
+from overlap import DEFAULT_TYPE_PRIORITY
+from pii_detector import NAME_CONFIDENCE, REGEX_CONFIDENCE, RISK_LEVELS, PIIDetector
+from rules import RuleSnapshot
+
+# Constructs with no JavaScript equivalent, keyed by what follows "(?".
+UNSUPPORTED_GROUPS = {
+    'P=': 'named backreferences', '#': 'comments', '>': 'atomic groups', '(': 'conditionals'
+}
+UNSUPPORTED_ESCAPES = {'A': r'\A', 'Z': r'\Z'}
+
+
+def to_js_regex(pattern: str) -> str:
+    """
+    Translate Python regex source to JavaScript regex source. Named groups
+    are rewritten; constructs JavaScript lacks raise ValueError rather than
+    silently matching differently in the browser.
+    """
+    out = []
+    index = 0
+    in_class = False
+
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            escaped = pattern[index + 1:index + 2]
+            if escaped in UNSUPPORTED_ESCAPES and not in_class:
+                raise ValueError(f"{UNSUPPORTED_ESCAPES[escaped]} has no JavaScript equivalent: {pattern}")
+            out.append(pattern[index:index + 2])
+            index += 2
+            continue
+
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+            # A ']' right after '[' or '[^' is a literal member in Python
+            # but closes the class in JavaScript, so it is escaped.
+            for prefix in ('[^]', '[]'):
+                if pattern.startswith(prefix, index):
+                    out.append(prefix[:-1] + '\\]')
+                    index += len(prefix)
+                    break
+            else:
+                out.append(char)
+                index += 1
+            continue
+        elif pattern.startswith('(?P<', index):
+            out.append('(?<')
+            index += 4
+            continue
+        elif pattern.startswith('(?', index):
+            rest = pattern[index + 2:]
+            for prefix, construct in UNSUPPORTED_GROUPS.items():
+                if rest.startswith(prefix):
+                    raise ValueError(f"Regex {construct} have no JavaScript equivalent: {pattern}")
+            if rest[:1].isalpha() or rest[:1] == '-':
+                raise ValueError(f"Inline regex flags have no JavaScript equivalent: {pattern}")
+
+        out.append(char)
+        index += 1
+
+    return "".join(out)
+
+
+def client_rules(detector, ml_gate: bool = True, snapshot: Optional[RuleSnapshot] = None) -> Dict:
+    """
+    The detector's rules (its current snapshot unless one is given) as a
+    JSON-ready dict with a version id. With ml_gate (the server runs the ML
+    stage) only the detector's own cascade gate can keep a text local; a
+    detector without one sends every text to the server. Without ml_gate (a
+    regex-only deployment) every text the engine can handle stays local.
+    """
+    snapshot = detector.rules if snapshot is None else snapshot
+    gate = detector.cascade_gate if ml_gate else None
+
+    rules = {
+        'patterns': to_js_regex(snapshot.compiled_patterns.pattern),
+        'patternGroups': list(snapshot.compiled_patterns.groupindex),
+        'fallbacks': [[pii_type, to_js_regex(pattern.pattern)] for pii_type, pattern in snapshot.digit_run_fallbacks],
+        'digitShapes': [
+            [pii_type, to_js_regex(shape.pattern)] for pii_type, shape in SHAPES if pii_type in snapshot.digit_types
+        ],
+        'cardIssuers': to_js_regex(CARD_ISSUERS.pattern),
+        'maxRunParts': MAX_RUN_PARTS,
+        'confidence': {'regex': REGEX_CONFIDENCE, 'name_matching': NAME_CONFIDENCE},
+        'gazetteer': {
+            'tokenPattern': to_js_regex(TOKEN_PATTERN.pattern),
+            'names': sorted(" ".join(tokens) for tokens in snapshot.name_gazetteer.names())
+        },
+        'overlap': {'policy': detector.overlap_policy, 'typePriority': list(DEFAULT_TYPE_PRIORITY)},
+        'risk': {
+            'weights': dict(snapshot.risk_weights),
+            'defaultWeight': snapshot.default_risk_weight,
+            'levels': [list(level) for level in RISK_LEVELS]
+        },
+        'gate': {
+            'threshold': gate.threshold,
+            'digitDensity': gate.digit_density,
+            'segmentBoundary': to_js_regex(SEGMENT_BOUNDARY.pattern),
+            'wordPattern': to_js_regex(WORD_PATTERN.pattern)
+        } if gate is not None else None,
+        'serverOnly': ml_gate and gate is None
+    }
+    # The engine is part of the version, so a cached bundle is refetched when either changes.
+    rules['version'] = hashlib.sha256(
+        (json.dumps(rules, sort_keys=True) + ENGINE_TEMPLATE).encode("utf-8")
+    ).hexdigest()[:16]
+    return rules
+
+
+def render_client_bundle(rules: Dict) -> str:
+    # JSON is valid JavaScript; escaping '<' keeps the bundle safe to inline in a <script> tag.
+    rules_json = json.dumps(rules, indent=4, sort_keys=True).replace('<', '\\u003c')
+    return (ENGINE_TEMPLATE
+            .replace('__VERSION__', rules['version'])
+            .replace('__RULES__', rules_json.replace('\n', '\n    ')))
+
+
+ENGINE_TEMPLATE = r"""/*
+ * PII Guard client-side detector - rules version __VERSION__
+ *
+ * GENERATED by client_bundle.py from the Python pattern registry; do not
+ * edit. Regenerate with:
+ *     python -m pii_detector bundle --output pii-guard-rules.js
+ *
+ * Mirrors the server's regex, gazetteer and overlap stages exactly for
+ * ASCII text. canDetectLocally(text) is false when the text needs the
+ * server: non-ASCII input, or a segment the cascade gate would send to
+ * the ML stage.
+ */
+(function (root) {
+    'use strict';
+
+    const RULES = __RULES__;
+
+    // Outside this range Python's Unicode-aware \w, \s, \b and str methods
+    // disagree with JavaScript's, so such texts go to the server.
+    const LOCAL_TEXT = /^[\x00-\x1b\x20-\x7f]*$/;
+
+    const patterns = new RegExp(RULES.patterns, 'g');
+    const fallbacks = RULES.fallbacks.map(([type, source]) => [type, new RegExp(source, 'y')]);
+    const digitShapes = RULES.digitShapes.map(([type, source]) => [type, new RegExp(`^(?:${source})$`)]);
+    const cardIssuers = new RegExp(`^(?:${RULES.cardIssuers})$`);
+    const tokenPattern = new RegExp(RULES.gazetteer.tokenPattern, 'g');
+
+    // Gazetteer as a token trie; names only continue across whitespace.
+    const nameTrie = { next: new Map(), end: false };
+    let maxNameTokens = 0;
+    for (const name of RULES.gazetteer.names) {
+        const tokens = name.split(' ');
+        let node = nameTrie;
+        for (const token of tokens) {
+            if (!node.next.has(token)) {
+                node.next.set(token, { next: new Map(), end: false });
+            }
+            node = node.next.get(token);
+        }
+        node.end = true;
+        maxNameTokens = Math.max(maxNameTokens, tokens.length);
+    }
+
+    const validators = {
+        PHONE: digits => digits.slice(-10).padStart(10, '0')[0] >= '2',
+        SSN: digits => {
+            const ssn = digits.slice(-9).padStart(9, '0');
+            const area = Number(ssn.slice(0, 3));
+            return area !== 0 && area !== 666 && area < 900 &&
+                Number(ssn.slice(3, 5)) !== 0 && Number(ssn.slice(5)) !== 0;
+        },
+        CREDIT_CARD: digits => {
+            let sum = 0;
+            for (let i = 0; i < digits.length; i++) {
+                let digit = Number(digits[digits.length - 1 - i]);
+                if (i % 2 === 1) {
+                    digit *= 2;
+                    if (digit > 9) digit -= 9;
+                }
+                sum += digit;
+            }
+            return sum % 10 === 0;
+        },
+        IP_ADDRESS: address => address.split('.').every(octet => Number(octet) <= 255)
+    };
+
+    function makeDetection(text, type, start, end, method) {
+        return {
+            entity_type: type,
+            entity_text: text.slice(start, end),
+            start,
+            end,
+            confidence: RULES.confidence[method],
+            method
+        };
+    }
+
+    function classifyShape(run) {
+        for (const [type, shape] of digitShapes) {
+            if (!shape.test(run)) continue;
+            if (type === 'IP_ADDRESS') return [type, run];
+            const digits = run.replace(/\D/g, '');
+            if (type === 'CREDIT_CARD' && !cardIssuers.test(digits)) continue;
+            return [type, digits];
+        }
+        return null;
+    }
+
+    function classifyDigitRun(run) {
+        const whole = classifyShape(run);
+        if (whole !== null) return [[whole[0], 0, run.length, whole[1]]];
+
+        const parts = [...run.matchAll(/\S+/g)].map(match => [match.index, match.index + match[0].length]);
+        const candidates = [];
+        let first = 0;
+        while (first < parts.length) {
+            let found = null;
+            let last = Math.min(parts.length, first + RULES.maxRunParts);
+            for (; last > first; last--) {
+                if (first === 0 && last === parts.length) continue;
+                found = classifyShape(run.slice(parts[first][0], parts[last - 1][1]));
+                if (found !== null) break;
+            }
+            if (found !== null) {
+                candidates.push([found[0], parts[first][0], parts[last - 1][1], found[1]]);
+                first = last;
+            } else {
+                first += 1;
+            }
+        }
+        return candidates;
+    }
+
+    function uncoveredParts(run, candidates) {
+        return [...run.matchAll(/\S+/g)]
+            .map(match => [match.index, match.index + match[0].length])
+            .filter(([start, end]) => !candidates.some(([, runStart, runEnd]) => runStart <= start && end <= runEnd));
+    }
+
+    function scanPatterns(text) {
+        const hits = [];
+        const candidates = [];
+        let position = 0;
+
+        for (;;) {
+            patterns.lastIndex = position;
+            const match = patterns.exec(text);
+            if (match === null) break;
+            const start = match.index;
+            const end = start + match[0].length;
+            position = Math.max(end, start + 1);
+
+            const type = RULES.patternGroups.find(name => match.groups[name] !== undefined);
+            if (type !== 'DIGIT_RUN') {
+                hits.push(makeDetection(text, type, start, end, 'regex'));
+                continue;
+            }
+
+            // A part glued to letters or an '@' ("1234abc", "555@host") is not a
+            // number, but the parts before it still are ("123-45-6789 1st floor").
+            const glued = /[A-Za-z0-9_@]/.test(text.charAt(end));
+            const numeric = glued ? match[0].slice(0, match[0].lastIndexOf(' ') + 1).trimEnd() : match[0];
+            const found = numeric ? classifyDigitRun(numeric) : [];
+            for (const [pii_type, runStart, runEnd, value] of found) {
+                candidates.push([pii_type, start + runStart, start + runEnd, value]);
+            }
+
+            // Any part of the run left unclassified may start another hit.
+            let fallbackEnd = start;
+            for (const [partStart] of uncoveredParts(match[0], found)) {
+                if (start + partStart < fallbackEnd) continue;
+                for (const [fallbackType, fallback] of fallbacks) {
+                    fallback.lastIndex = start + partStart;
+                    const fallbackMatch = fallback.exec(text);
+                    if (fallbackMatch !== null) {
+                        fallbackEnd = start + partStart + fallbackMatch[0].length;
+                        hits.push(makeDetection(text, fallbackType, start + partStart, fallbackEnd, 'regex'));
+                        position = Math.max(position, fallbackEnd);
+                        break;
+                    }
+                }
+            }
+        }
+
+        for (const [type, start, end, value] of candidates) {
+            if (validators[type](value)) {
+                hits.push(makeDetection(text, type, start, end, 'regex'));
+            }
+        }
+        return hits;
+    }
+
+    function findNames(text) {
+        const tokens = [];
+        tokenPattern.lastIndex = 0;
+        let match;
+        while ((match = tokenPattern.exec(text)) !== null) {
+            tokens.push([match.index, match.index + match[0].length, match[0]]);
+        }
+
+        const candidates = [];
+        for (let first = 0; first < tokens.length; first++) {
+            let node = nameTrie;
+            for (let last = first; last < tokens.length && last - first < maxNameTokens; last++) {
+                if (last > first && !/^\s+$/.test(text.slice(tokens[last - 1][1], tokens[last][0]))) break;
+                node = node.next.get(tokens[last][2]);
+                if (node === undefined) break;
+                if (node.end) candidates.push([tokens[first][0], tokens[last][1]]);
+            }
+        }
+
+        // Leftmost-longest, as NameGazetteer.find_all resolves overlaps.
+        candidates.sort((a, b) => a[0] - b[0] || b[1] - a[1]);
+        const spans = [];
+        for (const [start, end] of candidates) {
+            if (spans.length === 0 || start >= spans[spans.length - 1][1]) {
+                spans.push([start, end]);
+            }
+        }
+        return spans;
+    }
+
+    function typeRank(type) {
+        const rank = RULES.overlap.typePriority.indexOf(type);
+        return rank === -1 ? RULES.overlap.typePriority.length : rank;
+    }
+
+    const POLICY_KEYS = {
+        confidence: d => [-d.confidence, d.start, -(d.end - d.start), typeRank(d.entity_type)],
+        longest: d => [-(d.end - d.start), -d.confidence, d.start, typeRank(d.entity_type)],
+        type_priority: d => [typeRank(d.entity_type), -d.confidence, -(d.end - d.start), d.start]
+    };
+
+    function compareKeys(a, b) {
+        for (let i = 0; i < a.length; i++) {
+            if (a[i] !== b[i]) return a[i] < b[i] ? -1 : 1;
+        }
+        return 0;
+    }
+
+    function resolveOverlaps(detections) {
+        const key = POLICY_KEYS[RULES.overlap.policy];
+        const ranked = detections.map(d => [key(d), d]).sort((a, b) => compareKeys(a[0], b[0]));
+        const kept = [];
+        for (const [, d] of ranked) {
+            const covered = d.start < d.end && kept.some(k => k.start < k.end && d.start < k.end && k.start < d.end);
+            if (!covered) kept.push(d);
+        }
+        return kept.sort((a, b) => a.start - b.start);
+    }
+
+    function segmentSpans(text) {
+        const spans = [];
+        let start = 0;
+        for (const boundary of text.matchAll(new RegExp(RULES.gate.segmentBoundary, 'g'))) {
+            if (boundary.index > start) spans.push([start, boundary.index]);
+            start = boundary.index + boundary[0].length;
+        }
+        if (start < text.length) spans.push([start, text.length]);
+        return spans;
+    }
+
+    function gateScore(segment) {
+        const words = segment.match(new RegExp(RULES.gate.wordPattern, 'g')) || [];
+        // Sentences start capitalised anyway, so the first word is no signal.
+        let score = words.slice(1).filter(word => /[A-Z]/.test(word[0])).length;
+
+        if (segment.includes('@')) score += 1;
+        const digits = segment.replace(/[^0-9]/g, '').length;
+        if (segment.length > 0 && digits / segment.length >= RULES.gate.digitDensity) score += 1;
+        if (findNames(segment).length > 0) score += 1;
+
+        return score;
+    }
+
+    function canDetectLocally(text) {
+        if (!LOCAL_TEXT.test(text) || RULES.serverOnly) return false;
+        if (RULES.gate === null) return true;
+        return segmentSpans(text).every(([start, end]) => gateScore(text.slice(start, end)) < RULES.gate.threshold);
+    }
+
+    function detect(text) {
+        const names = findNames(text).map(([start, end]) => makeDetection(text, 'PERSON', start, end, 'name_matching'));
+        return resolveOverlaps(scanPatterns(text).concat(names));
+    }
+
+    function analyzePrivacyRisk(detections) {
+        if (detections.length === 0) {
+            return { risk_level: 'LOW', risk_score: 0, message: 'No PII detected' };
+        }
+
+        const types = detections.map(d => d.entity_type);
+        const weights = RULES.risk.weights;
+        const riskScore = types.reduce((sum, type) =>
+            sum + (Object.prototype.hasOwnProperty.call(weights, type) ? weights[type] : RULES.risk.defaultWeight), 0);
+
+        let riskLevel = 'LOW';
+        for (const [level, minScore, minCount] of RULES.risk.levels) {
+            if (riskScore >= minScore || types.length >= minCount) {
+                riskLevel = level;
+                break;
+            }
+        }
+
+        return {
+            risk_level: riskLevel,
+            risk_score: riskScore,
+            pii_count: types.length,
+            detected_types: [...new Set(types)],
+            message: `Detected ${types.length} PII items with ${riskLevel.toLowerCase()} privacy risk`
+        };
+    }
+
+    function redact(text, detections, replacement = '[REDACTED]') {
+        let redacted = text;
+        for (const d of [...detections].sort((a, b) => b.start - a.start)) {
+            redacted = redacted.slice(0, d.start) + replacement + redacted.slice(d.end);
+        }
+        return redacted;
+    }
+
+    const PIIGuardRules = { version: RULES.version, canDetectLocally, detect, analyzePrivacyRisk, redact };
+
+    if (typeof module !== 'undefined' && module.exports) {
+        module.exports = PIIGuardRules;
+    } else {
+        root.PIIGuardRules = PIIGuardRules;
+    }
+})(typeof window !== 'undefined' ? window : this);
+"""
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pii_detector bundle",
+                                     description="Generate the client-side detector bundle from the Python rules")
+    parser.add_argument("--output", help="write the bundle here (default: stdout)")
+    parser.add_argument("--rules", help="rules file, as for PIIDetector(rules_path=...)")
+    parser.add_argument("--names", help="extra gazetteer names file, as for PIIDetector(names_path=...)")
+    parser.add_argument("--overlap-policy", default="confidence")
+    parser.add_argument("--cascade-threshold", type=float, default=None,
+                        help="gate score at which a text needs the server's ML stage (default: no cascade, "
+                             "so every text goes to the server)")
+    parser.add_argument("--no-ml", action="store_true",
+                        help="the server runs regex-only, so every ASCII text can be classified locally")
+    args = parser.parse_args(argv)
+
+    try:
+        detector = PIIDetector(rules_path=args.rules, names_path=args.names, overlap_policy=args.overlap_policy,
+                               cascade_threshold=args.cascade_threshold, enable_ml=False)
+        rules = client_rules(detector, ml_gate=not args.no_ml)
+        bundle = render_client_bundle(rules)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(bundle)
+        else:
+            sys.stdout.write(bundle)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  {e}", file=sys.stderr)
+        return 1
+
+    print(f"✅ Client rules version {rules['version']} ({len(rules['gazetteer']['names'])} names)", file=sys.stderr)
+    return 0
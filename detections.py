@@ -0,0 +1,156 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Compact detection records and a columnar container with a direct JSON writer
+"""
+
+import json
+from array import array
+from typing import Dict, Iterable, Iterator, List
+
+FIELDS = ('entity_type', 'entity_text', 'start', 'end', 'confidence', 'method')
+
+
+class Detection:
+    """
+    One detected entity. Uses __slots__ instead of a per-hit dict, but keeps
+    dict-style access (detection['start'], keys(), to_dict()) so code written
+    against the six-key dicts keeps working.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, entity_type: str, entity_text: str, start: int, end: int,
+                 confidence: float, method: str):
+        self.entity_type = entity_type
+        self.entity_text = entity_text
+        self.start = start
+        self.end = end
+        self.confidence = confidence
+        self.method = method
+
+    def __getitem__(self, key: str):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key not in FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in FIELDS else default
+
+    def keys(self):
+        return FIELDS
+
+    def copy(self) -> "Detection":
+        return Detection(self.entity_type, self.entity_text, self.start, self.end, self.confidence, self.method)
+
+    def shifted(self, offset: int) -> "Detection":
+        return Detection(self.entity_type, self.entity_text, self.start + offset, self.end + offset,
+                         self.confidence, self.method)
+
+    def to_dict(self) -> Dict:
+        return {
+            'entity_type': self.entity_type,
+            'entity_text': self.entity_text,
+            'start': self.start,
+            'end': self.end,
+            'confidence': self.confidence,
+            'method': self.method
+        }
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Detection, dict)):
+            return all(self[field] == other.get(field) for field in FIELDS) and len(other.keys()) == len(FIELDS)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Detection({self.to_dict()!r})"
+
+
+class Detections:
+    """
+    Columnar, read-only set of detections for one text: parallel arrays of
+    starts, ends, type codes, confidences and method codes. Type and method
+    names are stored once per container rather than once per hit.
+    """
+
+    __slots__ = ('starts', 'ends', 'confidences', 'type_codes', 'method_codes', 'entity_texts',
+                 'type_names', 'method_names')
+
+    def __init__(self, detections: Iterable = ()):
+        self.starts = array('q')
+        self.ends = array('q')
+        self.confidences = array('d')
+        self.type_codes = array('H')
+        self.method_codes = array('B')
+        self.entity_texts = []
+        self.type_names = []
+        self.method_names = []
+
+        type_index = {}
+        method_index = {}
+        for detection in detections:
+            entity_type, method = detection['entity_type'], detection['method']
+            if entity_type not in type_index:
+                type_index[entity_type] = len(self.type_names)
+                self.type_names.append(entity_type)
+            if method not in method_index:
+                method_index[method] = len(self.method_names)
+                self.method_names.append(method)
+
+            self.starts.append(detection['start'])
+            self.ends.append(detection['end'])
+            self.confidences.append(detection['confidence'])
+            self.type_codes.append(type_index[entity_type])
+            self.method_codes.append(method_index[method])
+            self.entity_texts.append(detection['entity_text'])
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Detection:
+        return Detection(
+            self.type_names[self.type_codes[index]],
+            self.entity_texts[index],
+            self.starts[index],
+            self.ends[index],
+            self.confidences[index],
+            self.method_names[self.method_codes[index]]
+        )
+
+    def __iter__(self) -> Iterator[Detection]:
+        return (self[index] for index in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.starts, self.ends, self.confidences, self.type_codes, self.method_codes)
+        return sum(column.itemsize * len(column) for column in arrays) + sum(len(text) for text in self.entity_texts)
+
+    def entity_types(self) -> List[str]:
+        return [self.type_names[code] for code in self.type_codes]
+
+    def to_dicts(self) -> List[Dict]:
+        return [detection.to_dict() for detection in self]
+
+    def to_json(self) -> str:
+        """
+        Serialize straight from the columns. Type and method names are
+        JSON-escaped once per container and no per-hit dict is built.
+        """
+        type_names = [json.dumps(name) for name in self.type_names]
+        method_names = [json.dumps(name) for name in self.method_names]
+
+        items = [
+            '{"entity_type":%s,"entity_text":%s,"start":%d,"end":%d,"confidence":%r,"method":%s}' % (
+                type_names[type_code], json.dumps(entity_text), start, end, confidence, method_names[method_code]
+            )
+            for type_code, entity_text, start, end, confidence, method_code in zip(
+                self.type_codes, self.entity_texts, self.starts, self.ends, self.confidences, self.method_codes
+            )
+        ]
+        return "[" + ",".join(items) + "]"
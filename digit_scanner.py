@@ -0,0 +1,157 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Digit-run scanning and checksum validation for numeric PII
+
+Instead of four regexes (PHONE, SSN, CREDIT_CARD, IP_ADDRESS) each rescanning
+the same digits, the pattern scan finds every run of digit groups once. Each
+run is classified by its shape, and the candidates of a whole request or
+batch are then validated together with NumPy: Luhn for cards, SSA area/group/
+serial rules for SSNs, octet ranges for IPv4 and NANP area codes for phones.
+"""
+
+import re
+import unicodedata
+from typing import Collection, List, Optional, Tuple
+
+import numpy as np
+
+DIGIT_TYPES = ('PHONE', 'SSN', 'CREDIT_CARD', 'IP_ADDRESS')
+
+# Digit groups joined by single '-', '.' or ' ' separators, with an optional
+# leading "+1" and "(555)" as in phone numbers.
+DIGIT_RUN_PATTERN = r'(?<![\w.@])(?:\+\d{1,3}[-. ]?)?(?:\(\d{3}\)[-. ]?)?\d+(?:[-.]\d+)*(?: \d+(?:[-.]\d+)*)*'
+
+# Longest stretch of space-separated parts one entity can span ("+1 555 123 4567").
+MAX_RUN_PARTS = 5
+
+SHAPES = (
+    ('IP_ADDRESS', re.compile(r'\d{1,3}(?:\.\d{1,3}){3}')),
+    ('SSN', re.compile(r'\d{3}[-.]?\d{2}[-.]?\d{4}')),
+    ('CREDIT_CARD', re.compile(r'\d{13,19}|\d{4}([- ])\d{4}\1\d{4}\1\d{4}|\d{4}([- ])\d{6}\2\d{5}')),
+    ('PHONE', re.compile(r'(?:\+?1[-. ]?)?(?:\(\d{3}\)|\d{3})[-. ]?\d{3}[-. ]?\d{4}'))
+)
+CARD_ISSUERS = re.compile(r'4\d{12}(?:\d{3})?|5[1-5]\d{14}|3[47]\d{13}|6(?:011|5\d{2})\d{12}')
+NON_DIGITS = re.compile(r'\D')
+
+Candidate = Tuple[str, int, int, str]
+
+
+def ascii_digits(digits: str) -> str:
+    """
+    Map Unicode decimal digits ("５５５", "١٢٣"), which \\d also matches, to
+    ASCII so the validators can treat every candidate as bytes.
+    """
+    if digits.isascii():
+        return digits
+    return "".join(str(unicodedata.decimal(char)) if char.isdecimal() else char for char in digits)
+
+
+def _classify(run: str, types: Collection[str]) -> Optional[Tuple[str, str]]:
+    for pii_type, shape in SHAPES:
+        if pii_type in types and shape.fullmatch(run):
+            if pii_type == 'IP_ADDRESS':
+                return pii_type, ascii_digits(run)
+            digits = ascii_digits(NON_DIGITS.sub('', run))
+            if pii_type == 'CREDIT_CARD' and not CARD_ISSUERS.fullmatch(digits):
+                continue
+            return pii_type, digits
+    return None
+
+
+def classify_digit_run(run: str, types: Collection[str] = DIGIT_TYPES) -> List[Candidate]:
+    """
+    Split a digit run into typed candidates (type, start, end, value), with
+    offsets relative to the run. The value is the dotted address for IPv4
+    and the bare digits otherwise, both in ASCII digits. Runs that join several numbers with spaces
+    ("room 12 555-123-4567") are tried as the longest classifiable stretches
+    of neighbouring parts, left to right. Only shapes of the given types
+    are tried.
+    """
+    whole = _classify(run, types)
+    if whole is not None:
+        return [(whole[0], 0, len(run), whole[1])]
+
+    parts = [(match.start(), match.end()) for match in re.finditer(r'\S+', run)]
+    candidates = []
+    first = 0
+
+    while first < len(parts):
+        for last in range(min(len(parts), first + MAX_RUN_PARTS), first, -1):
+            start, end = parts[first][0], parts[last - 1][1]
+            found = _classify(run[start:end], types) if (first, last) != (0, len(parts)) else None
+            if found is not None:
+                candidates.append((found[0], start, end, found[1]))
+                first = last
+                break
+        else:
+            first += 1
+
+    return candidates
+
+
+def uncovered_parts(run: str, candidates: List[Candidate]) -> List[Tuple[int, int]]:
+    """Spans of the run's space-separated parts that no candidate covers."""
+    return [
+        (match.start(), match.end()) for match in re.finditer(r'\S+', run)
+        if not any(start <= match.start() and match.end() <= end for _, start, end, _ in candidates)
+    ]
+
+
+def _digit_matrix(digit_strings: List[str], width: int) -> np.ndarray:
+    """Right-aligned, zero-padded (n, width) matrix of digit values."""
+    padded = "".join(digits[-width:].rjust(width, '0') for digits in digit_strings)
+    return (np.frombuffer(padded.encode('ascii'), dtype=np.uint8).reshape(-1, width) - ord('0')).astype(np.int16)
+
+
+def luhn_valid(card_numbers: List[str]) -> np.ndarray:
+    # Left zero-padding leaves the Luhn sum unchanged.
+    digits = _digit_matrix(card_numbers, 19)
+    doubled = digits[:, -2::-2] * 2
+    doubled -= 9 * (doubled > 9)
+    return (digits[:, -1::-2].sum(axis=1) + doubled.sum(axis=1)) % 10 == 0
+
+
+def ssn_valid(ssns: List[str]) -> np.ndarray:
+    digits = _digit_matrix(ssns, 9)
+    area = digits[:, 0] * 100 + digits[:, 1] * 10 + digits[:, 2]
+    group = digits[:, 3] * 10 + digits[:, 4]
+    serial = digits[:, 5] * 1000 + digits[:, 6] * 100 + digits[:, 7] * 10 + digits[:, 8]
+    return (area != 0) & (area != 666) & (area < 900) & (group != 0) & (serial != 0)
+
+
+def ipv4_valid(addresses: List[str]) -> np.ndarray:
+    octets = np.array([[int(octet) for octet in address.split('.')] for address in addresses], dtype=np.int32)
+    return (octets <= 255).all(axis=1)
+
+
+def phone_valid(phone_numbers: List[str]) -> np.ndarray:
+    # Drop the "1" country code; NANP area codes never start with 0 or 1.
+    digits = _digit_matrix(phone_numbers, 10)
+    return digits[:, 0] >= 2
+
+
+VALIDATORS = {
+    'PHONE': phone_valid,
+    'SSN': ssn_valid,
+    'CREDIT_CARD': luhn_valid,
+    'IP_ADDRESS': ipv4_valid
+}
+
+
+def validate_digit_candidates(candidates: List[Candidate]) -> np.ndarray:
+    """
+    Validate candidates from any number of texts in one vectorised pass per
+    type. Returns a boolean mask aligned with candidates.
+    """
+    valid = np.zeros(len(candidates), dtype=bool)
+    by_type = {pii_type: [] for pii_type in DIGIT_TYPES}
+    for index, candidate in enumerate(candidates):
+        by_type[candidate[0]].append(index)
+
+    for pii_type, indexes in by_type.items():
+        if indexes:
+            valid[indexes] = VALIDATORS[pii_type]([candidates[i][3] for i in indexes])
+
+    return valid
@@ -0,0 +1,232 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Memory-mapped PII scanning of very large files
+
+The file is mapped read-only and PIIDetector's combined pattern, compiled
+for bytes, runs straight over the mapping in fixed-size windows. Each window
+is extended by an overlap so entities crossing its end are still matched
+whole. The pattern scan carries on from where the previous window stopped,
+and each window keeps only hits starting inside it, so the output does not
+depend on the window size as long as no match is longer than the overlap.
+Nothing is decoded except numeric runs for validation and, when requested,
+the window for name matching or the small regions around hits that are sent
+to the ML stage. Output is byte offsets, lengths and types, never the matched text.
+
+    python -m pii_detector scan server.log --output hits.jsonl
+    python -m pii_detector scan server.log --ml --names
+"""
+
+import argparse
+import json
+import mmap
+import re
+import sys
+from typing import Iterator, List, Optional, Tuple
+
+from detections import Detection
+from digit_scanner import validate_digit_candidates
+from inference_backends import BACKENDS
+from overlap import resolve_overlaps
+
+
+class MappedFileScanner:
+    """
+    Scans a file through mmap with the detector's patterns. Yields Detection
+    records whose start/end are byte offsets and whose entity_text is empty.
+    """
+
+    def __init__(self, detector, window_bytes: int = 8 * 1024 * 1024, overlap_bytes: int = 4096,
+                 include_names: bool = False, ml_pass: bool = False, ml_context_bytes: int = 256,
+                 ml_batch_regions: int = 64):
+        if not 0 < overlap_bytes < window_bytes:
+            raise ValueError("overlap_bytes must be positive and smaller than window_bytes")
+
+        self.detector = detector
+        self.window_bytes = window_bytes
+        self.overlap_bytes = overlap_bytes
+        self.include_names = include_names
+        self.ml_pass = ml_pass
+        self.ml_context_bytes = ml_context_bytes
+        self.ml_batch_regions = ml_batch_regions
+
+        # A scan uses the rules that were live when the scanner was built.
+        # The patterns are ASCII, so the same source compiles for bytes;
+        # \d, \w and \b then match ASCII only, which suits log files.
+        self.rules = detector.rules
+        self.byte_patterns = re.compile(self.rules.compiled_patterns.pattern.encode('ascii'))
+        self.byte_fallbacks = [
+            (pii_type, re.compile(pattern.pattern.encode('ascii')))
+            for pii_type, pattern in self.rules.digit_run_fallbacks
+        ]
+
+    def scan(self, path: str) -> Iterator[Detection]:
+        with open(path, 'rb') as f:
+            if f.seek(0, 2) == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, 'madvise'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                yield from self.scan_buffer(mapped)
+
+    def scan_buffer(self, buffer) -> Iterator[Detection]:
+        """Scan any bytes-like buffer (bytes, mmap) window by window, in offset order."""
+        size = len(buffer)
+        position = 0
+        pending = []
+
+        for window_start in range(0, size, self.window_bytes):
+            window_end = min(window_start + self.window_bytes, size)
+            scan_end = min(window_end + self.overlap_bytes, size)
+
+            hits, position = self._scan_window(buffer, position, window_start, window_end, scan_end)
+            if self.ml_pass and hits:
+                hits += self._ml_hits(buffer, hits, window_start, window_end, scan_end)
+            pending += hits
+
+            # Later windows only add hits starting at or after window_end, so
+            # groups of overlapping hits that end by then are final.
+            final, pending = self._split_final(pending, window_end)
+            yield from resolve_overlaps(final, self.detector.overlap_policy)
+
+        yield from resolve_overlaps(pending, self.detector.overlap_policy)
+
+    @staticmethod
+    def _split_final(hits: List[Detection], bound: int) -> Tuple[List[Detection], List[Detection]]:
+        """Split hits, at a gap between overlapping groups, into those ending by bound and the rest."""
+        hits = sorted(hits, key=lambda hit: hit.start)
+        group_start = 0
+        group_end = 0
+        for index, hit in enumerate(hits):
+            if hit.start >= group_end:
+                if group_end > bound:
+                    break
+                group_start = index
+            group_end = max(group_end, hit.end)
+        else:
+            if group_end <= bound:
+                return hits, []
+        return hits[:group_start], hits[group_start:]
+
+    def _scan_window(self, buffer, position: int, window_start: int, window_end: int,
+                     scan_end: int) -> Tuple[List[Detection], int]:
+        """Hits starting in [window_start, window_end) and where the next window's pattern scan resumes."""
+        hits = []
+        candidates = []
+
+        scan = self.detector._scan_patterns(
+            buffer, candidates, position, scan_end, self.byte_patterns, self.byte_fallbacks, self.rules.digit_types,
+            stop=window_end
+        )
+        while True:
+            try:
+                pii_type, hit_start, hit_end = next(scan)
+            except StopIteration as done:
+                position = done.value
+                break
+            hits.append(Detection(pii_type, '', hit_start, hit_end, 0.95, 'regex'))
+
+        if candidates:
+            for (pii_type, hit_start, hit_end, _), valid in zip(candidates, validate_digit_candidates(candidates)):
+                if valid:
+                    hits.append(Detection(pii_type, '', hit_start, hit_end, 0.95, 'regex'))
+
+        if self.include_names:
+            # Decoding starts an overlap early so the gazetteer sees the same
+            # tokens and name boundaries before window_start as a single scan.
+            # latin-1 maps bytes to characters one to one, so offsets stay byte offsets.
+            text_start = max(0, window_start - self.overlap_bytes)
+            window_text = bytes(buffer[text_start:scan_end]).decode('latin-1')
+            for name_start, name_end in self.rules.name_gazetteer.find_all(window_text):
+                if window_start <= text_start + name_start < window_end:
+                    hits.append(Detection('PERSON', '', text_start + name_start, text_start + name_end, 0.90,
+                                          'name_matching'))
+
+        return hits, position
+
+    def _flagged_regions(self, hits: List[Detection], scan_start: int, scan_end: int) -> List[Tuple[int, int]]:
+        regions = []
+        for hit in hits:
+            start = max(scan_start, hit.start - self.ml_context_bytes)
+            end = min(scan_end, hit.end + self.ml_context_bytes)
+            if regions and start <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+            else:
+                regions.append((start, end))
+        return regions
+
+    def _ml_hits(self, buffer, hits: List[Detection], window_start: int, window_end: int,
+                 scan_end: int) -> List[Detection]:
+        """Second pass: run the ML stage only over the context around regex hits."""
+        ml_hits = []
+        regions = self._flagged_regions(hits, window_start, scan_end)
+
+        for first in range(0, len(regions), self.ml_batch_regions):
+            batch = regions[first:first + self.ml_batch_regions]
+            # surrogateescape round-trips any byte sequence, so character
+            # offsets can be mapped back to exact byte offsets.
+            texts = [bytes(buffer[start:end]).decode('utf-8', 'surrogateescape') for start, end in batch]
+
+            for (region_start, _), text, detections in zip(batch, texts, self.detector.detect_pii_ml_batch(texts)):
+                for detection in detections:
+                    start = region_start + len(text[:detection.start].encode('utf-8', 'surrogateescape'))
+                    end = region_start + len(text[:detection.end].encode('utf-8', 'surrogateescape'))
+                    if window_start <= start < window_end:
+                        ml_hits.append(Detection(detection.entity_type, '', start, end, detection.confidence, 'ml'))
+
+        return ml_hits
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pii_detector scan",
+                                     description="Find PII in a large file by byte offset without loading it into memory")
+    parser.add_argument("path")
+    parser.add_argument("--output", help="write JSONL hit records here (default: stdout)")
+    parser.add_argument("--window-mb", type=float, default=8.0, help="bytes scanned per window, in MB")
+    parser.add_argument("--overlap", type=int, default=4096,
+                        help="bytes each window extends past its end; longest entity matched whole")
+    parser.add_argument("--names", action="store_true", help="also run the name gazetteer (decodes each window)")
+    parser.add_argument("--ml", action="store_true", help="second pass: send regions around hits to the ML stage")
+    parser.add_argument("--ml-context", type=int, default=256, help="bytes of context around each hit for --ml")
+    parser.add_argument("--model-path", default="distilbert-base-uncased")
+    parser.add_argument("--backend", choices=tuple(BACKENDS), default="torch")
+    args = parser.parse_args(argv)
+
+    from pii_detector import PIIDetector
+
+    detector = PIIDetector(model_path=args.model_path, backend=args.backend, enable_ml=args.ml)
+    if args.ml and not detector.is_ml_ready():
+        print("⚠️  ML stage unavailable; continuing with regex only", file=sys.stderr)
+
+    try:
+        scanner = MappedFileScanner(
+            detector,
+            window_bytes=int(args.window_mb * 1024 * 1024),
+            overlap_bytes=args.overlap,
+            include_names=args.names,
+            ml_pass=args.ml and detector.is_ml_ready(),
+            ml_context_bytes=args.ml_context
+        )
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        count = 0
+        try:
+            for hit in scanner.scan(args.path):
+                out.write(json.dumps({
+                    'offset': hit.start,
+                    'length': hit.end - hit.start,
+                    'type': hit.entity_type,
+                    'method': hit.method,
+                    'confidence': round(hit.confidence, 4)
+                }))
+                out.write("\n")
+                count += 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    except (OSError, ValueError) as e:
+        print(f"⚠️  {e}", file=sys.stderr)
+        return 1
+
+    print(f"✅ {count} PII hits in {args.path}", file=sys.stderr)
+    return 0
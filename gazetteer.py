@@ -0,0 +1,147 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Aho-Corasick gazetteer used for dictionary-based name detection
+"""
+
+import hashlib
+import re
+from collections import deque
+from typing import Iterable, Iterator, List, Tuple
+
+# Names and text are split into the same word tokens, so "O'Brien" and
+# "Mary-Jane" are single tokens and every match lands on word boundaries.
+# A possessive "'s" is not part of the token, so "Smith's" still reads "Smith".
+TOKEN_PATTERN = re.compile(r"\w+(?:-\w+|'(?![sS]\b)\w+)*")
+
+
+class NameGazetteer:
+    """
+    Multi-pattern matcher over word tokens. The automaton is built once and
+    finds every occurrence of every name in one linear pass over the text,
+    which keeps lookups cheap even for gazetteers with 100k+ entries.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self.max_tokens = 0
+        self.size = 0
+        self._digest = hashlib.sha256()
+
+        for name in names:
+            self._add(name)
+        self._build_failure_links()
+
+        # Identifies the name set, e.g. for keying cached detection results.
+        self.fingerprint = self._digest.hexdigest()
+
+    @classmethod
+    def from_file(cls, path: str, names: Iterable[str] = ()) -> "NameGazetteer":
+        """Load one name per line; blank lines and '#' comments are skipped."""
+        def iter_names():
+            yield from names
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        yield line
+
+        return cls(iter_names())
+
+    def __len__(self) -> int:
+        return self.size
+
+    def names(self) -> Iterator[Tuple[str, ...]]:
+        """Yield every name as its tuple of word tokens, in no particular order."""
+        stack = [(0, ())]
+        while stack:
+            node, tokens = stack.pop()
+            # Outputs inherited through failure links are shorter than the
+            # node's depth, so a match of full depth marks a name ending here.
+            if tokens and len(tokens) in self._out[node]:
+                yield tokens
+            for token, child in self._goto[node].items():
+                stack.append((child, tokens + (token,)))
+
+    def _add(self, name: str):
+        tokens = TOKEN_PATTERN.findall(name)
+        if not tokens:
+            return
+
+        node = 0
+        for token in tokens:
+            next_node = self._goto[node].get(token)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][token] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = next_node
+
+        if not self._out[node]:
+            self._digest.update("\0".join(tokens).encode("utf-8") + b"\n")
+            self._out[node] = (len(tokens),)
+            self.size += 1
+            self.max_tokens = max(self.max_tokens, len(tokens))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(token, 0)
+
+                self._fail[child] = fail
+                if self._out[fail]:
+                    self._out[child] = self._out[child] + self._out[fail]
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Return (start, end) spans of every gazetteer name in the text.
+        Overlapping hits are resolved leftmost-longest, so "Sarah Johnson"
+        is reported once rather than also as "Sarah".
+        """
+        if not self.size:
+            return []
+
+        candidates = []
+        token_starts = deque(maxlen=self.max_tokens)
+        node = 0
+        last_end = 0
+
+        for match in TOKEN_PATTERN.finditer(text):
+            start, end = match.span()
+            token = match.group()
+
+            # Names only continue across plain whitespace.
+            if start > last_end and not text[last_end:start].isspace():
+                node = 0
+                token_starts.clear()
+            last_end = end
+            token_starts.append(start)
+
+            while node and token not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(token, 0)
+
+            for length in self._out[node]:
+                candidates.append((token_starts[-length], end))
+
+        candidates.sort(key=lambda span: (span[0], -span[1]))
+
+        spans = []
+        for start, end in candidates:
+            if not spans or start >= spans[-1][1]:
+                spans.append((start, end))
+
+        return spans
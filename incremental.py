@@ -0,0 +1,265 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Incremental re-analysis for live-typing clients
+
+A session holds the current text and its detections. Each edit delta
+(offset, deleted length, inserted text) is applied to the text, only the
+sentence window around the edit is re-detected, and detections outside it
+are shifted. Callers receive a diff (detection ids removed and detections
+added) rather than the full list; untouched detections keep their ids and
+move by the same deltas the client already applied. A session keeps the
+rule snapshot it was scanned with; after a rules reload its next edit
+rescans the whole text with the new one.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from cascade import SEGMENT_BOUNDARY
+from detections import Detection
+
+# Sentences on each side of an edit that are re-detected with it, so
+# entities spanning a sentence boundary are still found whole.
+CONTEXT_SEGMENTS = 1
+
+
+class VersionConflict(Exception):
+    """The edits were made against a version the session has moved past."""
+
+
+def _segment_start(text: str, position: int, segments: int) -> int:
+    """Start of the sentence containing position, moved back by segments sentences."""
+    for _ in range(segments + 1):
+        lookback = 256
+        while True:
+            window_start = max(0, position - lookback)
+            boundaries = list(SEGMENT_BOUNDARY.finditer(text, window_start, position))
+            if boundaries or window_start == 0:
+                break
+            lookback *= 4
+        if not boundaries:
+            return 0
+        position = boundaries[-1].start()
+        start = boundaries[-1].end()
+    return start
+
+
+def _segment_end(text: str, position: int, segments: int) -> int:
+    """End of the sentence containing position, moved forward by segments sentences."""
+    for _ in range(segments + 1):
+        boundary = SEGMENT_BOUNDARY.search(text, position)
+        if boundary is None:
+            return len(text)
+        end = boundary.start()
+        position = boundary.end()
+    return end
+
+
+def _first_index(entries: List[Tuple[int, Detection]], predicate, low: int = 0) -> int:
+    """Binary search for the first entry whose detection satisfies a monotonic predicate."""
+    high = len(entries)
+    while low < high:
+        middle = (low + high) // 2
+        if predicate(entries[middle][1]):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+class IncrementalSession:
+    def __init__(self, detector, text: str):
+        self.detector = detector
+        self.text = text
+        self.version = 0
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+        self._next_id = 0
+        self.rules = detector.rules
+        self.entries = self._with_ids(list(detector.detect_columnar([text], rules=self.rules)[0]))
+
+    def _with_ids(self, detections: List[Detection]) -> List[Tuple[int, Detection]]:
+        entries = []
+        for detection in detections:
+            entries.append((self._next_id, detection))
+            self._next_id += 1
+        return entries
+
+    def detections(self) -> List[Dict]:
+        return [dict(detection.to_dict(), id=entry_id) for entry_id, detection in self.entries]
+
+    def apply_edits(self, edits: List[Dict], base_version: Optional[int] = None) -> Dict:
+        """
+        Apply edits in order and return {'version', 'removed', 'added'}.
+        Offsets of each edit refer to the text after the previous one.
+        """
+        if base_version is not None and base_version != self.version:
+            raise VersionConflict(f"Session is at version {self.version}, edits were made against {base_version}")
+
+        previous_ids = {entry_id for entry_id, _ in self.entries}
+        rules = self.detector.rules
+        if rules is self.rules:
+            for edit in edits:
+                self._apply_edit(*self._parse_edit(edit))
+        else:
+            try:
+                for edit in edits:
+                    offset, deleted, inserted = self._parse_edit(edit)
+                    self.text = self.text[:offset] + inserted + self.text[offset + deleted:]
+            finally:
+                self.rules = rules
+                self.entries = self._with_ids(list(self.detector.detect_columnar([self.text], rules=rules)[0]))
+        self.version += 1
+        self.last_used = time.monotonic()
+
+        current_ids = {entry_id for entry_id, _ in self.entries}
+        return {
+            'version': self.version,
+            'removed': sorted(previous_ids - current_ids),
+            'added': [
+                dict(detection.to_dict(), id=entry_id)
+                for entry_id, detection in self.entries if entry_id not in previous_ids
+            ]
+        }
+
+    def _pattern_spans(self) -> List[Tuple[int, int]]:
+        """(start, end) of every raw pattern hit and numeric candidate in the text."""
+        candidates = []
+        spans = [
+            (start, end) for _, start, end in self.detector._scan_patterns(
+                self.text, candidates, patterns=self.rules.compiled_patterns,
+                fallbacks=self.rules.digit_run_fallbacks, digit_types=self.rules.digit_types
+            )
+        ]
+        spans.extend((start, end) for _, start, end, _ in candidates)
+        return spans
+
+    def _parse_edit(self, edit: Dict) -> Tuple[int, int, str]:
+        offset = edit.get('offset')
+        deleted = edit.get('delete', 0)
+        inserted = edit.get('insert', '')
+        # bool is an int subclass, but true/false are not offsets.
+        if (not isinstance(offset, int) or isinstance(offset, bool) or not isinstance(deleted, int)
+                or isinstance(deleted, bool) or not isinstance(inserted, str)):
+            raise ValueError("Each edit needs an integer 'offset', an integer 'delete' and a string 'insert'")
+        if offset < 0 or deleted < 0 or offset + deleted > len(self.text):
+            raise ValueError(f"Edit ({offset}, {deleted}) is outside the text of length {len(self.text)}")
+        return offset, deleted, inserted
+
+    def _apply_edit(self, offset: int, deleted: int, inserted: str):
+        self.text = self.text[:offset] + inserted + self.text[offset + deleted:]
+        entries = self.entries
+
+        # Detections are disjoint and sorted by start, so their ends are
+        # sorted too. Drop the ones the edit cut into and shift the rest
+        # in place; only the tail after the edit is touched.
+        first_touched = _first_index(entries, lambda detection: detection.end > offset)
+        first_after = _first_index(entries, lambda detection: detection.start >= offset + deleted, first_touched)
+        delta = len(inserted) - deleted
+
+        # The dirty window must cover whatever the dropped detections spanned
+        # (in the edited text), or a surviving part of one is never rescanned.
+        touched_start, touched_end = offset, offset + len(inserted)
+        if first_touched < first_after:
+            touched_start = min(touched_start, entries[first_touched][1].start)
+            last_end = entries[first_after - 1][1].end
+            if last_end > offset + deleted:
+                touched_end = last_end + delta
+
+        if delta:
+            for index in range(first_after, len(entries)):
+                detection = entries[index][1]
+                detection.start += delta
+                detection.end += delta
+        del entries[first_touched:first_after]
+
+        # Grow the dirty window to whole sentences, plus any detection or raw
+        # pattern hit that reaches into it, until it is stable. Raw hits come
+        # from the whole text because some patterns (ADDRESS) run across lines.
+        dirty_start = _segment_start(self.text, touched_start, CONTEXT_SEGMENTS)
+        dirty_end = _segment_end(self.text, touched_end, CONTEXT_SEGMENTS)
+        spans = self._pattern_spans()
+        low = high = first_touched
+        while True:
+            while low > 0 and entries[low - 1][1].end > dirty_start:
+                low -= 1
+            while high < len(entries) and entries[high][1].start < dirty_end:
+                high += 1
+            reach_start, reach_end = dirty_start, dirty_end
+            if low < high:
+                reach_start = min(reach_start, entries[low][1].start)
+                reach_end = max(reach_end, entries[high - 1][1].end)
+            for start, end in spans:
+                if start < dirty_end and end > dirty_start:
+                    reach_start = min(reach_start, start)
+                    reach_end = max(reach_end, end)
+            if reach_start >= dirty_start and reach_end <= dirty_end:
+                break
+            dirty_start = _segment_start(self.text, reach_start, 0)
+            dirty_end = _segment_end(self.text, reach_end, 0)
+
+        dropped = {
+            (detection.entity_type, detection.start, detection.end): entry_id
+            for entry_id, detection in entries[low:high]
+        }
+        rescanned = []
+        for detection in self.detector.detect_columnar([self.text[dirty_start:dirty_end]], rules=self.rules)[0]:
+            detection = detection.shifted(dirty_start)
+            # A detection found again unchanged keeps its id, so it is not in the diff.
+            entry_id = dropped.pop((detection.entity_type, detection.start, detection.end), None)
+            if entry_id is None:
+                entry_id = self._next_id
+                self._next_id += 1
+            rescanned.append((entry_id, detection))
+
+        entries[low:high] = rescanned
+
+
+class SessionStore:
+    """
+    Sessions by id, bounded in count and expired after ttl_seconds idle.
+    Sessions hold prompt text, so they are kept in memory only.
+    """
+
+    def __init__(self, detector, max_sessions: int = 1000, ttl_seconds: float = 600.0):
+        self.detector = detector
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, text: str) -> Tuple[str, IncrementalSession]:
+        session = IncrementalSession(self.detector, text)
+        session_id = secrets.token_urlsafe(16)
+        with self._lock:
+            self._expire()
+            self._sessions[session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session_id, session
+
+    def get(self, session_id: str) -> Optional[IncrementalSession]:
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_used > cutoff:
+                break
+            del self._sessions[session_id]
@@ -0,0 +1,123 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Inference backends for the NER model behind PIIDetector.detect_pii_ml
+
+Every backend returns a transformers token-classification pipeline, so the
+windowing, batching and entity mapping in PIIDetector work unchanged:
+
+    torch      eager PyTorch (the original behaviour)
+    compile    the same model with its forward compiled by torch.compile
+    onnx-int8  an exported, dynamically int8-quantized ONNX Runtime session
+
+Export the ONNX artifacts once per node with:
+
+    python inference_backends.py export --cache-dir ~/.cache/pii_guard
+"""
+
+import argparse
+import os
+from typing import Callable, Dict
+
+NER_MODEL_NAME = "dbmdz/bert-large-cased-finetuned-conll03-english"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pii_guard")
+ONNX_FP32_FILE = "model.onnx"
+ONNX_INT8_FILE = "model_quantized.onnx"
+
+
+def _artifact_dir(model_name: str, cache_dir: str, variant: str) -> str:
+    return os.path.join(cache_dir, model_name.replace("/", "--"), variant)
+
+
+def _ner_pipeline(model, tokenizer):
+    from transformers import pipeline
+
+    return pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+
+
+def load_torch_pipeline(model_name: str = NER_MODEL_NAME, cache_dir: str = DEFAULT_CACHE_DIR):
+    from transformers import pipeline
+
+    return pipeline("ner", model=model_name, aggregation_strategy="simple")
+
+
+def load_compiled_pipeline(model_name: str = NER_MODEL_NAME, cache_dir: str = DEFAULT_CACHE_DIR):
+    import torch
+    from transformers import AutoModelForTokenClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForTokenClassification.from_pretrained(model_name).eval()
+    # Compile forward rather than wrapping the module, so the pipeline still
+    # sees a PreTrainedModel. Sequence lengths vary per request, so compile
+    # for dynamic shapes instead of recompiling for every new length.
+    model.forward = torch.compile(model.forward, dynamic=True)
+    return _ner_pipeline(model, tokenizer)
+
+
+def load_onnx_int8_pipeline(model_name: str = NER_MODEL_NAME, cache_dir: str = DEFAULT_CACHE_DIR):
+    from optimum.onnxruntime import ORTModelForTokenClassification
+    from transformers import AutoTokenizer
+
+    int8_dir = _artifact_dir(model_name, cache_dir, "onnx-int8")
+    if not os.path.exists(os.path.join(int8_dir, ONNX_INT8_FILE)):
+        export_onnx_int8(model_name, cache_dir)
+
+    tokenizer = AutoTokenizer.from_pretrained(int8_dir)
+    model = ORTModelForTokenClassification.from_pretrained(int8_dir, file_name=ONNX_INT8_FILE)
+    return _ner_pipeline(model, tokenizer)
+
+
+def export_onnx_int8(model_name: str = NER_MODEL_NAME, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """
+    Export the model to ONNX and apply dynamic int8 weight quantization.
+    Artifacts are cached under cache_dir and reused on later loads.
+    """
+    from optimum.onnxruntime import ORTModelForTokenClassification
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoConfig, AutoTokenizer
+
+    fp32_dir = _artifact_dir(model_name, cache_dir, "onnx")
+    int8_dir = _artifact_dir(model_name, cache_dir, "onnx-int8")
+    os.makedirs(int8_dir, exist_ok=True)
+
+    if not os.path.exists(os.path.join(fp32_dir, ONNX_FP32_FILE)):
+        ORTModelForTokenClassification.from_pretrained(model_name, export=True).save_pretrained(fp32_dir)
+
+    quantize_dynamic(
+        os.path.join(fp32_dir, ONNX_FP32_FILE),
+        os.path.join(int8_dir, ONNX_INT8_FILE),
+        weight_type=QuantType.QInt8
+    )
+    AutoConfig.from_pretrained(model_name).save_pretrained(int8_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(int8_dir)
+
+    print(f"✅ Exported int8 ONNX model to {int8_dir}")
+    return int8_dir
+
+
+BACKENDS: Dict[str, Callable] = {
+    "torch": load_torch_pipeline,
+    "compile": load_compiled_pipeline,
+    "onnx-int8": load_onnx_int8_pipeline
+}
+
+
+def load_ner_pipeline(backend: str = "torch", model_name: str = NER_MODEL_NAME,
+                      cache_dir: str = DEFAULT_CACHE_DIR):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[backend](model_name, cache_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prepare PII Guard inference backends")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export and int8-quantize the NER model for ONNX Runtime")
+    export_parser.add_argument("--model", default=NER_MODEL_NAME)
+    export_parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+
+    args = parser.parse_args()
+    if args.command == "export":
+        export_onnx_int8(args.model, args.cache_dir)
@@ -0,0 +1,332 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+In-process counters and latency histograms in Prometheus text format
+
+PIIDetector records stage durations, texts, bytes, detections per type,
+cache lookups and ML fallbacks here; app.py adds request counts and serves
+everything at /metrics. Values are kept per process; under prefork.py each
+worker also writes them to a shared directory and /metrics on any worker
+reports the sum over all of them.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+# (process is alive, {label values: value}) for one process's copy of a metric.
+Snapshot = Tuple[bool, Dict[Tuple[str, ...], object]]
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    metric_type = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], object]:
+        with self._lock:
+            return dict(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def merge(self, snapshots: List[Snapshot]) -> Dict[Tuple[str, ...], object]:
+        """Totals over every process, dead ones included, so counters never go backwards."""
+        merged = {}
+        for _, values in snapshots:
+            for key, value in values.items():
+                merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def samples(self, values: Optional[Dict[Tuple[str, ...], object]] = None) -> List[Sample]:
+        values = self.values() if values is None else values
+        return [
+            (self.name, dict(zip(self.label_names, key)), value)
+            for key, value in sorted(values.items())
+        ]
+
+
+class Gauge(Counter):
+    """
+    A value that is set rather than counted. Across processes only live
+    ones count, combined by multiprocess_mode: 'sum', 'min' or 'max'.
+    """
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (), multiprocess_mode: str = "sum"):
+        if multiprocess_mode not in ("sum", "min", "max"):
+            raise ValueError(f"Unknown multiprocess_mode '{multiprocess_mode}'")
+        super().__init__(name, help_text, label_names)
+        self.multiprocess_mode = multiprocess_mode
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def merge(self, snapshots: List[Snapshot]) -> Dict[Tuple[str, ...], object]:
+        combine = {"sum": lambda a, b: a + b, "min": min, "max": max}[self.multiprocess_mode]
+        merged = {}
+        for alive, values in snapshots:
+            if not alive:
+                continue
+            for key, value in values.items():
+                merged[key] = combine(merged[key], value) if key in merged else value
+        return merged
+
+
+class Histogram(Counter):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def values(self) -> Dict[Tuple[str, ...], object]:
+        with self._lock:
+            return {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+
+    def merge(self, snapshots: List[Snapshot]) -> Dict[Tuple[str, ...], object]:
+        merged = {}
+        for _, values in snapshots:
+            for key, (counts, total) in values.items():
+                merged_counts, merged_total = merged.get(key, ([0] * len(self.buckets), 0.0))
+                merged[key] = ([a + b for a, b in zip(merged_counts, counts)], merged_total + total)
+        return merged
+
+    def samples(self, values: Optional[Dict[Tuple[str, ...], object]] = None) -> List[Sample]:
+        values = self.values() if values is None else values
+        samples = []
+        for key, (counts, total) in sorted(values.items()):
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", dict(labels, le=_format_value(bound)), cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Holds metrics in registration order and renders the text exposition
+    format. With a multiprocess_dir, every process writes its values to
+    <dir>/<pid>.json (on render and from a flush thread) and render()
+    reports the values merged over all the files.
+    """
+
+    def __init__(self, multiprocess_dir: Optional[str] = None):
+        self._metrics = []
+        self.multiprocess_dir = multiprocess_dir
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = (),
+              multiprocess_mode: str = "sum") -> Gauge:
+        return self._register(Gauge(name, help_text, label_names, multiprocess_mode))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def clear(self):
+        """Drop every value, e.g. the ones a forked worker inherited from its parent."""
+        for metric in self._metrics:
+            metric.clear()
+
+    def write_snapshot(self):
+        """Atomically replace this process's file in multiprocess_dir with its current values."""
+        snapshot = {
+            metric.name: [[list(key), value] for key, value in metric.values().items()] for metric in self._metrics
+        }
+        path = os.path.join(self.multiprocess_dir, f"{os.getpid()}.json")
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(temporary, path)
+
+    def start_flushing(self, interval: float = 1.0, before_flush: Optional[Callable[[], None]] = None):
+        """Write this process's snapshot every interval seconds from a daemon thread."""
+        def flush_forever():
+            while True:
+                time.sleep(interval)
+                try:
+                    if before_flush is not None:
+                        before_flush()
+                    self.write_snapshot()
+                except Exception as e:
+                    print(f"⚠️  Could not write metrics snapshot: {e}")
+
+        thread = threading.Thread(target=flush_forever, name="metrics-flush", daemon=True)
+        thread.start()
+        return thread
+
+    def _read_snapshots(self) -> List[Tuple[bool, Dict]]:
+        snapshots = []
+        for entry in os.scandir(self.multiprocess_dir):
+            pid, extension = os.path.splitext(entry.name)
+            if extension != ".json" or not pid.isdigit():
+                continue
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            snapshots.append((_pid_alive(int(pid)), {
+                name: {tuple(key): value for key, value in values} for name, values in data.items()
+            }))
+        return snapshots
+
+    def render(self) -> str:
+        if self.multiprocess_dir is None:
+            values = {metric.name: metric.values() for metric in self._metrics}
+        else:
+            self.write_snapshot()
+            snapshots = self._read_snapshots()
+            values = {
+                metric.name: metric.merge([(alive, data.get(metric.name, {})) for alive, data in snapshots])
+                for metric in self._metrics
+            }
+
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            for name, labels, value in metric.samples(values[metric.name]):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    "pii_guard_stage_duration_seconds",
+    "Time spent per call in each detection stage.",
+    ["stage"]
+)
+TEXTS_PROCESSED = REGISTRY.counter(
+    "pii_guard_texts_processed_total",
+    "Texts passed to detection, including cache hits."
+)
+BYTES_PROCESSED = REGISTRY.counter(
+    "pii_guard_bytes_processed_total",
+    "UTF-8 bytes of text passed to detection."
+)
+DETECTIONS = REGISTRY.counter(
+    "pii_guard_detections_total",
+    "Detections returned, by entity type.",
+    ["entity_type"]
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "pii_guard_cache_lookups_total",
+    "Result cache lookups by outcome.",
+    ["result"]
+)
+ML_FALLBACKS = REGISTRY.counter(
+    "pii_guard_ml_fallbacks_total",
+    "Texts detected without the ML stage, by reason (loading, failed, disabled, error).",
+    ["reason"]
+)
+REQUESTS = REGISTRY.counter(
+    "pii_guard_requests_total",
+    "HTTP requests by endpoint and status code.",
+    ["endpoint", "status"]
+)
+REQUEST_DURATION = REGISTRY.histogram(
+    "pii_guard_request_duration_seconds",
+    "HTTP request handling time by endpoint.",
+    ["endpoint"]
+)
+ML_READY = REGISTRY.gauge(
+    "pii_guard_ml_ready",
+    "1 once the ML stage is loaded (in every worker), 0 while detection is regex-only.",
+    multiprocess_mode="min"
+)
+RESULT_CACHE = REGISTRY.gauge(
+    "pii_guard_result_cache",
+    "Result cache state when enabled: entries, bytes, max_bytes and cumulative hits, misses, evictions, expirations.",
+    ["stat"]
+)
+CASCADE = REGISTRY.gauge(
+    "pii_guard_cascade",
+    "Cascade gate totals when enabled: segments and chars seen, sent to the ML stage and skipped.",
+    ["stat"]
+)
+
+
+def stage_timer(stage: str):
+    """Context manager observing the wrapped block into STAGE_DURATION."""
+    return STAGE_DURATION.time(stage=stage)
@@ -0,0 +1,93 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Overlap resolution for detections coming from regex, gazetteer and ML stages
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Sequence
+
+DEFAULT_TYPE_PRIORITY = (
+    'SSN', 'CREDIT_CARD', 'EMAIL', 'PHONE', 'IP_ADDRESS', 'ADDRESS',
+    'PERSON', 'ORGANIZATION', 'LOCATION', 'OTHER'
+)
+
+
+def _policy_keys(type_priority: Sequence[str]) -> Dict:
+    rank = {entity_type: index for index, entity_type in enumerate(type_priority)}
+
+    def type_rank(detection: Dict) -> int:
+        return rank.get(detection['entity_type'], len(rank))
+
+    def length(detection: Dict) -> int:
+        return detection['end'] - detection['start']
+
+    return {
+        # Ties fall back to the earliest span, as the old pairwise dedup did.
+        'confidence': lambda d: (-d['confidence'], d['start'], -length(d), type_rank(d)),
+        'longest': lambda d: (-length(d), -d['confidence'], d['start'], type_rank(d)),
+        'type_priority': lambda d: (type_rank(d), -d['confidence'], -length(d), d['start'])
+    }
+
+
+OVERLAP_POLICIES = tuple(_policy_keys(DEFAULT_TYPE_PRIORITY))
+
+
+class _CoverageTree:
+    """Fenwick tree counting covered elementary segments between span endpoints."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def mark(self, index: int):
+        index += 1
+        while index <= self.size:
+            self.tree[index] += 1
+            index += index & -index
+
+    def prefix(self, index: int) -> int:
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    def covered(self, first: int, last: int) -> bool:
+        return self.prefix(last) - self.prefix(first) > 0
+
+
+def resolve_overlaps(detections: List[Dict], policy: str = 'confidence',
+                     type_priority: Sequence[str] = DEFAULT_TYPE_PRIORITY) -> List[Dict]:
+    """
+    Keep a non-overlapping subset of detections, sorted by start. Candidates
+    are taken best-first under the policy ('confidence', 'longest' or
+    'type_priority') and kept unless they overlap an already kept span.
+
+    Endpoints are coordinate-compressed and coverage is tracked in a Fenwick
+    tree. Each elementary segment is marked at most once, because kept spans
+    are disjoint, so the whole pass is O(n log n) however the spans nest.
+    """
+    if not detections:
+        return []
+
+    keys = _policy_keys(type_priority)
+    if policy not in keys:
+        raise ValueError(f"Unknown overlap policy '{policy}'. Choose from: {', '.join(keys)}")
+
+    points = sorted({d['start'] for d in detections} | {d['end'] for d in detections})
+    coverage = _CoverageTree(len(points))
+    kept = []
+
+    for detection in sorted(detections, key=keys[policy]):
+        first = bisect_left(points, detection['start'])
+        last = bisect_left(points, detection['end'])
+        if coverage.covered(first, last):
+            continue
+        for segment in range(first, last):
+            coverage.mark(segment)
+        kept.append(detection)
+
+    kept.sort(key=lambda d: d['start'])
+    return kept
@@ -5,202 +5,762 @@ Copyright (c) 2025 Privacy Innovation Team
 Main PII detection model implementation using fine-tuned DistilBERT
 """
 
-import re
-import torch
-from transformers import (
-    DistilBertTokenizerFast, 
-    DistilBertForTokenClassification,
-    pipeline
-)
-from typing import List, Dict, Tuple
+import threading
+from collections import Counter
+from typing import List, Dict, Tuple, Pattern, Optional, Iterable, Iterator, Generator, Mapping, Union
+from rules import RuleSnapshot
+from result_cache import DetectionCache, cache_key
+from cascade import CascadeGate
+from detections import Detection, Detections
+from metrics import BYTES_PROCESSED, CACHE_LOOKUPS, DETECTIONS, ML_FALLBACKS, TEXTS_PROCESSED, stage_timer
+from digit_scanner import classify_digit_run, uncovered_parts, validate_digit_candidates
+from overlap import OVERLAP_POLICIES, resolve_overlaps
+from redaction import RedactionStrategy, Replacer, assemble_redacted_text, make_replacer
+from inference_backends import BACKENDS, DEFAULT_CACHE_DIR, NER_MODEL_NAME, load_ner_pipeline
 import warnings
 warnings.filterwarnings("ignore")
 
+REGEX_CONFIDENCE = 0.95
+NAME_CONFIDENCE = 0.90
+
+# (level, minimum total weight, minimum detection count), highest first;
+# anything below the last entry is LOW.
+RISK_LEVELS = (('HIGH', 8, 5), ('MEDIUM', 4, 3))
+
 class PIIDetector:
     """
     A privacy-first PII detection system that runs entirely on-device
     to protect user prompts before sending to cloud LLM services.
     """
 
-    def __init__(self, model_path: str = "distilbert-base-uncased"):
+    def __init__(self, model_path: str = "distilbert-base-uncased", names_path: Optional[str] = None,
+                 batch_size: int = 8, ml_window_tokens: int = 500, ml_stride: int = 100,
+                 cache_max_bytes: int = 0, cache_ttl: float = 300.0, load_async: bool = False,
+                 backend: str = "torch", backend_cache_dir: str = DEFAULT_CACHE_DIR,
+                 cascade_threshold: Optional[float] = None, overlap_policy: str = "confidence",
+                 enable_ml: bool = True, rules_path: Optional[str] = None):
+        if not 0 <= ml_stride < ml_window_tokens:
+            raise ValueError("ml_stride must be smaller than ml_window_tokens")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+        if overlap_policy not in OVERLAP_POLICIES:
+            raise ValueError(f"Unknown overlap policy '{overlap_policy}'. Choose from: {', '.join(OVERLAP_POLICIES)}")
+
         self.model_path = model_path
+        self.batch_size = batch_size
+        self.ml_window_tokens = ml_window_tokens
+        self.ml_stride = ml_stride
+        self.backend = backend
+        self.backend_cache_dir = backend_cache_dir
+        self.overlap_policy = overlap_policy
         self.tokenizer = None
         self.model = None
         self.pii_pipeline = None
-        self.load_model()
-
-        self.pii_patterns = {
-            'EMAIL': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            'PHONE': r'\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})\b',
-            'SSN': r'\b(?!000|666|9\d{2})\d{3}[-.]?(?!00)\d{2}[-.]?(?!0000)\d{4}\b',
-            'CREDIT_CARD': r'\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12})\b',
-            'IP_ADDRESS': r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b',
-            'ADDRESS': r'\b\d+\s+[A-Za-z0-9\s,]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)\b'
-        }
-
-        self.common_names = [
-            "John Smith", "Sarah Johnson", "Michael Davis", "Emily Chen", "Robert Williams",
-            "Lisa Thompson", "David Wilson", "Maria Garcia", "James Brown", "Jennifer Lee",
-            "Amanda Rodriguez", "Christopher Taylor", "Michelle Anderson", "Daniel Thomas",
-            "Jessica Martinez", "Matthew Jackson", "Ashley White", "Joshua Harris", "Sarah"
-        ]
+        self.ml_status = "loading"
+        self.model_loaded = threading.Event()
+
+        # Patterns, names and risk weights live in an immutable snapshot.
+        # reload_rules() swaps in a new one from rules_path without touching
+        # the model; each detection pass keeps the snapshot it started with.
+        self.rules_path = rules_path
+        self.names_path = names_path
+        if rules_path:
+            self.rules = RuleSnapshot.from_file(rules_path, names_path)
+        else:
+            self.rules = RuleSnapshot(names_path=names_path)
+
+        # Opt-in: with a threshold set, only segments with some PII signal
+        # are sent to the ML stage.
+        self.cascade_gate = None
+        if cascade_threshold is not None:
+            self.cascade_gate = CascadeGate(cascade_threshold, gazetteer=self.rules.name_gazetteer)
+
+        # Opt-in: cache_max_bytes=0 leaves result caching off.
+        self.result_cache = DetectionCache(cache_max_bytes, cache_ttl) if cache_max_bytes > 0 else None
+
+        # Regex detection works immediately; with load_async the ML stage
+        # joins in once the background load finishes.
+        if not enable_ml:
+            self.ml_status = "disabled"
+            self.model_loaded.set()
+        elif load_async:
+            threading.Thread(target=self.load_model, name="pii-model-loader", daemon=True).start()
+        else:
+            self.load_model()
 
     def load_model(self):
         try:
+            # torch/transformers are imported here so that importing this
+            # module, and regex-only detection, stay fast.
+            from transformers import (
+                DistilBertTokenizerFast,
+                DistilBertForTokenClassification
+            )
+
             if "fine_tuned" in self.model_path:
                 self.tokenizer = DistilBertTokenizerFast.from_pretrained(self.model_path)
                 self.model = DistilBertForTokenClassification.from_pretrained(self.model_path)
             else:
-                self.pii_pipeline = pipeline(
-                    "ner", 
-                    model="dbmdz/bert-large-cased-finetuned-conll03-english",
-                    aggregation_strategy="simple"
-                )
-            print(f"✅ Model loaded successfully: {self.model_path}")
+                self.pii_pipeline = load_ner_pipeline(self.backend, NER_MODEL_NAME, self.backend_cache_dir)
+            self.ml_status = "ready"
+            print(f"✅ Model loaded successfully: {self.model_path} ({self.backend} backend)")
         except Exception as e:
+            self.ml_status = "failed"
             print(f"⚠️  Warning: Could not load model {self.model_path}. Using fallback patterns. Error: {e}")
+        finally:
+            self.model_loaded.set()
+
+    def is_ml_ready(self) -> bool:
+        return self.ml_status == "ready"
+
+    def reload_rules(self) -> RuleSnapshot:
+        """
+        Rebuild the rules from rules_path and swap them in atomically. Passes
+        already running finish on the snapshot they started with.
+        """
+        if not self.rules_path:
+            raise ValueError("No rules file configured; pass rules_path to PIIDetector")
+        snapshot = RuleSnapshot.from_file(self.rules_path, self.names_path)
+        self.rules = snapshot
+        return snapshot
+
+    # Views of the current snapshot, for callers that predate RuleSnapshot.
+    @property
+    def pii_patterns(self) -> Dict[str, str]:
+        return dict(self.rules.pii_patterns)
+
+    @property
+    def compiled_patterns(self) -> Pattern:
+        return self.rules.compiled_patterns
+
+    @property
+    def digit_run_fallbacks(self) -> List[Tuple[str, Pattern]]:
+        return list(self.rules.digit_run_fallbacks)
+
+    @property
+    def common_names(self) -> List[str]:
+        return list(self.rules.common_names)
+
+    @property
+    def name_gazetteer(self):
+        return self.rules.name_gazetteer
+
+    @property
+    def pattern_version(self) -> str:
+        return self.rules.version
+
+    def detect_pii_regex(self, text: str) -> List[Detection]:
+        return self.detect_pii_regex_batch([text])[0]
+
+    def detect_pii_regex_batch(self, texts: List[str]) -> List[List[Detection]]:
+        """Pattern and gazetteer detection for every text."""
+        rules = self.rules
+        return [
+            pattern_pii + self.detect_pii_names(text, rules)
+            for text, pattern_pii in zip(texts, self.detect_pii_patterns_batch(texts, rules))
+        ]
 
-    def detect_pii_regex(self, text: str) -> List[Dict]:
-        detected_pii = []
-
-        for pii_type, pattern in self.pii_patterns.items():
-            matches = re.finditer(pattern, text)
-            for match in matches:
-                detected_pii.append({
-                    'entity_type': pii_type,
-                    'entity_text': match.group(),
-                    'start': match.start(),
-                    'end': match.end(),
-                    'confidence': 0.95,
-                    'method': 'regex'
-                })
-
-        # Check for common names
-        for name in self.common_names:
-            if name in text:
-                start = text.find(name)
-                if start != -1:
-                    detected_pii.append({
-                        'entity_type': 'PERSON',
-                        'entity_text': name,
-                        'start': start,
-                        'end': start + len(name),
-                        'confidence': 0.90,
-                        'method': 'name_matching'
-                    })
-
-        return detected_pii
-
-    def detect_pii_ml(self, text: str) -> List[Dict]:
-        if self.pii_pipeline is None:
-            return []
+    def detect_pii_patterns_batch(self, texts: List[str], rules: Optional[RuleSnapshot] = None) -> List[List[Detection]]:
+        """
+        Pattern detection for every text. Numeric candidates from all texts
+        are checksum-validated together in one vectorised pass.
+        """
+        rules = self.rules if rules is None else rules
+        results = []
+        candidates = []
+        candidate_owners = []
+
+        for index, text in enumerate(texts):
+            detected_pii = []
+            for pii_type, start, end in self._scan_patterns(text, candidates, patterns=rules.compiled_patterns,
+                                                            fallbacks=rules.digit_run_fallbacks,
+                                                            digit_types=rules.digit_types):
+                detected_pii.append(self._regex_detection(text, pii_type, start, end))
+            candidate_owners.extend([index] * (len(candidates) - len(candidate_owners)))
+            results.append(detected_pii)
+
+        if candidates:
+            for owner, candidate, valid in zip(candidate_owners, candidates, validate_digit_candidates(candidates)):
+                if valid:
+                    pii_type, start, end, _ = candidate
+                    results[owner].append(self._regex_detection(texts[owner], pii_type, start, end))
+
+        return results
+
+    def detect_pii_names(self, text: str, rules: Optional[RuleSnapshot] = None) -> List[Detection]:
+        rules = self.rules if rules is None else rules
+        return [
+            Detection('PERSON', text[start:end], start, end, NAME_CONFIDENCE, 'name_matching')
+            for start, end in rules.name_gazetteer.find_all(text)
+        ]
+
+    def _scan_patterns(self, text: str, candidates: List[Tuple[str, int, int, str]], position: int = 0,
+                       endpos: Optional[int] = None, patterns: Optional[Pattern] = None,
+                       fallbacks: Optional[List[Tuple[str, Pattern]]] = None,
+                       digit_types: Optional[Tuple[str, ...]] = None,
+                       stop: Optional[int] = None) -> Generator[Tuple[str, int, int], None, int]:
+        """
+        Single left-to-right scan with the combined pattern. Non-numeric hits
+        are yielded; numeric candidates are appended to candidates (with
+        absolute offsets) for batched validation. With byte-level patterns
+        and fallbacks, text may also be bytes or an mmap; position and
+        endpos bound the scan without slicing. With stop, the scan ends at
+        the first match starting at or after stop, and the generator returns
+        the position a following scan (with a later endpos) resumes from.
+        """
+        patterns = patterns or self.rules.compiled_patterns
+        fallbacks = self.rules.digit_run_fallbacks if fallbacks is None else fallbacks
+        digit_types = self.rules.digit_types if digit_types is None else digit_types
+        endpos = len(text) if endpos is None else endpos
+        while True:
+            match = patterns.search(text, position, endpos)
+            # A match that runs into endpos may have been cut short, or matched
+            # only because endpos ends a word (ADDRESS's trailing \b); search
+            # again with room to grow, as a scan of the whole text would.
+            search_endpos = endpos
+            while match is not None and match.end() == search_endpos < len(text):
+                search_endpos = min(len(text), 2 * search_endpos - match.start())
+                match = patterns.search(text, position, search_endpos)
+            if match is None:
+                return position if stop is None else max(position, stop)
+            start, end = match.span()
+            if stop is not None and start >= stop:
+                # Matches past stop were tried with less lookahead than the
+                # following scan will have, so it searches again from stop.
+                return max(position, stop)
+            position = max(end, start + 1)
+
+            if match.lastgroup != 'DIGIT_RUN':
+                yield match.lastgroup, start, end
+                continue
+
+            # A run cut off by endpos (possibly just before a separator) is
+            # classified whole, as the parts that follow can change how it splits.
+            run_endpos = endpos
+            while run_endpos is not None and run_endpos - 1 <= end < len(text) and run_endpos < len(text):
+                run_endpos = min(len(text), 2 * run_endpos - start)
+                rematch = patterns.match(text, start, run_endpos)
+                if rematch is None or rematch.lastgroup != 'DIGIT_RUN':
+                    break
+                match = rematch
+                end = match.end()
+                position = max(end, start + 1)
+
+            # A part glued to letters or an '@' ("1234abc", "555@host") is not a
+            # number, but the parts before it still are ("123-45-6789 1st floor").
+            next_char = text[end:end + 1]
+            glued = next_char.isalnum() or next_char in ('_', '@', b'_', b'@')
+            run = match.group()
+            run = run if isinstance(run, str) else run.decode('ascii')
+            numeric = run[:run.rfind(' ') + 1].rstrip() if glued else run
+            found = classify_digit_run(numeric, digit_types) if numeric else []
+            for pii_type, run_start, run_end, value in found:
+                candidates.append((pii_type, start + run_start, start + run_end, value))
+
+            # Any part of the run left unclassified may start another hit,
+            # e.g. the "12" of "4111 1111 1111 1111 12 Main Street".
+            fallback_end = start
+            for part_start, _ in uncovered_parts(run, found):
+                part_start += start
+                if part_start < fallback_end:
+                    continue
+                # A part at or past stop gets as much lookahead as a match
+                # starting just before it (endpos - stop), not less.
+                part_endpos = endpos
+                if stop is not None and part_start >= stop:
+                    part_endpos = min(len(text), part_start + endpos - stop)
+                for pii_type, pattern in fallbacks:
+                    fallback = pattern.match(text, part_start, part_endpos)
+                    match_endpos = part_endpos
+                    while fallback is not None and fallback.end() == match_endpos < len(text):
+                        match_endpos = min(len(text), 2 * match_endpos - part_start)
+                        fallback = pattern.match(text, part_start, match_endpos)
+                    if fallback is not None:
+                        yield pii_type, part_start, fallback.end()
+                        fallback_end = fallback.end()
+                        position = max(position, fallback_end)
+                        break
+
+    def _regex_detection(self, text: str, pii_type: str, start: int, end: int) -> Detection:
+        return Detection(pii_type, text[start:end], start, end, REGEX_CONFIDENCE, 'regex')
+
+    def detect_pii_ml(self, text: str) -> List[Detection]:
+        return self.detect_pii_ml_batch([text])[0]
+
+    def detect_pii_ml_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[Detection]]:
+        """
+        Run the NER pipeline over every text. Texts longer than the model's
+        window are split into overlapping token windows; all windows of all
+        texts are batched together and the entities mapped back afterwards.
+        """
+        if self.model is not None and self.tokenizer is not None:
+            return self._detect_token_classifier_batch(texts, batch_size)
+        if self.pii_pipeline is None or not texts:
+            return [[] for _ in texts]
 
         try:
-            entities = self.pii_pipeline(text)
-            ml_detected = []
-
-            for entity in entities:
-                pii_type = self._map_ner_to_pii(entity['entity_group'])
-                if pii_type:
-                    ml_detected.append({
-                        'entity_type': pii_type,
-                        'entity_text': entity['word'],
-                        'start': entity['start'],
-                        'end': entity['end'],
-                        'confidence': entity['score'],
-                        'method': 'ml'
-                    })
-
-            return ml_detected
+            window_owners = []
+            window_spans = []
+            for index, text in enumerate(texts):
+                for span in self._window_spans(text):
+                    window_owners.append(index)
+                    window_spans.append(span)
+
+            windows = [texts[owner][start:end] for owner, (start, end) in zip(window_owners, window_spans)]
+            results = self.pii_pipeline(windows, batch_size=batch_size or self.batch_size)
+
+            ml_detected = [[] for _ in texts]
+            for owner, window, entities in zip(window_owners, window_spans, results):
+                for detection in self._entities_to_detections(entities):
+                    ml_detected[owner].append((detection.shifted(window[0]), window))
+
+            return [
+                self._merge_window_detections(text, detections)
+                if len(text) > self.ml_window_tokens else [detection for detection, _ in detections]
+                for text, detections in zip(texts, ml_detected)
+            ]
         except Exception as e:
             print(f"ML detection error: {e}")
+            ML_FALLBACKS.inc(len(texts), reason="error")
+            return [[] for _ in texts]
+
+    def _detect_token_classifier_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[Detection]]:
+        """
+        Inference path for the fine-tuned DistilBERT token classifier. Long
+        texts overflow into overlapping windows; offsets from the fast
+        tokenizer point into the original text, so spans need no shifting.
+        """
+        if not texts:
             return []
 
+        try:
+            import torch
+
+            max_length = min(self.ml_window_tokens + 2, self.tokenizer.model_max_length)
+            encoded = self.tokenizer(
+                list(texts),
+                truncation=True,
+                max_length=max_length,
+                stride=self.ml_stride,
+                return_overflowing_tokens=True,
+                return_offsets_mapping=True
+            )
+            owners = encoded['overflow_to_sample_mapping']
+            id2label = self.model.config.id2label
+            batch_size = batch_size or self.batch_size
+
+            ml_detected = [[] for _ in texts]
+            for first in range(0, len(owners), batch_size):
+                window_indexes = range(first, min(first + batch_size, len(owners)))
+                model_inputs = self.tokenizer.pad(
+                    {
+                        'input_ids': [encoded['input_ids'][i] for i in window_indexes],
+                        'attention_mask': [encoded['attention_mask'][i] for i in window_indexes]
+                    },
+                    return_tensors="pt"
+                )
+
+                with torch.inference_mode():
+                    logits = self.model(**model_inputs).logits
+                scores, label_ids = torch.softmax(logits, dim=-1).max(dim=-1)
+
+                for row, window_index in enumerate(window_indexes):
+                    owner = owners[window_index]
+                    offsets = encoded['offset_mapping'][window_index]
+                    word_ids = encoded.word_ids(window_index)
+                    word_offsets = [offset for offset, word_id in zip(offsets, word_ids) if word_id is not None]
+                    window = (word_offsets[0][0], word_offsets[-1][1]) if word_offsets else (0, 0)
+                    ml_detected[owner].extend(
+                        (detection, window) for detection in self._decode_token_labels(
+                            texts[owner],
+                            offsets,
+                            word_ids,
+                            [id2label[label_id] for label_id in label_ids[row].tolist()],
+                            scores[row].tolist()
+                        )
+                    )
+
+            return [
+                self._merge_window_detections(text, detections)
+                for text, detections in zip(texts, ml_detected)
+            ]
+        except Exception as e:
+            print(f"ML detection error: {e}")
+            ML_FALLBACKS.inc(len(texts), reason="error")
+            return [[] for _ in texts]
+
+    def _decode_token_labels(self, text: str, offsets: List[Tuple[int, int]], word_ids: List[Optional[int]],
+                             labels: List[str], scores: List[float]) -> List[Detection]:
+        """
+        Turn per-token BIO labels into character spans. Each word takes the
+        label of its first sub-token; later sub-tokens only extend the span.
+        """
+        spans = []
+        current = None
+        previous_word = None
+
+        for (start, end), word_id, label, score in zip(offsets, word_ids, labels, scores):
+            if word_id is None:
+                continue
+
+            if word_id == previous_word:
+                if current is not None:
+                    current['end'] = end
+                continue
+            previous_word = word_id
+
+            prefix, _, entity_label = label.rpartition('-')
+            pii_type = self._map_ner_to_pii(entity_label) if label != 'O' else None
+            if pii_type is None:
+                current = None
+                continue
+
+            if current is not None and current['entity_type'] == pii_type and prefix != 'B':
+                current['end'] = end
+                current['scores'].append(score)
+            else:
+                current = {'entity_type': pii_type, 'start': start, 'end': end, 'scores': [score]}
+                spans.append(current)
+
+        return [
+            Detection(
+                span['entity_type'],
+                text[span['start']:span['end']],
+                span['start'],
+                span['end'],
+                sum(span['scores']) / len(span['scores']),
+                'ml'
+            )
+            for span in spans
+        ]
+
+    def _window_spans(self, text: str) -> List[Tuple[int, int]]:
+        # A token covers at least one character, so short texts always fit.
+        if len(text) <= self.ml_window_tokens:
+            return [(0, len(text))]
+
+        offsets = self.pii_pipeline.tokenizer(
+            text, add_special_tokens=False, return_offsets_mapping=True, truncation=False
+        )['offset_mapping']
+        if len(offsets) <= self.ml_window_tokens:
+            return [(0, len(text))]
+
+        step = self.ml_window_tokens - self.ml_stride
+        spans = []
+        for first in range(0, len(offsets), step):
+            last = min(first + self.ml_window_tokens, len(offsets))
+            spans.append((offsets[first][0], offsets[last - 1][1]))
+            if last == len(offsets):
+                break
+
+        return spans
+
+    def _merge_window_detections(self, text: str,
+                                 detections: List[Tuple[Detection, Tuple[int, int]]]) -> List[Detection]:
+        """
+        Resolve hits of the same type that overlap across window seams, given
+        each hit with the (start, end) of the window that produced it. Of two
+        overlapping hits from different windows the one farther from a seam
+        of its window is kept: an entity cut off at the end of one window is
+        seen whole in the next, while two adjacent entities near a seam are
+        not fused into one.
+        """
+        def seam_distance(detection: Detection, window: Tuple[int, int]) -> float:
+            window_start, window_end = window
+            return min(
+                detection.start - window_start if window_start > 0 else float('inf'),
+                window_end - detection.end if window_end < len(text) else float('inf')
+            )
+
+        merged = []
+        open_by_type = {}
+
+        for detection, window in sorted(detections, key=lambda x: (x[0].start, x[0].end)):
+            index = len(merged)
+            previous = open_by_type.get(detection.entity_type)
+            if previous is not None:
+                previous_index, previous_window = previous
+                kept = merged[previous_index]
+                if previous_window != window and detection.start < kept.end:
+                    if seam_distance(detection, window) <= seam_distance(kept, previous_window):
+                        continue
+                    index = previous_index
+            if index == len(merged):
+                merged.append(detection)
+            else:
+                merged[index] = detection
+            open_by_type[detection.entity_type] = (index, window)
+
+        merged.sort(key=lambda x: (x.start, x.end))
+        for detection in merged:
+            detection.entity_text = text[detection.start:detection.end]
+
+        return merged
+
+    def _entities_to_detections(self, entities: List[Dict]) -> List[Detection]:
+        ml_detected = []
+
+        for entity in entities:
+            pii_type = self._map_ner_to_pii(entity['entity_group'])
+            if pii_type:
+                ml_detected.append(Detection(
+                    pii_type, entity['word'], entity['start'], entity['end'], float(entity['score']), 'ml'
+                ))
+
+        return ml_detected
+
     def _map_ner_to_pii(self, ner_label: str) -> str:
         mapping = {
             'PER': 'PERSON',
             'PERSON': 'PERSON',
             'ORG': 'ORGANIZATION', 
             'LOC': 'LOCATION',
-            'MISC': 'OTHER'
+            'MISC': 'OTHER',
+            # Labels the fine-tuned token classifier emits directly
+            'ORGANIZATION': 'ORGANIZATION',
+            'LOCATION': 'LOCATION',
+            'EMAIL': 'EMAIL',
+            'PHONE': 'PHONE',
+            'SSN': 'SSN',
+            'CREDIT_CARD': 'CREDIT_CARD',
+            'IP_ADDRESS': 'IP_ADDRESS',
+            'ADDRESS': 'ADDRESS'
         }
         return mapping.get(ner_label, None)
 
     def detect_all_pii(self, text: str) -> List[Dict]:
-        regex_pii = self.detect_pii_regex(text)
-        ml_pii = self.detect_pii_ml(text)
-
-        all_pii = regex_pii + ml_pii
-        return self._deduplicate_detections(all_pii)
-
-    def _deduplicate_detections(self, detections: List[Dict]) -> List[Dict]:
-        if not detections:
-            return []
-
-        sorted_detections = sorted(detections, key=lambda x: x['start'])
-        deduplicated = [sorted_detections[0]]
-
-        for detection in sorted_detections[1:]:
-            last_detection = deduplicated[-1]
-            if detection['start'] < last_detection['end']:
-                if detection['confidence'] > last_detection['confidence']:
-                    deduplicated[-1] = detection
+        return self.detect_columnar([text])[0].to_dicts()
+
+    def detect_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[Dict]]:
+        return [detections.to_dicts() for detections in self.detect_columnar(texts, batch_size)]
+
+    def detect_columnar(self, texts: List[str], batch_size: Optional[int] = None,
+                        use_cache: bool = True, rules: Optional[RuleSnapshot] = None) -> List[Detections]:
+        """
+        Full detection for every text, returned as compact columnar
+        Detections. The API serves these directly; detect_all_pii and
+        detect_batch convert them to the public dict format. Callers that
+        also score risk pass the snapshot they pinned, so both use the same
+        rules.
+        """
+        # One snapshot for the whole pass, however the rules change meanwhile.
+        rules = self.rules if rules is None else rules
+        keys = [self._cache_key(text, rules) if use_cache else None for text in texts]
+        results = [
+            self.result_cache.get(key) if key is not None else None
+            for key in keys
+        ]
+        if self.result_cache is not None and use_cache:
+            hits = sum(result is not None for result in results)
+            CACHE_LOOKUPS.inc(hits, result="hit")
+            CACHE_LOOKUPS.inc(len(results) - hits, result="miss")
+
+        pending = [index for index, result in enumerate(results) if result is None]
+        pending_texts = [texts[index] for index in pending]
+        if pending_texts:
+            with stage_timer('regex'):
+                pattern_results = self.detect_pii_patterns_batch(pending_texts, rules)
+            with stage_timer('gazetteer'):
+                name_results = [self.detect_pii_names(text, rules) for text in pending_texts]
+
+            if self.is_ml_ready():
+                with stage_timer('ml'):
+                    ml_results = self._run_ml_stage(pending_texts, batch_size, rules)
             else:
-                deduplicated.append(detection)
-
-        return deduplicated
-
-    def redact_pii(self, text: str, replacement: str = "[REDACTED]") -> Tuple[str, List[Dict]]:
+                ML_FALLBACKS.inc(len(pending_texts), reason=self.ml_status)
+                ml_results = [[] for _ in pending_texts]
+
+            with stage_timer('dedup'):
+                for index, pattern_pii, name_pii, ml_pii in zip(pending, pattern_results, name_results, ml_results):
+                    results[index] = Detections(self._deduplicate_detections(pattern_pii + name_pii + ml_pii))
+
+            for index in pending:
+                if keys[index] is not None:
+                    self.result_cache.put(keys[index], results[index])
+
+        TEXTS_PROCESSED.inc(len(texts))
+        BYTES_PROCESSED.inc(sum(len(text.encode("utf-8", "surrogatepass")) for text in texts))
+        type_counts = Counter(entity_type for result in results for entity_type in result.entity_types())
+        for entity_type, count in type_counts.items():
+            DETECTIONS.inc(count, entity_type=entity_type)
+
+        return results
+
+    def _run_ml_stage(self, texts: List[str], batch_size: Optional[int] = None,
+                      rules: Optional[RuleSnapshot] = None) -> List[List[Detection]]:
+        if self.cascade_gate is None or not self.is_ml_ready():
+            return self.detect_pii_ml_batch(texts, batch_size)
+
+        span_owners = []
+        spans = []
+        for index, text in enumerate(texts):
+            for span in self.cascade_gate.select_spans(text, (self.rules if rules is None else rules).name_gazetteer):
+                span_owners.append(index)
+                spans.append(span)
+
+        segments = [texts[owner][start:end] for owner, (start, end) in zip(span_owners, spans)]
+        ml_detected = [[] for _ in texts]
+        for owner, (offset, _), detections in zip(span_owners, spans, self.detect_pii_ml_batch(segments, batch_size)):
+            for detection in detections:
+                ml_detected[owner].append(detection.shifted(offset))
+
+        return ml_detected
+
+    def _cache_key(self, text: str, rules: RuleSnapshot) -> Optional[str]:
+        if self.result_cache is None:
+            return None
+        # Results computed before the model is live are regex-only, so they
+        # must not be served once the ML stage is ready.
+        cascade = self.cascade_gate.threshold if self.cascade_gate is not None else "off"
+        return cache_key(
+            text,
+            f"{self.model_path}:{self.backend}:{self.ml_status}:cascade={cascade}:overlap={self.overlap_policy}",
+            rules.version
+        )
+
+    def _deduplicate_detections(self, detections: List[Detection]) -> List[Detection]:
+        return resolve_overlaps(detections, self.overlap_policy)
+
+    def redact_pii(self, text: str, replacement: Union[str, RedactionStrategy] = "[REDACTED]") -> Tuple[str, List[Dict]]:
         detections = self.detect_all_pii(text)
+        return self.apply_redactions(text, detections, replacement), detections
 
-        if not detections:
-            return text, []
+    def redact_batch(self, texts: List[str], replacement: Union[str, RedactionStrategy] = "[REDACTED]",
+                     batch_size: Optional[int] = None) -> List[Tuple[str, List[Dict]]]:
+        return [
+            (self.apply_redactions(text, detections, replacement), detections)
+            for text, detections in zip(texts, self.detect_batch(texts, batch_size))
+        ]
 
-        sorted_detections = sorted(detections, key=lambda x: x['start'], reverse=True)
+    def redact_stream(self, chunks: Iterable[str], replacement: Union[str, RedactionStrategy] = "[REDACTED]",
+                      carry_over: int = 1024,
+                      rules: Optional[RuleSnapshot] = None) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Redact text arriving in chunks, yielding (redacted_text, detections)
+        pieces as soon as they are final. Offsets are relative to the whole
+        stream. The last carry_over characters of the buffer are held back
+        and rescanned with the next chunk, so any entity up to that length
+        is never cut at a chunk boundary; memory stays bounded by the chunk
+        size plus carry_over.
+        """
+        # One replacer and one rule snapshot for the whole stream keep
+        # pseudonyms and detections consistent across chunks.
+        replacer = make_replacer(replacement)
+        rules = self.rules if rules is None else rules
+        buffer = ""
+        offset = 0
+
+        for chunk in chunks:
+            buffer += chunk
+            if len(buffer) <= 2 * carry_over:
+                continue
+
+            detections = self.detect_columnar([buffer], rules=rules)[0].to_dicts()
+            cut = self._stream_cut(buffer, detections, len(buffer) - carry_over)
+            if cut <= 0:
+                continue
+
+            final = [detection for detection in detections if detection['end'] <= cut]
+            yield self.apply_redactions(buffer[:cut], final, replacer), self._shift_detections(final, offset)
+
+            offset += cut
+            buffer = buffer[cut:]
+
+        if buffer:
+            detections = self.detect_columnar([buffer], rules=rules)[0].to_dicts()
+            yield self.apply_redactions(buffer, detections, replacer), self._shift_detections(detections, offset)
+
+    def _stream_cut(self, buffer: str, detections: List[Dict], cut: int) -> int:
+        # Cut after whitespace so the held-back text keeps its word boundary,
+        # then pull the cut back to the start of any entity it would split.
+        whitespace = max(buffer.rfind(' ', 0, cut), buffer.rfind('\n', 0, cut), buffer.rfind('\t', 0, cut))
+        if whitespace >= 0:
+            cut = whitespace + 1
+
+        for detection in sorted(detections, key=lambda x: x['start'], reverse=True):
+            if detection['start'] < cut < detection['end']:
+                cut = detection['start']
+
+        return cut
+
+    def _shift_detections(self, detections: List[Dict], offset: int) -> List[Dict]:
+        return [
+            dict(detection, start=detection['start'] + offset, end=detection['end'] + offset)
+            for detection in detections
+        ]
 
-        redacted_text = text
-        for detection in sorted_detections:
-            start, end = detection['start'], detection['end']
-            redacted_text = redacted_text[:start] + replacement + redacted_text[end:]
+    def apply_redactions(self, text: str, detections: List[Dict],
+                         replacement: Union[str, RedactionStrategy, Replacer] = "[REDACTED]") -> str:
+        if not detections:
+            return text
 
-        return redacted_text, detections
+        with stage_timer('redact'):
+            return assemble_redacted_text(text, detections, make_replacer(replacement))
 
-    def analyze_privacy_risk(self, detections: List[Dict]) -> Dict:
+    def analyze_privacy_risk(self, detections: Union[List[Dict], Detections],
+                             rules: Optional[RuleSnapshot] = None) -> Dict:
         if not detections:
             return {"risk_level": "LOW", "risk_score": 0, "message": "No PII detected"}
 
-        risk_weights = {
-            'EMAIL': 2,
-            'PHONE': 2, 
-            'SSN': 5,
-            'CREDIT_CARD': 5,
-            'PERSON': 1,
-            'ORGANIZATION': 1,
-            'LOCATION': 1,
-            'ADDRESS': 3,
-            'IP_ADDRESS': 3,
-            'OTHER': 1
-        }
+        with stage_timer('risk'):
+            return self._score_privacy_risk(detections, self.rules if rules is None else rules)
 
-        total_risk = sum(risk_weights.get(detection['entity_type'], 1) for detection in detections)
-        pii_count = len(detections)
+    def analyze_privacy_risk_counts(self, type_counts: Mapping[str, int],
+                                    rules: Optional[RuleSnapshot] = None) -> Dict:
+        """Same result as analyze_privacy_risk, from per-type detection counts."""
+        type_counts = {entity_type: count for entity_type, count in type_counts.items() if count}
+        if not type_counts:
+            return {"risk_level": "LOW", "risk_score": 0, "message": "No PII detected"}
+
+        with stage_timer('risk'):
+            return self._score_type_counts(type_counts, self.rules if rules is None else rules)
 
-        if total_risk >= 8 or pii_count >= 5:
-            risk_level = "HIGH"
-        elif total_risk >= 4 or pii_count >= 3:
-            risk_level = "MEDIUM"
+    def _score_privacy_risk(self, detections: Union[List[Dict], Detections], rules: RuleSnapshot) -> Dict:
+        if isinstance(detections, Detections):
+            entity_types = detections.entity_types()
         else:
-            risk_level = "LOW"
+            entity_types = [detection['entity_type'] for detection in detections]
+        return self._score_type_counts(Counter(entity_types), rules)
+
+    def _score_type_counts(self, type_counts: Mapping[str, int], rules: RuleSnapshot) -> Dict:
+        total_risk = sum(
+            rules.risk_weights.get(entity_type, rules.default_risk_weight) * count
+            for entity_type, count in type_counts.items()
+        )
+        pii_count = sum(type_counts.values())
+
+        risk_level = "LOW"
+        for level, min_score, min_count in RISK_LEVELS:
+            if total_risk >= min_score or pii_count >= min_count:
+                risk_level = level
+                break
 
         return {
             "risk_level": risk_level,
             "risk_score": total_risk,
             "pii_count": pii_count,
-            "detected_types": list(set(d['entity_type'] for d in detections)),
+            "detected_types": list(type_counts),
             "message": f"Detected {pii_count} PII items with {risk_level.lower()} privacy risk"
         }
 
 if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "bulk":
+        from bulk_redact import main
+
+        sys.exit(main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "scan":
+        from file_scanner import main
+
+        sys.exit(main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "bundle":
+        from client_bundle import main
+
+        sys.exit(main(sys.argv[2:]))
+
     detector = PIIDetector()
 
     test_prompts = [
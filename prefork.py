@@ -0,0 +1,138 @@
+"""
+PII Guard Web Application
+Pre-fork launcher: load the detector once, then fork workers that share it
+
+The parent imports app.py with the model loaded synchronously, freezes the
+garbage collector so collections in the workers do not write to the pages
+holding the loaded objects, and only then forks. Model weights live in
+tensor storage outside the Python heap, so they stay shared copy-on-write
+across all workers. Each worker gets its own slice of the CPU cores for
+torch so workers do not oversubscribe them.
+
+Incremental sessions are turned off: they live in one worker's memory, and
+the shared socket hands a session's edits to whichever worker accepts them.
+Session requests get a 501; clients send whole texts to /api/detect instead.
+
+Metrics are aggregated through PII_GUARD_METRICS_DIR (a temporary directory
+unless set): each worker writes its values there every second and on
+every scrape, and /metrics on any worker reports the sum over all of them.
+
+    python prefork.py --workers 16 --port 5000
+"""
+
+import argparse
+import gc
+import glob
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+
+
+def _torch_threads_per_worker(workers: int) -> int:
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def _serve_worker(listener: socket.socket, host: str, port: int, torch_threads: int):
+    from werkzeug.serving import make_server
+
+    try:
+        import torch
+
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    import app as flask_app
+
+    # The parent's values are already in its own snapshot file.
+    flask_app.REGISTRY.clear()
+    flask_app.REGISTRY.start_flushing(before_flush=flask_app.refresh_gauges)
+
+    if flask_app.detector.rules_path:
+        flask_app.rules_watcher = flask_app.start_rules_watcher()
+
+    server = make_server(host, port, flask_app.app, threaded=True, fd=listener.fileno())
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    server.serve_forever()
+
+
+def _spawn(listener: socket.socket, host: str, port: int, torch_threads: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _serve_worker(listener, host, port, torch_threads)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run PII Guard with pre-forked workers sharing one model")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--torch-threads", type=int, default=None,
+                        help="intra-op threads per worker (default: cores / workers)")
+    args = parser.parse_args()
+
+    torch_threads = args.torch_threads or _torch_threads_per_worker(args.workers)
+    # Must be set before torch is first imported to size its thread pools.
+    os.environ["OMP_NUM_THREADS"] = str(torch_threads)
+    os.environ["MKL_NUM_THREADS"] = str(torch_threads)
+    # Background threads do not survive fork, so load the model up front.
+    os.environ["PII_GUARD_LOAD_ASYNC"] = "0"
+    os.environ["PII_GUARD_WATCH_RULES"] = "0"
+    os.environ["PII_GUARD_SESSIONS"] = "0"
+
+    metrics_dir = os.environ.get("PII_GUARD_METRICS_DIR")
+    created_metrics_dir = not metrics_dir
+    if created_metrics_dir:
+        metrics_dir = os.environ["PII_GUARD_METRICS_DIR"] = tempfile.mkdtemp(prefix="pii-guard-metrics-")
+    else:
+        # Snapshots of an earlier run would be counted as dead workers.
+        for path in glob.glob(os.path.join(metrics_dir, "*.json")):
+            os.remove(path)
+
+    import app as flask_app
+
+    # Anything recorded before the fork is reported once, from the parent's
+    # file; workers start from zero so it is not counted once per worker.
+    flask_app.REGISTRY.write_snapshot()
+
+    listener = socket.create_server((args.host, args.port), backlog=2048)
+    listener.set_inheritable(True)
+
+    gc.collect()
+    gc.freeze()
+
+    workers = {_spawn(listener, args.host, args.port, torch_threads) for _ in range(args.workers)}
+    print(f"✅ Serving on {args.host}:{args.port} with {len(workers)} workers "
+          f"({torch_threads} torch threads each, ML status: {flask_app.detector.ml_status})")
+
+    def shutdown(*_):
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        if created_metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    # Replace workers that die so capacity stays constant.
+    while True:
+        pid, status = os.wait()
+        if pid in workers:
+            workers.discard(pid)
+            print(f"⚠️  Worker {pid} exited with status {status}; restarting")
+            workers.add(_spawn(listener, args.host, args.port, torch_threads))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Replacement strategies used when redacting detected PII
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Union
+
+Replacer = Callable[[Dict], str]
+
+
+class RedactionStrategy(ABC):
+    """Produces a replacer for one document; state never leaks between documents."""
+
+    @abstractmethod
+    def for_document(self) -> Replacer:
+        pass
+
+
+class FixedReplacement(RedactionStrategy):
+    """Every entity becomes the same marker, e.g. [REDACTED]."""
+
+    def __init__(self, replacement: str = "[REDACTED]"):
+        self.replacement = replacement
+
+    def for_document(self) -> Replacer:
+        return lambda detection: self.replacement
+
+
+class TypeTagReplacement(RedactionStrategy):
+    """Per-type tags matching the browser extension, e.g. [EMAIL-REDACTED]."""
+
+    def __init__(self, template: str = "[{entity_type}-REDACTED]"):
+        self.template = template
+
+    def for_document(self) -> Replacer:
+        return lambda detection: self.template.format(entity_type=detection['entity_type'])
+
+
+class PseudonymReplacement(RedactionStrategy):
+    """
+    Stable pseudonyms such as PERSON_1 or EMAIL_2. The same entity text gets
+    the same pseudonym everywhere in a document, so the LLM can still tell
+    different people apart.
+    """
+
+    def __init__(self, template: str = "{entity_type}_{index}"):
+        self.template = template
+
+    def for_document(self) -> Replacer:
+        pseudonyms = {}
+        counters = {}
+
+        def replace(detection: Dict) -> str:
+            key = (detection['entity_type'], detection['entity_text'])
+            if key not in pseudonyms:
+                counters[key[0]] = counters.get(key[0], 0) + 1
+                pseudonyms[key] = self.template.format(entity_type=key[0], index=counters[key[0]])
+            return pseudonyms[key]
+
+        return replace
+
+
+REDACTION_STRATEGIES = {
+    'fixed': FixedReplacement,
+    'type': TypeTagReplacement,
+    'pseudonym': PseudonymReplacement
+}
+
+
+def get_redaction_strategy(name: str) -> RedactionStrategy:
+    if not isinstance(name, str):
+        raise ValueError(f"Redaction strategy must be a string, got {type(name).__name__}")
+    if name not in REDACTION_STRATEGIES:
+        raise ValueError(f"Unknown redaction strategy '{name}'. Choose from: {', '.join(REDACTION_STRATEGIES)}")
+    return REDACTION_STRATEGIES[name]()
+
+
+def make_replacer(replacement: Union[str, RedactionStrategy, Replacer]) -> Replacer:
+    if isinstance(replacement, RedactionStrategy):
+        return replacement.for_document()
+    if callable(replacement):
+        return replacement
+    return lambda detection: replacement
+
+
+def assemble_redacted_text(text: str, detections: List[Dict], replacer: Replacer) -> str:
+    """
+    Build the redacted text in one left-to-right pass by joining the kept
+    slices and replacements, so cost is linear in the text length however
+    many detections there are. Spans overlapping an earlier one are skipped.
+    """
+    parts = []
+    cursor = 0
+
+    for detection in sorted(detections, key=lambda x: x['start']):
+        start, end = detection['start'], detection['end']
+        if start < cursor:
+            continue
+        parts.append(text[cursor:start])
+        parts.append(replacer(detection))
+        cursor = end
+
+    parts.append(text[cursor:])
+    return "".join(parts)
@@ -0,0 +1,167 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Opt-in profiling of single detection requests
+
+A profiled request runs under cProfile and, when the ML stage is live on
+torch, the torch profiler. Each pattern is also timed on its own against the
+same text. The stored summary is keyed by request id and only describes the
+input's shape (length, token count, detection counts); the text itself, and
+anything derived from its content, is never recorded.
+"""
+
+import cProfile
+import pstats
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from detections import Detections
+from digit_scanner import DIGIT_RUN_PATTERN
+
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+
+class RequestProfiler:
+    """
+    Runs a detection call under the profilers and keeps the most recent
+    summaries. Profiled calls are serialized: only one Python profiler can
+    be active per process on recent CPython, and profiling is rare anyway.
+    """
+
+    def __init__(self, detector, max_profiles: int = 100, top_functions: int = 25, top_operators: int = 25):
+        self.detector = detector
+        self.max_profiles = max_profiles
+        self.top_functions = top_functions
+        self.top_operators = top_operators
+        self._profiles = OrderedDict()
+        self._profile_lock = threading.Lock()
+        self._store_lock = threading.Lock()
+
+    def profile(self, request_id: str, text: str, detect: Callable[[], Detections]) -> Tuple[Detections, Dict]:
+        """Run detect under the profilers; return its detections and the stored summary."""
+        with self._profile_lock:
+            python_profiler = cProfile.Profile()
+            torch_profiler = self._start_torch_profiler()
+
+            started = time.perf_counter()
+            python_profiler.enable()
+            try:
+                detections = detect()
+            finally:
+                python_profiler.disable()
+                if torch_profiler is not None:
+                    torch_profiler.__exit__(None, None, None)
+            elapsed = time.perf_counter() - started
+
+            summary = {
+                'request_id': request_id,
+                'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                'elapsed_seconds': round(elapsed, 6),
+                'input_shape': self._input_shape(text, detections),
+                'top_functions': self._top_functions(python_profiler),
+                'model_operators': self._model_operators(torch_profiler),
+                'regex_patterns': self._pattern_timings(text)
+            }
+
+        with self._store_lock:
+            self._profiles[request_id] = summary
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+        return detections, summary
+
+    def get(self, request_id: str) -> Optional[Dict]:
+        with self._store_lock:
+            return self._profiles.get(request_id)
+
+    def _start_torch_profiler(self):
+        if not self.detector.is_ml_ready():
+            return None
+        try:
+            from torch.profiler import ProfilerActivity, profile
+
+            torch_profiler = profile(activities=[ProfilerActivity.CPU])
+            torch_profiler.__enter__()
+            return torch_profiler
+        except Exception as e:
+            print(f"⚠️  Warning: torch profiler unavailable: {e}")
+            return None
+
+    def _input_shape(self, text: str, detections: Detections) -> Dict:
+        token_count, tokenizer_name = self._count_tokens(text)
+        return {
+            'chars': len(text),
+            'bytes': len(text.encode("utf-8", "surrogatepass")),
+            'lines': text.count("\n") + 1,
+            'tokens': token_count,
+            'tokenizer': tokenizer_name,
+            'detections': len(detections),
+            'detections_by_type': dict(Counter(detections.entity_types()))
+        }
+
+    def _count_tokens(self, text: str):
+        tokenizer = self.detector.tokenizer
+        if tokenizer is None and self.detector.pii_pipeline is not None:
+            tokenizer = getattr(self.detector.pii_pipeline, 'tokenizer', None)
+        if tokenizer is not None:
+            try:
+                return len(tokenizer(text, add_special_tokens=False, truncation=False)['input_ids']), 'model'
+            except Exception:
+                pass
+        return len(text.split()), 'whitespace'
+
+    def _top_functions(self, python_profiler: cProfile.Profile) -> List[Dict]:
+        stats = pstats.Stats(python_profiler)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                'function': f"{filename}:{line}({name})",
+                'calls': total_calls,
+                'self_seconds': round(self_time, 6),
+                'cumulative_seconds': round(cumulative_time, 6)
+            }
+            for (filename, line, name), (_, total_calls, self_time, cumulative_time, _) in rows[:self.top_functions]
+        ]
+
+    def _model_operators(self, torch_profiler) -> List[Dict]:
+        if torch_profiler is None:
+            return []
+        events = sorted(torch_profiler.key_averages(), key=lambda event: event.self_cpu_time_total, reverse=True)
+        return [
+            {
+                'operator': event.key,
+                'calls': event.count,
+                'self_cpu_ms': round(event.self_cpu_time_total / 1000, 3),
+                'total_cpu_ms': round(event.cpu_time_total / 1000, 3)
+            }
+            for event in events[:self.top_operators]
+        ]
+
+    def _pattern_timings(self, text: str) -> Dict[str, Dict]:
+        """Time each pattern separately over the text; only counts and durations are kept."""
+        rules = self.detector.rules
+        patterns = {pii_type: pattern for pii_type, pattern in rules.pii_patterns.items()
+                    if pii_type not in rules.digit_types}
+        if rules.digit_types:
+            patterns['DIGIT_RUN'] = DIGIT_RUN_PATTERN
+        timings = {}
+
+        for name, pattern in patterns.items():
+            compiled = re.compile(pattern)
+            started = time.perf_counter()
+            matches = sum(1 for _ in compiled.finditer(text))
+            timings[name] = {'seconds': round(time.perf_counter() - started, 6), 'matches': matches}
+
+        started = time.perf_counter()
+        matches = sum(1 for _ in rules.compiled_patterns.finditer(text))
+        timings['combined'] = {'seconds': round(time.perf_counter() - started, 6), 'matches': matches}
+
+        started = time.perf_counter()
+        matches = len(rules.name_gazetteer.find_all(text))
+        timings['gazetteer'] = {'seconds': round(time.perf_counter() - started, 6), 'matches': matches}
+
+        return timings
@@ -0,0 +1,260 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Versioned detection rules: patterns, gazetteer names and risk weights
+
+The built-in rules below are the defaults. A JSON rules file can replace any
+of them, and RuleWatcher swaps a freshly compiled RuleSnapshot into a running
+detector when the file changes; the model is never reloaded.
+
+    {
+        "pii_patterns": {"EMAIL": "...", "EMPLOYEE_ID": "\\bEMP-\\d{6}\\b"},
+        "common_names": ["John Smith", "Sarah Johnson"],
+        "names_path": "names.txt",
+        "risk_weights": {"SSN": 5, "EMPLOYEE_ID": 2},
+        "default_risk_weight": 1
+    }
+
+Each key present replaces its built-in default as a whole; names_path is
+resolved against the rules file's directory. PHONE, SSN, CREDIT_CARD and
+IP_ADDRESS keep the shared, checksum-validated digit-run scan only while
+they carry their built-in pattern; any other pattern for them is matched
+as written, and leaving a type out disables it. Write the file
+to a temporary name and rename it into place so a half-written file is
+never picked up.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Pattern, Tuple
+
+from digit_scanner import DIGIT_RUN_PATTERN, DIGIT_TYPES
+from gazetteer import NameGazetteer
+
+PII_PATTERNS = {
+    'EMAIL': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    'PHONE': r'\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})\b',
+    'SSN': r'\b(?!000|666|9\d{2})\d{3}[-.]?(?!00)\d{2}[-.]?(?!0000)\d{4}\b',
+    'CREDIT_CARD': r'\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12})\b',
+    'IP_ADDRESS': r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b',
+    'ADDRESS': r'\b\d+\s+[A-Za-z0-9\s,]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)\b'
+}
+
+COMMON_NAMES = [
+    "John Smith", "Sarah Johnson", "Michael Davis", "Emily Chen", "Robert Williams",
+    "Lisa Thompson", "David Wilson", "Maria Garcia", "James Brown", "Jennifer Lee",
+    "Amanda Rodriguez", "Christopher Taylor", "Michelle Anderson", "Daniel Thomas",
+    "Jessica Martinez", "Matthew Jackson", "Ashley White", "Joshua Harris", "Sarah"
+]
+
+RISK_WEIGHTS = {
+    'EMAIL': 2,
+    'PHONE': 2,
+    'SSN': 5,
+    'CREDIT_CARD': 5,
+    'PERSON': 1,
+    'ORGANIZATION': 1,
+    'LOCATION': 1,
+    'ADDRESS': 3,
+    'IP_ADDRESS': 3,
+    'OTHER': 1
+}
+DEFAULT_RISK_WEIGHT = 1
+
+CONFIG_KEYS = ('pii_patterns', 'common_names', 'names_path', 'risk_weights', 'default_risk_weight')
+
+
+def digit_run_types(pii_patterns: Mapping[str, str]) -> Tuple[str, ...]:
+    """
+    Numeric types left to the shared digit-run scan: those configured with
+    their built-in pattern. A numeric type given any other pattern is
+    matched by that pattern like every other type, without checksums.
+    """
+    return tuple(
+        pii_type for pii_type in DIGIT_TYPES if pii_patterns.get(pii_type) == PII_PATTERNS[pii_type]
+    )
+
+
+def compile_pii_patterns(pii_patterns: Mapping[str, str], digit_types: Optional[Iterable[str]] = None) -> Pattern:
+    """
+    Combine the per-type regexes into one alternation with a named group per
+    entity type, so a single scan of the text finds every pattern-based hit.
+    Where two types match at the same position, the one listed first wins.
+    The digit_types (by default those from digit_run_types) share a single
+    DIGIT_RUN group, placed where the first of them is listed and classified
+    and validated afterwards by digit_scanner.
+    """
+    digit_types = digit_run_types(pii_patterns) if digit_types is None else tuple(digit_types)
+    alternatives = []
+    for pii_type, pattern in pii_patterns.items():
+        if pii_type not in digit_types:
+            alternatives.append(f"(?P<{pii_type}>{pattern})")
+        elif "(?P<DIGIT_RUN>" not in "".join(alternatives):
+            alternatives.append(f"(?P<DIGIT_RUN>{DIGIT_RUN_PATTERN})")
+    return re.compile("|".join(alternatives))
+
+
+class RuleSnapshot:
+    """
+    One immutable, compiled version of the rules. A detection pass reads the
+    detector's snapshot once and uses it throughout, so swapping in a new
+    one never changes the rules under a pass that is already running.
+    """
+
+    __slots__ = ('version', 'pii_patterns', 'compiled_patterns', 'digit_types', 'digit_run_fallbacks', 'common_names',
+                 'names_path', 'name_gazetteer', 'risk_weights', 'default_risk_weight')
+
+    def __init__(self, pii_patterns: Mapping[str, str] = PII_PATTERNS, common_names: Iterable[str] = COMMON_NAMES,
+                 names_path: Optional[str] = None, risk_weights: Mapping[str, float] = RISK_WEIGHTS,
+                 default_risk_weight: float = DEFAULT_RISK_WEIGHT):
+        pii_patterns = dict(pii_patterns)
+        for pii_type, pattern in pii_patterns.items():
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid {pii_type} pattern: {e}") from e
+        digit_types = digit_run_types(pii_patterns)
+        try:
+            compiled_patterns = compile_pii_patterns(pii_patterns, digit_types)
+            # Every non-numeric pattern, in listed order, retried where part of a
+            # digit run turns out not to be numeric PII (the "123" of "123 Main
+            # Street", the "1password@example.com" of "user 2 1password@...").
+            digit_run_fallbacks = tuple(
+                (pii_type, re.compile(pattern))
+                for pii_type, pattern in pii_patterns.items() if pii_type not in digit_types
+            )
+        except re.error as e:
+            raise ValueError(f"Invalid PII pattern: {e}") from e
+
+        common_names = tuple(common_names)
+        if names_path:
+            name_gazetteer = NameGazetteer.from_file(names_path, common_names)
+        else:
+            name_gazetteer = NameGazetteer(common_names)
+
+        risk_weights = dict(risk_weights)
+        version = hashlib.sha256(json.dumps(
+            [pii_patterns, name_gazetteer.fingerprint, risk_weights, default_risk_weight], sort_keys=True
+        ).encode("utf-8")).hexdigest()[:16]
+
+        for name, value in (
+            ('version', version),
+            ('pii_patterns', MappingProxyType(pii_patterns)),
+            ('compiled_patterns', compiled_patterns),
+            ('digit_types', digit_types),
+            ('digit_run_fallbacks', digit_run_fallbacks),
+            ('common_names', common_names),
+            ('names_path', names_path),
+            ('name_gazetteer', name_gazetteer),
+            ('risk_weights', MappingProxyType(risk_weights)),
+            ('default_risk_weight', default_risk_weight)
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RuleSnapshot is immutable; build a new one instead")
+
+    @classmethod
+    def from_config(cls, config: Dict, base_dir: str = ".", names_path: Optional[str] = None) -> "RuleSnapshot":
+        """Build from a parsed rules file; missing keys keep the built-in defaults."""
+        if not isinstance(config, dict):
+            raise ValueError("Rules file must contain a JSON object")
+        unknown = set(config) - set(CONFIG_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown rules keys: {', '.join(sorted(unknown))}. Expected: {', '.join(CONFIG_KEYS)}")
+
+        pii_patterns = config.get('pii_patterns', PII_PATTERNS)
+        if not isinstance(pii_patterns, dict) or not all(
+                isinstance(pii_type, str) and pii_type.isidentifier() and isinstance(pattern, str)
+                for pii_type, pattern in pii_patterns.items()):
+            raise ValueError("pii_patterns must map identifier-style type names to regex strings")
+
+        common_names = config.get('common_names', COMMON_NAMES)
+        if not isinstance(common_names, list) or not all(isinstance(name, str) for name in common_names):
+            raise ValueError("common_names must be a list of strings")
+
+        risk_weights = config.get('risk_weights', RISK_WEIGHTS)
+        default_risk_weight = config.get('default_risk_weight', DEFAULT_RISK_WEIGHT)
+        if not isinstance(risk_weights, dict) or not all(
+                isinstance(weight, (int, float)) for weight in list(risk_weights.values()) + [default_risk_weight]):
+            raise ValueError("risk_weights must map entity types to numbers, and default_risk_weight be a number")
+
+        if config.get('names_path'):
+            names_path = os.path.join(base_dir, config['names_path'])
+
+        return cls(pii_patterns, common_names, names_path, risk_weights, default_risk_weight)
+
+    @classmethod
+    def from_file(cls, path: str, names_path: Optional[str] = None) -> "RuleSnapshot":
+        """Load a JSON rules file. names_path is used unless the file names its own."""
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        return cls.from_config(config, os.path.dirname(os.path.abspath(path)), names_path)
+
+
+def _file_stamp(path: Optional[str]) -> Optional[Tuple[int, int]]:
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class RuleWatcher:
+    """
+    Polls the detector's rules file, and the names file its snapshot uses,
+    and calls detector.reload_rules() when either changes. A file that fails
+    to load or compile is reported and the current snapshot stays live.
+    """
+
+    def __init__(self, detector, interval: float = 2.0):
+        if not detector.rules_path:
+            raise ValueError("The detector has no rules file to watch")
+        self.detector = detector
+        self.interval = interval
+        self._stamp = self._current_stamp()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _current_stamp(self) -> Tuple:
+        return _file_stamp(self.detector.rules_path), _file_stamp(self.detector.rules.names_path)
+
+    def start(self) -> "RuleWatcher":
+        self._thread = threading.Thread(target=self._run, name="pii-rules-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self) -> bool:
+        """Reload if the files changed since the last check; True when a new snapshot went live."""
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+
+        try:
+            snapshot = self.detector.reload_rules()
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Warning: keeping rules version {self.detector.rules.version}; "
+                  f"could not load {self.detector.rules_path}: {e}")
+            return False
+
+        # The new snapshot may point at a different names file.
+        self._stamp = self._current_stamp()
+        print(f"✅ Rules version {snapshot.version} is live")
+        return True
@@ -62,18 +62,34 @@ document.addEventListener('DOMContentLoaded', function() {
         // Show loading state
         setLoadingState(true);
 
-        // Simulate API call with client-side processing
-        setTimeout(() => {
-            try {
-                const result = processTextClientSide(text, shouldRedact);
-                displayResults(result, shouldRedact);
-            } catch (error) {
+        processText(text)
+            .then(result => displayResults(result, shouldRedact))
+            .catch(error => {
                 alert('An error occurred during analysis. Please try again.');
                 console.error('Analysis error:', error);
-            } finally {
-                setLoadingState(false);
+            })
+            .finally(() => setLoadingState(false));
+    }
+
+    async function processText(text) {
+        // Only texts the ML stage would look at need the server; the rest are
+        // classified exactly by the generated rules bundle.
+        if (!PIIGuardRules.canDetectLocally(text)) {
+            try {
+                const response = await fetch('/api/detect', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ text })
+                });
+                if (!response.ok) {
+                    throw new Error(`Server responded with ${response.status}`);
+                }
+                return await response.json();
+            } catch (error) {
+                console.warn('Server detection unavailable, using local rules:', error);
             }
-        }, 500); // Small delay to show loading state
+        }
+        return processTextClientSide(text);
     }
 
     function setLoadingState(isLoading) {
@@ -87,114 +103,18 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
-    function processTextClientSide(text, shouldRedact) {
-        // Client-side PII detection patterns
-        const patterns = {
-            email: /\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b/g,
-            phone: /\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})\b/g,
-            ssn: /\b(?!000|666|9\d{2})\d{3}[-.]?(?!00)\d{2}[-.]?(?!0000)\d{4}\b/g,
-            creditCard: /\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12})\b/g,
-            ipAddress: /\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b/g,
-            address: /\b\d+\s+[A-Za-z0-9\s,]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)\b/g
-        };
-
-        const commonNames = [
-            "John Smith", "Sarah Johnson", "Michael Davis", "Emily Chen", "Robert Williams",
-            "Lisa Thompson", "David Wilson", "Maria Garcia", "James Brown", "Jennifer Lee",
-            "Amanda Rodriguez", "Christopher Taylor", "Michelle Anderson", "Daniel Thomas",
-            "Jessica Martinez", "Matthew Jackson", "Ashley White", "Joshua Harris", "Sarah"
-        ];
-
-        const riskWeights = {
-            EMAIL: 2,
-            PHONE: 2,
-            SSN: 5,
-            CREDIT_CARD: 5,
-            PERSON: 1,
-            ADDRESS: 3,
-            IP_ADDRESS: 3
-        };
-
-        let detections = [];
-        let redactedText = text;
-
-        // Detect PII using patterns
-        for (const [type, pattern] of Object.entries(patterns)) {
-            const matches = [...text.matchAll(pattern)];
-            for (const match of matches) {
-                detections.push({
-                    entity_type: type.toUpperCase(),
-                    entity_text: match[0],
-                    start: match.index,
-                    end: match.index + match[0].length,
-                    confidence: 0.95
-                });
-            }
-        }
-
-        // Detect common names
-        for (const name of commonNames) {
-            const index = text.indexOf(name);
-            if (index !== -1) {
-                detections.push({
-                    entity_type: 'PERSON',
-                    entity_text: name,
-                    start: index,
-                    end: index + name.length,
-                    confidence: 0.90
-                });
-            }
-        }
-
-        // Remove duplicates and sort by position
-        detections = detections
-            .filter((detection, index, self) => 
-                index === self.findIndex(d => d.start === detection.start && d.end === detection.end)
-            )
-            .sort((a, b) => a.start - b.start);
-
-        // Calculate risk
-        const totalRisk = detections.reduce((sum, detection) => {
-            return sum + (riskWeights[detection.entity_type] || 1);
-        }, 0);
-
-        let riskLevel;
-        if (totalRisk >= 8 || detections.length >= 5) {
-            riskLevel = 'HIGH';
-        } else if (totalRisk >= 4 || detections.length >= 3) {
-            riskLevel = 'MEDIUM';
-        } else {
-            riskLevel = 'LOW';
-        }
-
-        // Redact text if requested
-        if (shouldRedact && detections.length > 0) {
-            const sortedDetections = [...detections].sort((a, b) => b.start - a.start);
-            for (const detection of sortedDetections) {
-                redactedText = redactedText.substring(0, detection.start) + 
-                              '[REDACTED]' + 
-                              redactedText.substring(detection.end);
-            }
-        }
-
-        const riskMessages = {
-            LOW: "✅ Low privacy risk. This text appears safe to send to AI services.",
-            MEDIUM: "⚠️ Medium privacy risk. Review detected information before proceeding.",
-            HIGH: "🚨 High privacy risk! Avoid sending this to cloud services without redaction."
-        };
+    function processTextClientSide(text) {
+        // Patterns, names and risk weights come from /api/client-rules.js,
+        // generated from the server's live rules.
+        const detections = PIIGuardRules.detect(text);
+        const riskAnalysis = PIIGuardRules.analyzePrivacyRisk(detections);
 
         return {
             original_text: text,
-            redacted_text: redactedText,
+            redacted_text: PIIGuardRules.redact(text, detections),
             detections: detections,
-            risk_analysis: {
-                risk_level: riskLevel,
-                risk_score: totalRisk,
-                pii_count: detections.length,
-                detected_types: [...new Set(detections.map(d => d.entity_type))],
-                message: riskMessages[riskLevel]
-            },
-            recommendations: getRecommendations(riskLevel)
+            risk_analysis: riskAnalysis,
+            recommendations: getRecommendations(riskAnalysis.risk_level)
         };
     }
 
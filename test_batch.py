@@ -0,0 +1,46 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for the batched detection and redaction API
+
+    python -m unittest test_batch
+"""
+
+import unittest
+
+from pii_detector import PIIDetector
+from redaction import TypeTagReplacement
+
+TEXTS = [
+    "Email john@example.com or call 555-123-4567",
+    "",
+    "Nothing sensitive here",
+    "Sarah Johnson lives at 12 Main Street, SSN 123-45-6789",
+    "Email john@example.com or call 555-123-4567"
+]
+
+
+class BatchApiTests(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = PIIDetector(enable_ml=False)
+
+    def test_detect_batch_matches_single_detection(self):
+        self.assertEqual(self.detector.detect_batch(TEXTS), [self.detector.detect_all_pii(text) for text in TEXTS])
+
+    def test_redact_batch_matches_single_redaction(self):
+        self.assertEqual(self.detector.redact_batch(TEXTS), [self.detector.redact_pii(text) for text in TEXTS])
+
+    def test_redact_batch_with_strategy(self):
+        (redacted, detections), = self.detector.redact_batch([TEXTS[0]], TypeTagReplacement())
+        self.assertEqual(redacted, "Email [EMAIL-REDACTED] or call [PHONE-REDACTED]")
+        self.assertEqual([d['entity_type'] for d in detections], ['EMAIL', 'PHONE'])
+
+    def test_empty_batch(self):
+        self.assertEqual(self.detector.detect_batch([]), [])
+        self.assertEqual(self.detector.redact_batch([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
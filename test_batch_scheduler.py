@@ -0,0 +1,67 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for the dynamic micro-batching scheduler
+
+    python -m unittest test_batch_scheduler
+"""
+
+import queue
+import time
+import unittest
+
+from batch_scheduler import MicroBatchScheduler
+from pii_detector import PIIDetector
+
+
+class MicroBatchSchedulerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = PIIDetector(enable_ml=False)
+
+    def _queue(self, count):
+        pending = queue.Queue()
+        for index in range(count):
+            pending.put((f"text {index}", None, None))
+        return pending
+
+    def test_lone_request_does_not_wait(self):
+        scheduler = MicroBatchScheduler(self.detector, max_wait_ms=5000)
+        started = time.monotonic()
+        detections = scheduler.detect("Call 555-123-4567", timeout=5)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual([d.entity_type for d in detections], ['PHONE'])
+
+    def test_regex_only_batch_takes_what_is_queued(self):
+        scheduler = MicroBatchScheduler(self.detector, max_batch_size=2, max_wait_ms=5000)
+        pending = self._queue(3)
+        started = time.monotonic()
+        self.assertEqual(len(scheduler._collect_batch(pending)), 2)
+        self.assertEqual(len(scheduler._collect_batch(pending)), 1)
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_ml_batch_waits_for_more_when_others_are_queued(self):
+        self.detector.is_ml_ready = lambda: True
+        scheduler = MicroBatchScheduler(self.detector, max_wait_ms=50)
+        pending = self._queue(2)
+        started = time.monotonic()
+        self.assertEqual(len(scheduler._collect_batch(pending)), 2)
+        self.assertGreaterEqual(time.monotonic() - started, 0.04)
+
+        pending = self._queue(1)
+        started = time.monotonic()
+        self.assertEqual(len(scheduler._collect_batch(pending)), 1)
+        self.assertLess(time.monotonic() - started, 0.04)
+
+    def test_batch_results(self):
+        scheduler = MicroBatchScheduler(self.detector)
+        futures = [scheduler.submit(text) for text in ("a@b.com", "no pii", "SSN 123-45-6789")]
+        self.assertEqual(
+            [[d.entity_type for d in future.result(5)] for future in futures],
+            [['EMAIL'], [], ['SSN']]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for bulk redaction and resuming from a checkpoint
+
+    python -m unittest test_bulk_redact
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from bulk_redact import _job_fingerprint, main
+
+RECORDS = [
+    {"id": 1, "text": "Email john@example.com"},
+    {"id": 2, "text": "Call 555-123-4567"},
+    {"id": 3, "text": "No PII"},
+    {"id": 4, "text": "SSN 123-45-6789"},
+    {"id": 5, "other": "not redacted a@b.com"}
+]
+
+
+class BulkRedactTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.input = os.path.join(self.directory, "in.jsonl")
+        self.output = os.path.join(self.directory, "out.jsonl")
+        # No model at this path, so workers fall back to regex detection.
+        self.model_path = os.path.join(self.directory, "fine_tuned_missing")
+        with open(self.input, "w", encoding="utf-8") as f:
+            for record in RECORDS:
+                f.write(json.dumps(record) + "\n")
+            f.write("{not json\n")
+
+    def _run(self, *extra):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr), contextlib.redirect_stdout(io.StringIO()):
+            code = main([self.input, self.output, "--workers", "1", "--chunk-records", "1",
+                         "--model-path", self.model_path, "--redaction", "type", *extra])
+        return code, stderr.getvalue()
+
+    def _output(self):
+        with open(self.output, encoding="utf-8") as f:
+            return f.read()
+
+    def test_redacts_in_input_order(self):
+        code, _ = self._run()
+        self.assertEqual(code, 0)
+        self.assertEqual([json.loads(line) for line in self._output().splitlines()], [
+            {"id": 1, "text": "Email [EMAIL-REDACTED]"},
+            {"id": 2, "text": "Call [PHONE-REDACTED]"},
+            {"id": 3, "text": "No PII"},
+            {"id": 4, "text": "SSN [SSN-REDACTED]"},
+            {"id": 5, "other": "not redacted a@b.com"}
+        ])
+        self.assertFalse(os.path.exists(self.output + ".checkpoint"))
+
+    def test_resume_after_crash_matches_a_clean_run(self):
+        self._run()
+        expected = self._output()
+
+        # A crash after two records were checkpointed, with a third half written.
+        with open(self.input, "rb") as f:
+            input_offset = len(f.readline()) + len(f.readline())
+        written = "".join(expected.splitlines(keepends=True)[:2])
+        with open(self.output, "w", encoding="utf-8") as f:
+            f.write(written + '{"id": 3, "te')
+        fingerprint = _job_fingerprint(argparse.Namespace(
+            input=self.input, format='jsonl', text_field='text', detections_field=None, redaction='type',
+            model_path=self.model_path, backend='torch'
+        ))
+        with open(self.output + ".checkpoint", "w", encoding="utf-8") as f:
+            json.dump({'fingerprint': fingerprint, 'input_offset': input_offset,
+                       'output_offset': len(written.encode("utf-8")), 'records': 2, 'skipped': 0}, f)
+
+        code, stderr = self._run()
+        self.assertEqual(code, 0)
+        self.assertIn("Resuming from checkpoint: 2 records", stderr)
+        self.assertIn("Redacted 5 records", stderr)
+        self.assertEqual(self._output(), expected)
+
+    def test_checkpoint_from_other_settings_is_refused(self):
+        with open(self.output + ".checkpoint", "w", encoding="utf-8") as f:
+            json.dump({'fingerprint': "0" * 16, 'input_offset': 0, 'output_offset': 0, 'records': 0,
+                       'skipped': 0}, f)
+        code, stderr = self._run()
+        self.assertEqual(code, 1)
+        self.assertIn("different input or settings", stderr)
+        self.assertEqual(self._run("--no-resume")[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
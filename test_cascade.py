@@ -0,0 +1,68 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for the cascade gate in front of the ML stage
+
+    python -m unittest test_cascade
+"""
+
+import unittest
+
+from cascade import CascadeGate, segment_spans
+from pii_detector import PIIDetector
+
+TEXT = "The weather is nice today. Dr. Smith met Ann Lee at noon.\nCall 555-123-4567 now! nothing to see here."
+
+
+class RecordingPipeline:
+    """Stands in for the NER pipeline: records its inputs and tags "Ann Lee"."""
+
+    def __init__(self):
+        self.inputs = []
+
+    def __call__(self, windows, batch_size=None):
+        self.inputs.extend(windows)
+        results = []
+        for window in windows:
+            start = window.find("Ann Lee")
+            results.append([] if start < 0 else [
+                {'entity_group': 'PER', 'word': "Ann Lee", 'start': start, 'end': start + 7, 'score': 0.99}
+            ])
+        return results
+
+
+class CascadeGateTests(unittest.TestCase):
+
+    def _segments(self, spans):
+        return [TEXT[start:end] for start, end in spans]
+
+    def test_segments_do_not_split_after_titles(self):
+        self.assertEqual(self._segments(segment_spans(TEXT)), [
+            "The weather is nice today.", "Dr. Smith met Ann Lee at noon.", "Call 555-123-4567 now!",
+            "nothing to see here."
+        ])
+
+    def test_only_segments_with_a_signal_pass_and_neighbours_join(self):
+        gate = CascadeGate(threshold=1.0)
+        self.assertEqual(self._segments(gate.select_spans(TEXT)),
+                         ["Dr. Smith met Ann Lee at noon.\nCall 555-123-4567 now!"])
+        stats = gate.stats()
+        self.assertEqual((stats["segments"], stats["segments_skipped"]), (4, 2))
+        self.assertEqual(stats["chars_skipped"], len(TEXT) - len(
+            "Dr. Smith met Ann Lee at noon.\nCall 555-123-4567 now!"))
+
+    def test_detector_sends_only_selected_spans_and_maps_offsets_back(self):
+        detector = PIIDetector(enable_ml=False, cascade_threshold=1.0)
+        pipeline = RecordingPipeline()
+        detector.pii_pipeline = pipeline
+        detector.ml_status = "ready"
+
+        detections = detector.detect_all_pii(TEXT)
+        self.assertEqual(pipeline.inputs, ["Dr. Smith met Ann Lee at noon.\nCall 555-123-4567 now!"])
+        person = [d for d in detections if d['method'] == 'ml']
+        self.assertEqual([(d['start'], d['end']) for d in person], [(TEXT.index("Ann Lee"), TEXT.index("Ann Lee") + 7)])
+
+
+if __name__ == "__main__":
+    unittest.main()
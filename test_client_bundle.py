@@ -0,0 +1,92 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for the client-side detector bundle
+
+    python -m unittest test_client_bundle
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from client_bundle import client_rules, render_client_bundle, to_js_regex
+from pii_detector import PIIDetector
+
+TEXTS = [
+    "Email john@example.com or call 555-123-4567",
+    "Sarah Johnson's card 4111 1111 1111 1111 and SSN 123-45-6789",
+    "host 192.168.1.1, ship to 12 Main Street",
+    "card 4111 1111 1111 1111 12 Main Street",
+    "user 2 1password@example.com, order 1234abc",
+    "Nothing to see here."
+]
+NODE_SCRIPT = """
+const bundle = require(process.argv[1]);
+const texts = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+console.log(JSON.stringify(texts.map(text => [
+    bundle.detect(text).map(d => [d.entity_type, d.start, d.end]), bundle.canDetectLocally(text)
+])));
+"""
+
+
+class ToJsRegexTests(unittest.TestCase):
+
+    def test_named_groups_and_leading_brackets(self):
+        self.assertEqual(to_js_regex(r'(?P<EMAIL>[]a])'), r'(?<EMAIL>[\]a])')
+        self.assertEqual(to_js_regex(r'[^]x]\(?P<'), r'[^\]x]\(?P<')
+
+    def test_constructs_without_javascript_equivalent(self):
+        for pattern in (r'\Aabc', r'(?i)abc', r'(?P=name)', r'(?>a)', r'(?#note)', r'(?(1)a|b)'):
+            with self.assertRaises(ValueError, msg=pattern):
+                to_js_regex(pattern)
+
+
+class ClientRulesTests(unittest.TestCase):
+
+    def test_gate_follows_the_detector(self):
+        rules = client_rules(PIIDetector(enable_ml=False))
+        self.assertIsNone(rules['gate'])
+        self.assertTrue(rules['serverOnly'])
+        self.assertFalse(client_rules(PIIDetector(enable_ml=False), ml_gate=False)['serverOnly'])
+
+        gated = client_rules(PIIDetector(enable_ml=False, cascade_threshold=2.0))
+        self.assertEqual(gated['gate']['threshold'], 2.0)
+        self.assertFalse(gated['serverOnly'])
+        self.assertNotEqual(gated['version'], rules['version'])
+
+
+@unittest.skipUnless(shutil.which('node'), "node is not installed")
+class BundleParityTests(unittest.TestCase):
+
+    def _run_bundle(self, detector, ml_gate):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "pii-guard-rules.js")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_client_bundle(client_rules(detector, ml_gate=ml_gate)))
+        result = subprocess.run(["node", "-e", NODE_SCRIPT, path], input=json.dumps(TEXTS), capture_output=True,
+                                text=True, check=True)
+        return json.loads(result.stdout)
+
+    def test_bundle_detects_like_the_server(self):
+        detector = PIIDetector(enable_ml=False)
+        results = self._run_bundle(detector, ml_gate=False)
+        for text, (detections, local) in zip(TEXTS, results):
+            self.assertEqual(detections, [[d['entity_type'], d['start'], d['end']]
+                                          for d in detector.detect_all_pii(text)], text)
+            self.assertTrue(local)
+
+    def test_gate_keeps_only_quiet_texts_local(self):
+        detector = PIIDetector(enable_ml=False, cascade_threshold=1.0)
+        local = [local for _, local in self._run_bundle(detector, ml_gate=True)]
+        self.assertEqual(local, [not detector.cascade_gate.select_spans(text) for text in TEXTS])
+        self.assertEqual(local[-1], True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for compact Detection records and the columnar container
+
+    python -m unittest test_detections
+"""
+
+import json
+import unittest
+
+from detections import Detection, Detections
+
+RECORDS = [
+    {'entity_type': 'EMAIL', 'entity_text': 'a@b.com', 'start': 6, 'end': 13, 'confidence': 0.95, 'method': 'regex'},
+    {'entity_type': 'PERSON', 'entity_text': 'Zoë "Z" O\'Neil', 'start': 20, 'end': 34, 'confidence': 0.9,
+     'method': 'name_matching'},
+    {'entity_type': 'EMAIL', 'entity_text': 'c@d.org', 'start': 40, 'end': 47, 'confidence': 0.875, 'method': 'ml'}
+]
+
+
+class DetectionTests(unittest.TestCase):
+
+    def test_dict_style_access(self):
+        detection = Detection(**RECORDS[0])
+        self.assertEqual(detection['start'], 6)
+        self.assertEqual(detection.get('missing', 'x'), 'x')
+        self.assertEqual(dict(detection), RECORDS[0])
+        self.assertEqual(detection, RECORDS[0])
+        detection['end'] = 12
+        self.assertEqual(detection.end, 12)
+        with self.assertRaises(KeyError):
+            detection['missing'] = 1
+
+    def test_shifted_returns_a_copy(self):
+        detection = Detection(**RECORDS[0])
+        shifted = detection.shifted(10)
+        self.assertEqual((shifted.start, shifted.end, detection.start), (16, 23, 6))
+
+
+class DetectionsTests(unittest.TestCase):
+
+    def test_round_trip(self):
+        detections = Detections(Detection(**record) for record in RECORDS)
+        self.assertEqual(len(detections), 3)
+        self.assertEqual(detections.to_dicts(), RECORDS)
+        self.assertEqual(detections[1], RECORDS[1])
+        self.assertEqual(detections.entity_types(), ['EMAIL', 'PERSON', 'EMAIL'])
+        self.assertEqual(detections.type_names, ['EMAIL', 'PERSON'])
+
+    def test_json_writer_matches_json_dumps(self):
+        detections = Detections(RECORDS)
+        self.assertEqual(json.loads(detections.to_json()), RECORDS)
+        self.assertEqual(Detections().to_json(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
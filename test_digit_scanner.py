@@ -0,0 +1,66 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Regression tests for digit-run scanning
+
+    python -m unittest test_digit_scanner
+"""
+
+import unittest
+
+from digit_scanner import classify_digit_run, validate_digit_candidates
+from pii_detector import PIIDetector
+
+
+class NonAsciiDigitTests(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = PIIDetector(enable_ml=False)
+
+    def test_classify_returns_ascii_values(self):
+        self.assertEqual(classify_digit_run("١٢٣-٤٥-٦٧٨٩"), [('SSN', 0, 11, '123456789')])
+        self.assertEqual(classify_digit_run("５５５-１２３-４５６７"), [('PHONE', 0, 12, '5551234567')])
+
+    def test_validators_accept_normalised_candidates(self):
+        candidates = classify_digit_run("١٠.٠.٠.١") + classify_digit_run("４１１１１１１１１１１１１１１１")
+        self.assertEqual(list(validate_digit_candidates(candidates)), [True, True])
+
+    def test_detect_does_not_raise(self):
+        for text in ("SSN ١٢٣-٤٥-٦٧٨٩ on file", "call ５５５-１２３-４５６７ today", "mixed 555-١٢٣-4567"):
+            detections = self.detector.detect_all_pii(text)
+            self.assertEqual(len(detections), 1, text)
+            self.assertIn(detections[0]['entity_type'], ('SSN', 'PHONE'))
+
+
+class DigitRunFallbackTests(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = PIIDetector(enable_ml=False)
+
+    def _types(self, text):
+        return [(d['entity_type'], d['entity_text']) for d in self.detector.detect_all_pii(text)]
+
+    def test_whole_run_falls_back_to_address(self):
+        self.assertEqual(self._types("I live at 123 Main Street"), [('ADDRESS', '123 Main Street')])
+
+    def test_leftover_part_of_split_run_falls_back_to_address(self):
+        self.assertEqual(
+            self._types("card 4111 1111 1111 1111 12 Main Street"),
+            [('CREDIT_CARD', '4111 1111 1111 1111'), ('ADDRESS', '12 Main Street')]
+        )
+
+    def test_glued_trailing_part_keeps_the_parts_before_it(self):
+        self.assertEqual(self._types("SSN 123-45-6789 1st floor"), [('SSN', '123-45-6789')])
+        self.assertEqual(self._types("Call 555-123-4567 2nd line"), [('PHONE', '555-123-4567')])
+        self.assertEqual(self._types("card 4111111111111111 3x daily"), [('CREDIT_CARD', '4111111111111111')])
+
+    def test_glued_part_falls_back_to_email(self):
+        self.assertEqual(self._types("user 2 1password@example.com"), [('EMAIL', '1password@example.com')])
+
+    def test_glued_run_alone_is_not_numeric(self):
+        self.assertEqual(self._types("ref 1234abc and 555@host"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
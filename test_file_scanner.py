@@ -0,0 +1,62 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for memory-mapped file scanning
+
+    python -m unittest test_file_scanner
+"""
+
+import random
+import unittest
+
+from file_scanner import MappedFileScanner
+from pii_detector import PIIDetector
+
+FUZZ_ATOMS = (
+    "John Smith", "Sarah", "Sarah Johnson", "Johnson", "555-123-4567", "123-45-6789", "4111 1111 1111 1111",
+    "192.168.1.1", "a@b.com", "12 Oak Street", "Apt 4", "Lane", "1st", "2 1password@example.com", "x", "9", ". ",
+    "\n"
+)
+OVERLAP = 40
+
+
+def _spans(detections):
+    return [(d['entity_type'], d['start'], d['end']) for d in detections]
+
+
+class MappedFileScannerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = PIIDetector(enable_ml=False)
+
+    def _scan(self, data, window_bytes, overlap_bytes=OVERLAP):
+        scanner = MappedFileScanner(self.detector, window_bytes=window_bytes, overlap_bytes=overlap_bytes,
+                                    include_names=True)
+        return [(hit.entity_type, hit.start, hit.end) for hit in scanner.scan_buffer(data)]
+
+    def test_window_starting_inside_a_digit_run(self):
+        # The second window starts at "3-456799"; scanning from there would
+        # find an SSN inside a run that is not one.
+        text = "x123-45-67891 .  555-123-456799"
+        self.assertEqual(self._scan(text.encode(), 21, overlap_bytes=20), [])
+
+    def test_window_starting_inside_a_token(self):
+        # The second window starts at "mithSarah"; the trailing "Sarah" is
+        # glued to "Smith" and is not a name on its own.
+        text = ". Sarah x. John SmithSarah"
+        self.assertEqual(self._scan(text.encode(), 21, overlap_bytes=20), [('PERSON', 2, 7)])
+
+    def test_output_does_not_depend_on_window_size(self):
+        rng = random.Random(3)
+        for _ in range(150):
+            text = "".join(rng.choice(FUZZ_ATOMS) + rng.choice(("", " ", "\n")) for _ in range(rng.randint(1, 40)))
+            expected = _spans(self.detector.detect_all_pii(text))
+            if any(end - start >= OVERLAP for _, start, end in expected):
+                continue
+            for window_bytes in (OVERLAP + 1, 50, 64, 97, 1000):
+                self.assertEqual(self._scan(text.encode(), window_bytes), expected, (window_bytes, text))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for gazetteer name matching
+
+    python -m unittest test_gazetteer
+"""
+
+import unittest
+
+from gazetteer import NameGazetteer
+
+
+class NameGazetteerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.gazetteer = NameGazetteer(["Sarah", "Sarah Johnson", "John Smith", "O'Brien", "Mary-Jane"])
+
+    def _names(self, text):
+        return [text[start:end] for start, end in self.gazetteer.find_all(text)]
+
+    def test_longest_name_wins(self):
+        self.assertEqual(self._names("Contact Sarah Johnson or Sarah"), ["Sarah Johnson", "Sarah"])
+
+    def test_possessive_is_not_part_of_the_name(self):
+        self.assertEqual(self._names("John Smith's email"), ["John Smith"])
+        self.assertEqual(self._names("Ask Sarah's manager"), ["Sarah"])
+        self.assertEqual(self._names("Sarah Johnson's desk"), ["Sarah Johnson"])
+
+    def test_apostrophes_and_hyphens_inside_names(self):
+        self.assertEqual(self._names("Ask O'Brien and Mary-Jane"), ["O'Brien", "Mary-Jane"])
+
+    def test_names_only_match_whole_tokens(self):
+        self.assertEqual(self._names("Sarahs and Sarah-Lee and O'Briens"), [])
+
+    def test_names_do_not_continue_across_punctuation(self):
+        self.assertEqual(self._names("John, Smith"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for incremental re-analysis sessions
+
+    python -m unittest test_incremental
+"""
+
+import random
+import unittest
+
+from incremental import IncrementalSession, VersionConflict
+from pii_detector import PIIDetector
+from rules import PII_PATTERNS, RuleSnapshot
+
+FUZZ_ATOMS = (
+    "John Smith", "Sarah", "Sarah Johnson", "Johnson", "Emily Chen", "555-123-4567", "123-45-6789",
+    "4111 1111 1111 1111", "192.168.1.1", "a@b.com", "12 Oak Street", "Apt 4", "Suite 200", "Floor 2",
+    "Lane", "Maple", "x", "9", ". ", "! ", "\n", " "
+)
+
+
+def _spans(detections):
+    return [(d['entity_type'], d['start'], d['end']) for d in detections]
+
+
+class IncrementalSessionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = PIIDetector(enable_ml=False)
+
+    def assertMatchesFullScan(self, session, message=None):
+        self.assertEqual(_spans(session.detections()), _spans(self.detector.detect_all_pii(session.text)), message)
+
+    def test_edit_returns_diff(self):
+        session = IncrementalSession(self.detector, "Call 555-123-4567. Email a@b.com")
+        ids = [d['id'] for d in session.detections()]
+        result = session.apply_edits([{'offset': 0, 'delete': 4, 'insert': 'Phone'}])
+        self.assertEqual(result['version'], 1)
+        self.assertEqual(result['removed'], [])
+        self.assertEqual(result['added'], [])
+        self.assertEqual([d['id'] for d in session.detections()], ids)
+        self.assertMatchesFullScan(session)
+
+    def test_edit_inside_detection_replaces_it(self):
+        session = IncrementalSession(self.detector, "SSN 123-45-6789 today")
+        old_id = session.detections()[0]['id']
+        result = session.apply_edits([{'offset': 4, 'delete': 11, 'insert': 'a@b.com'}])
+        self.assertEqual(result['removed'], [old_id])
+        self.assertEqual(_spans(result['added']), [('EMAIL', 4, 11)])
+
+    def test_multi_line_address_is_rescanned_whole(self):
+        session = IncrementalSession(
+            self.detector, "Ship to 12 Oak Street\nApt 4\nFloor 2\nBill to 40 Elm Street\nThanks"
+        )
+        session.apply_edits([{'offset': 11, 'delete': 3, 'insert': 'Maple'}])
+        self.assertMatchesFullScan(session)
+
+    def test_version_conflict(self):
+        session = IncrementalSession(self.detector, "hello")
+        session.apply_edits([{'offset': 5, 'insert': ' world'}])
+        with self.assertRaises(VersionConflict):
+            session.apply_edits([{'offset': 0, 'insert': 'x'}], base_version=0)
+
+    def test_invalid_edits(self):
+        session = IncrementalSession(self.detector, "hello")
+        for edit in ({'offset': True}, {'offset': 0, 'delete': 6}, {'offset': 0, 'insert': 3}, {}):
+            with self.assertRaises(ValueError):
+                session.apply_edits([edit])
+
+    def test_rules_reload_rescans_with_the_new_snapshot(self):
+        session = IncrementalSession(self.detector, "Badge EMP-123456, mail a@b.com")
+        self.assertEqual([d['entity_type'] for d in session.detections()], ['EMAIL'])
+
+        self.detector.rules = RuleSnapshot(dict(PII_PATTERNS, EMPLOYEE_ID=r'\bEMP-\d{6}\b'))
+        session.apply_edits([{'offset': 0, 'delete': 5, 'insert': 'ID'}])
+        self.assertIs(session.rules, self.detector.rules)
+        self.assertEqual([d['entity_type'] for d in session.detections()], ['EMPLOYEE_ID', 'EMAIL'])
+        self.assertMatchesFullScan(session)
+
+    def test_random_edits_match_full_scan(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            text = "".join(rng.choice(FUZZ_ATOMS) + rng.choice(("", " ", "\n")) for _ in range(rng.randint(1, 12)))
+            session = IncrementalSession(self.detector, text)
+            edits = []
+            for _ in range(6):
+                offset = rng.randint(0, len(session.text))
+                edit = {
+                    'offset': offset,
+                    'delete': rng.randint(0, min(6, len(session.text) - offset)),
+                    'insert': rng.choice(("", "x", "1", "\n") + FUZZ_ATOMS)
+                }
+                edits.append(edit)
+                session.apply_edits([edit])
+                self.assertMatchesFullScan(session, (text, edits))
+
+
+if __name__ == "__main__":
+    unittest.main()
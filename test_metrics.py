@@ -0,0 +1,92 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for the metrics registry and its multi-process aggregation
+
+    python -m unittest test_metrics
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from metrics import MetricsRegistry
+
+
+def _samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+class MetricsRegistryTests(unittest.TestCase):
+
+    def _registry(self, multiprocess_dir=None):
+        registry = MetricsRegistry(multiprocess_dir)
+        counter = registry.counter("requests_total", "Requests.", ["status"])
+        gauge = registry.gauge("ready", "Ready.", multiprocess_mode="min")
+        histogram = registry.histogram("duration_seconds", "Duration.", buckets=(0.1, 1.0))
+        return registry, counter, gauge, histogram
+
+    def test_render(self):
+        registry, counter, gauge, histogram = self._registry()
+        counter.inc(status="200")
+        counter.inc(2, status="200")
+        gauge.set(1)
+        histogram.observe(0.05)
+        histogram.observe(5)
+
+        text = registry.render()
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertEqual(_samples(text), {
+            'requests_total{status="200"}': "3",
+            'ready': "1",
+            'duration_seconds_bucket{le="0.1"}': "1",
+            'duration_seconds_bucket{le="1"}': "1",
+            'duration_seconds_bucket{le="+Inf"}': "2",
+            'duration_seconds_sum': "5.05",
+            'duration_seconds_count': "2"
+        })
+
+    def test_labels_must_match(self):
+        _, counter, _, _ = self._registry()
+        with self.assertRaises(ValueError):
+            counter.inc(code="200")
+
+    def test_multiprocess_render_merges_every_snapshot(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        # A live process (this test's parent) and one that has exited.
+        live_pid, dead_pid = os.getppid(), 2 ** 22 + 1
+        for pid, ready in ((live_pid, 0), (dead_pid, 1)):
+            with open(os.path.join(directory, f"{pid}.json"), "w", encoding="utf-8") as f:
+                json.dump({
+                    "requests_total": [[["200"], 2]],
+                    "ready": [[[], ready]],
+                    "duration_seconds": [[[], [[1, 0, 0], 0.05]]]
+                }, f)
+
+        registry, counter, gauge, histogram = self._registry(directory)
+        counter.inc(status="200")
+        gauge.set(1)
+        histogram.observe(0.5)
+
+        samples = _samples(registry.render())
+        # Counters include exited processes, gauges only live ones.
+        self.assertEqual(samples['requests_total{status="200"}'], "5")
+        self.assertEqual(samples['ready'], "0")
+        self.assertEqual(samples['duration_seconds_count'], "3")
+        self.assertEqual(samples['duration_seconds_bucket{le="0.1"}'], "2")
+        self.assertTrue(os.path.exists(os.path.join(directory, f"{os.getpid()}.json")))
+
+    def test_clear(self):
+        registry, counter, _, _ = self._registry()
+        counter.inc(status="200")
+        registry.clear()
+        self.assertEqual(_samples(registry.render()), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for sliding-window ML detection of long documents
+
+    python -m unittest test_ml_windows
+"""
+
+import re
+import unittest
+
+from pii_detector import PIIDetector
+
+KNOWN_NAMES = ("Ann Lee", "Bob Ray")
+CAPITALISED_RUN = re.compile(r"[A-Z]\w*(?: [A-Z]\w*)*")
+
+
+class WhitespaceTokenizer:
+    """One token per word, like the pipeline's fast tokenizer."""
+
+    def __call__(self, text, **kwargs):
+        return {'offset_mapping': [match.span() for match in re.finditer(r"\S+", text)]}
+
+
+class FakeNerPipeline:
+    """
+    Tags runs of capitalised words as PER. A run made only of known names
+    is split into them, as a model that sees the whole run would; a run cut
+    off by the end of its window is not, and is tagged as one entity.
+    """
+
+    tokenizer = WhitespaceTokenizer()
+
+    def __call__(self, windows, batch_size=None):
+        return [self._entities(window) for window in windows]
+
+    def _entities(self, window):
+        entities = []
+        for match in CAPITALISED_RUN.finditer(window):
+            start = match.start()
+            parts = [part for part in re.split(r" (?=%s)" % "|".join(KNOWN_NAMES), match.group())]
+            if not all(part in KNOWN_NAMES for part in parts):
+                parts = [match.group()]
+            for part in parts:
+                entities.append({'entity_group': 'PER', 'word': part, 'start': start,
+                                 'end': start + len(part), 'score': 0.9})
+                start += len(part) + 1
+        return entities
+
+
+class SlidingWindowTests(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = PIIDetector(enable_ml=False, ml_window_tokens=8, ml_stride=4)
+        self.detector.pii_pipeline = FakeNerPipeline()
+
+    def _names(self, text):
+        return [detection.entity_text for detection in self.detector.detect_pii_ml(text)]
+
+    def test_entity_cut_at_a_seam_is_reported_whole(self):
+        # The first window ends after "Ann"; the second sees "Ann Lee" whole.
+        text = "one two three four five six seven Ann Lee eight nine ten eleven"
+        self.assertEqual(self._names(text), ["Ann Lee"])
+
+    def test_adjacent_entities_at_a_seam_stay_apart(self):
+        # The first window ends after "Bob" and tags "Ann Lee Bob" as one
+        # name; the second window sees both names whole.
+        text = "one two three four five Ann Lee Bob Ray six seven eight nine ten"
+        self.assertEqual(self._names(text), ["Ann Lee", "Bob Ray"])
+
+    def test_short_text_is_one_window(self):
+        self.assertEqual(self._names("met Ann Lee Bob Ray"), ["Ann Lee", "Bob Ray"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for overlap resolution between detections
+
+    python -m unittest test_overlap
+"""
+
+import random
+import unittest
+
+from overlap import DEFAULT_TYPE_PRIORITY, OVERLAP_POLICIES, _policy_keys, resolve_overlaps
+
+
+def _detection(entity_type, start, end, confidence):
+    return {'entity_type': entity_type, 'start': start, 'end': end, 'confidence': confidence}
+
+
+def _reference(detections, policy):
+    """Quadratic greedy: best-first, keep what overlaps nothing kept."""
+    kept = []
+    for detection in sorted(detections, key=_policy_keys(DEFAULT_TYPE_PRIORITY)[policy]):
+        if all(detection['end'] <= other['start'] or other['end'] <= detection['start'] for other in kept):
+            kept.append(detection)
+    return sorted(kept, key=lambda d: d['start'])
+
+
+class ResolveOverlapsTests(unittest.TestCase):
+
+    def test_policies(self):
+        detections = [
+            _detection('PERSON', 0, 13, 0.90),
+            _detection('ADDRESS', 0, 20, 0.80),
+            _detection('EMAIL', 5, 9, 0.95)
+        ]
+        self.assertEqual(resolve_overlaps(detections, 'confidence'), [detections[2]])
+        self.assertEqual(resolve_overlaps(detections, 'longest'), [detections[1]])
+        self.assertEqual(resolve_overlaps(detections, 'type_priority'), [detections[2]])
+
+    def test_touching_spans_do_not_overlap(self):
+        detections = [_detection('EMAIL', 0, 5, 0.9), _detection('PHONE', 5, 9, 0.9)]
+        self.assertEqual(resolve_overlaps(detections), detections)
+
+    def test_matches_pairwise_reference(self):
+        rng = random.Random(11)
+        for _ in range(300):
+            detections = []
+            for _ in range(rng.randint(1, 25)):
+                start = rng.randint(0, 60)
+                detections.append(_detection(rng.choice(DEFAULT_TYPE_PRIORITY), start, start + rng.randint(1, 15),
+                                             rng.choice((0.8, 0.9, 0.95))))
+            for policy in OVERLAP_POLICIES:
+                self.assertEqual(resolve_overlaps(detections, policy), _reference(detections, policy), policy)
+
+    def test_deeply_nested_spans(self):
+        detections = [_detection('OTHER', index, 20000 - index, 0.5) for index in range(10000)]
+        self.assertEqual(resolve_overlaps(detections, 'longest'), [detections[0]])
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            resolve_overlaps([_detection('EMAIL', 0, 1, 0.9)], 'first')
+
+
+if __name__ == "__main__":
+    unittest.main()
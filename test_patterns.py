@@ -0,0 +1,61 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for the single-pass pattern engine
+
+    python -m unittest test_patterns
+"""
+
+import re
+import unittest
+
+from pii_detector import PIIDetector
+from rules import PII_PATTERNS, RuleSnapshot
+
+SAMPLE = ("Email john@example.com or call 555-123-4567. SSN 123-45-6789, card 4111 1111 1111 1111, "
+          "host 192.168.1.1, ship to 12 Main Street.")
+
+
+def _spans(detections):
+    return [(d['entity_type'], d['start'], d['end']) for d in detections]
+
+
+class PatternEngineTests(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = PIIDetector(enable_ml=False)
+
+    def test_every_type_in_one_pass(self):
+        detections = self.detector.detect_pii_patterns_batch([SAMPLE])[0]
+        self.assertEqual(sorted(_spans(detections), key=lambda span: span[1]), [
+            ('EMAIL', 6, 22), ('PHONE', 31, 43), ('SSN', 49, 60), ('CREDIT_CARD', 67, 86),
+            ('IP_ADDRESS', 93, 104), ('ADDRESS', 114, 128)
+        ])
+        for detection in detections:
+            self.assertEqual(detection.entity_text, SAMPLE[detection.start:detection.end])
+            self.assertEqual(detection.method, 'regex')
+
+    def test_batch_matches_single_texts(self):
+        texts = [SAMPLE, "", "nothing here", "Call 555-123-4567 about 12 Oak Avenue"]
+        self.assertEqual(
+            [_spans(detections) for detections in self.detector.detect_pii_patterns_batch(texts)],
+            [_spans(self.detector.detect_pii_patterns_batch([text])[0]) for text in texts]
+        )
+
+    def test_custom_non_numeric_pattern_matches_finditer(self):
+        rules = RuleSnapshot(dict(PII_PATTERNS, EMPLOYEE_ID=r'\bEMP-\d{6}\b'))
+        text = "Badges EMP-123456 and EMP-654321, not EMP-12"
+        detections = self.detector.detect_pii_patterns_batch([text], rules)[0]
+        self.assertEqual(
+            [(d.start, d.end) for d in detections if d.entity_type == 'EMPLOYEE_ID'],
+            [match.span() for match in re.finditer(r'\bEMP-\d{6}\b', text)]
+        )
+
+    def test_invalid_pattern_is_rejected(self):
+        with self.assertRaises(ValueError):
+            RuleSnapshot(dict(PII_PATTERNS, BROKEN=r'(unclosed'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for redaction assembly and replacement strategies
+
+    python -m unittest test_redaction
+"""
+
+import unittest
+
+from redaction import (FixedReplacement, PseudonymReplacement, TypeTagReplacement, assemble_redacted_text,
+                       get_redaction_strategy, make_replacer)
+
+TEXT = "Ann met Bob; Ann emailed a@b.com"
+DETECTIONS = [
+    {'entity_type': 'PERSON', 'entity_text': 'Ann', 'start': 0, 'end': 3},
+    {'entity_type': 'PERSON', 'entity_text': 'Bob', 'start': 8, 'end': 11},
+    {'entity_type': 'PERSON', 'entity_text': 'Ann', 'start': 13, 'end': 16},
+    {'entity_type': 'EMAIL', 'entity_text': 'a@b.com', 'start': 25, 'end': 32}
+]
+
+
+class RedactionTests(unittest.TestCase):
+
+    def _redact(self, strategy, detections=DETECTIONS):
+        return assemble_redacted_text(TEXT, detections, make_replacer(strategy))
+
+    def test_strategies(self):
+        self.assertEqual(self._redact(FixedReplacement()),
+                         "[REDACTED] met [REDACTED]; [REDACTED] emailed [REDACTED]")
+        self.assertEqual(self._redact(TypeTagReplacement()),
+                         "[PERSON-REDACTED] met [PERSON-REDACTED]; [PERSON-REDACTED] emailed [EMAIL-REDACTED]")
+        self.assertEqual(self._redact(PseudonymReplacement()), "PERSON_1 met PERSON_2; PERSON_1 emailed EMAIL_1")
+        self.assertEqual(self._redact("***"), "*** met ***; *** emailed ***")
+
+    def test_pseudonyms_restart_for_each_document(self):
+        strategy = PseudonymReplacement()
+        self.assertEqual(self._redact(strategy, DETECTIONS[1:2]), "Ann met PERSON_1; Ann emailed a@b.com")
+        self.assertEqual(self._redact(strategy, DETECTIONS[2:3]), "Ann met Bob; PERSON_1 emailed a@b.com")
+
+    def test_unsorted_and_overlapping_spans(self):
+        # "Ann me" is kept; "Ann", starting inside it, is skipped.
+        detections = [DETECTIONS[3], dict(DETECTIONS[0], end=6), DETECTIONS[0]]
+        self.assertEqual(self._redact("X", detections), "Xt Bob; Ann emailed X")
+
+    def test_many_detections_assemble_in_one_pass(self):
+        text = "a@b.com " * 20000
+        detections = [{'entity_type': 'EMAIL', 'entity_text': 'a@b.com', 'start': 8 * index, 'end': 8 * index + 7}
+                      for index in range(20000)]
+        self.assertEqual(assemble_redacted_text(text, detections, make_replacer("X")), "X " * 20000)
+
+    def test_unknown_strategy(self):
+        self.assertIsInstance(get_redaction_strategy('type'), TypeTagReplacement)
+        for name in ('mask', None):
+            with self.assertRaises(ValueError):
+                get_redaction_strategy(name)
+
+
+if __name__ == "__main__":
+    unittest.main()
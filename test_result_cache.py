@@ -0,0 +1,71 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for the bounded LRU detection result cache
+
+    python -m unittest test_result_cache
+"""
+
+import time
+import unittest
+
+from detections import Detection, Detections
+from pii_detector import PIIDetector
+from result_cache import ENTRY_OVERHEAD_BYTES, DetectionCache, cache_key
+from rules import PII_PATTERNS, RuleSnapshot
+
+
+def _detections(count=1):
+    return Detections([Detection('EMAIL', 'a@b.com', index, index + 7, 0.95, 'regex') for index in range(count)])
+
+
+class DetectionCacheTests(unittest.TestCase):
+
+    def test_key_depends_on_every_input_and_hides_the_text(self):
+        key = cache_key("secret a@b.com", "model", "v1")
+        self.assertNotIn("secret", key)
+        self.assertEqual(key, cache_key("secret a@b.com", "model", "v1"))
+        self.assertEqual(len({key, cache_key("secret a@b.com", "model", "v2"),
+                              cache_key("secret a@b.com", "other", "v1"), cache_key("secret", "model", "v1")}), 4)
+
+    def test_least_recently_used_entry_is_evicted_by_size(self):
+        entry_bytes = ENTRY_OVERHEAD_BYTES + _detections().nbytes
+        cache = DetectionCache(max_bytes=2 * entry_bytes)
+        cache.put("a", _detections())
+        cache.put("b", _detections())
+        cache.get("a")
+        cache.put("c", _detections())
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertLessEqual(cache.stats()["bytes"], cache.max_bytes)
+
+    def test_entry_larger_than_the_cache_is_not_stored(self):
+        cache = DetectionCache(max_bytes=ENTRY_OVERHEAD_BYTES)
+        cache.put("a", _detections(10))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_expired_entries_miss(self):
+        cache = DetectionCache(ttl_seconds=0.01)
+        cache.put("a", _detections())
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_detector_serves_repeats_from_the_cache(self):
+        detector = PIIDetector(enable_ml=False, cache_max_bytes=1024 * 1024)
+        text = "Email john@example.com"
+        first = detector.detect_all_pii(text)
+        self.assertEqual(detector.detect_all_pii(text), first)
+        self.assertEqual(detector.result_cache.stats()["hits"], 1)
+
+        # New rules change the key, so the old result is not served.
+        detector.rules = RuleSnapshot(dict(PII_PATTERNS, WORD=r'\bEmail\b'))
+        self.assertEqual([d['entity_type'] for d in detector.detect_all_pii(text)], ['WORD', 'EMAIL'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for rule snapshots and hot reloading
+
+    python -m unittest test_rules
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from pii_detector import PIIDetector
+from rules import PII_PATTERNS, RuleSnapshot, RuleWatcher
+
+TEXT = "Badge EMP-123456 for Priya Raman, risk check"
+
+
+class RuleReloadTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.rules_path = os.path.join(self.directory, "rules.json")
+        self._write({})
+        self.detector = PIIDetector(enable_ml=False, rules_path=self.rules_path)
+
+    def _write(self, config):
+        with open(self.rules_path, "w", encoding="utf-8") as f:
+            json.dump(config, f)
+        # Make sure the watcher sees a new stamp even within one mtime tick.
+        stat = os.stat(self.rules_path)
+        os.utime(self.rules_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def _types(self):
+        return [d['entity_type'] for d in self.detector.detect_all_pii(TEXT)]
+
+    def test_reload_picks_up_patterns_names_and_weights(self):
+        self.assertEqual(self._types(), [])
+        self._write({
+            'pii_patterns': dict(PII_PATTERNS, EMPLOYEE_ID=r'\bEMP-\d{6}\b'),
+            'common_names': ["Priya Raman"],
+            'risk_weights': {'EMPLOYEE_ID': 50}
+        })
+        snapshot = self.detector.reload_rules()
+
+        self.assertIs(self.detector.rules, snapshot)
+        self.assertEqual(self._types(), ['EMPLOYEE_ID', 'PERSON'])
+        risk = self.detector.analyze_privacy_risk(self.detector.detect_all_pii(TEXT))
+        self.assertEqual(risk['risk_score'], 50 + snapshot.default_risk_weight)
+
+    def test_pinned_snapshot_is_unaffected_by_a_reload(self):
+        pinned = self.detector.rules
+        self._write({'pii_patterns': dict(PII_PATTERNS, EMPLOYEE_ID=r'\bEMP-\d{6}\b')})
+        self.detector.reload_rules()
+        self.assertEqual(self.detector.detect_columnar([TEXT], rules=pinned)[0].to_dicts(), [])
+        self.assertNotEqual(pinned.version, self.detector.rules.version)
+
+    def test_watcher_keeps_the_live_rules_when_a_file_is_bad(self):
+        watcher = RuleWatcher(self.detector)
+        self.assertFalse(watcher.check())
+
+        live = self.detector.rules
+        self._write({'pii_patterns': {'BROKEN': '(unclosed'}})
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            self.assertFalse(watcher.check())
+        self.assertIs(self.detector.rules, live)
+        self.assertIn("keeping rules version", out.getvalue())
+
+        self._write({'pii_patterns': dict(PII_PATTERNS, EMPLOYEE_ID=r'\bEMP-\d{6}\b')})
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(watcher.check())
+        self.assertEqual(self._types(), ['EMPLOYEE_ID'])
+
+    def test_snapshots_are_immutable_and_validated(self):
+        with self.assertRaises(AttributeError):
+            self.detector.rules.version = "x"
+        for config in ({'unknown': 1}, {'common_names': "Priya"}, {'pii_patterns': {'not valid': 'x'}}):
+            with self.assertRaises(ValueError, msg=config):
+                RuleSnapshot.from_config(config)
+
+
+if __name__ == "__main__":
+    unittest.main()
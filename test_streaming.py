@@ -0,0 +1,56 @@
+"""
+PII Guard - Privacy-First LLM Prompt Filter
+Copyright (c) 2025 Privacy Innovation Team
+
+Tests for streaming redaction with carry-over between chunks
+
+    python -m unittest test_streaming
+"""
+
+import unittest
+
+from pii_detector import PIIDetector
+from redaction import PseudonymReplacement
+
+TEXT = ("Hi, I am Sarah Johnson. Reach me at sarah@example.com or 555-123-4567. "
+        "My card is 4111 1111 1111 1111 and I live at 12 Main Street. "
+        "Again: sarah@example.com, and ask for Sarah Johnson. ") * 3
+
+
+def _chunks(text, size):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+class StreamingRedactionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = PIIDetector(enable_ml=False)
+
+    def _stream(self, chunks, replacement="[REDACTED]", carry_over=48):
+        pieces = list(self.detector.redact_stream(chunks, replacement, carry_over=carry_over))
+        return "".join(text for text, _ in pieces), [d for _, detections in pieces for d in detections]
+
+    def test_any_chunking_matches_whole_text_redaction(self):
+        expected_text, expected_detections = self.detector.redact_pii(TEXT)
+        for size in (1, 7, 31, 64, 200, len(TEXT)):
+            self.assertEqual(self._stream(_chunks(TEXT, size)), (expected_text, expected_detections), size)
+
+    def test_pseudonyms_stay_consistent_across_chunks(self):
+        redacted, _ = self._stream(_chunks(TEXT, 17), PseudonymReplacement())
+        expected, _ = self.detector.redact_pii(TEXT, PseudonymReplacement())
+        self.assertEqual(redacted, expected)
+        self.assertEqual(redacted.count("EMAIL_1"), 6)
+        self.assertNotIn("EMAIL_2", redacted)
+
+    def test_pieces_are_yielded_before_the_stream_ends(self):
+        pieces = self.detector.redact_stream(iter(_chunks(TEXT, 10)), carry_over=48)
+        first_text, _ = next(pieces)
+        self.assertTrue(first_text)
+        self.assertLess(len(first_text), len(TEXT))
+
+    def test_empty_stream(self):
+        self.assertEqual(list(self.detector.redact_stream([])), [])
+
+
+if __name__ == "__main__":
+    unittest.main()